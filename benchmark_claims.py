@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark the full claim pipeline for Insurance Claim Coverage Analyzer
+Times extraction, AI analysis and coverage evaluation per claim; with the default replay
+transport the LLM calls are served from recorded cassettes, so no API key or network is needed
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from config.settings import settings
+from app.ai_analyzer import AIAnalyzer, DOCUMENT_INSTRUCTIONS
+from app.claim_evaluator import ClaimEvaluator
+from app.llm_transport import TRANSPORT_MODES
+from app.pdf_processor import PDFProcessor
+
+def claim_files(claim_dir: Path):
+    """Documents of one claim, found as <doc_type>.pdf, e.g. contract.pdf."""
+    return {
+        doc_type: claim_dir / f"{doc_type}.pdf"
+        for doc_type in DOCUMENT_INSTRUCTIONS
+        if (claim_dir / f"{doc_type}.pdf").exists()
+    }
+
+def benchmark_claim(files, analyzer_options):
+    """Run one claim through the pipeline the app runs, timing each stage."""
+    timings = {}
+    
+    start = time.perf_counter()
+    extractions = PDFProcessor().extract_many({doc_type: str(path) for doc_type, path in files.items()})
+    texts = {doc_type: extraction['content'] for doc_type, extraction in extractions.items()}
+    timings['extract'] = time.perf_counter() - start
+    
+    # A fresh analyzer per claim, as each Analyze click creates one
+    start = time.perf_counter()
+    analyzer = AIAnalyzer(**analyzer_options)
+    results = {}
+    first_flag = None
+    for doc_type, field, item in analyzer.stream_all(texts):
+        if field == 'red_flags' and first_flag is None:
+            first_flag = time.perf_counter() - start
+        elif field == 'done':
+            results[doc_type] = item
+    timings['analyze'] = time.perf_counter() - start
+    timings['first_flag'] = first_flag
+    
+    start = time.perf_counter()
+    decision = ClaimEvaluator().evaluate_coverage(results)
+    timings['evaluate'] = time.perf_counter() - start
+    
+    return timings, decision, analyzer.telemetry_summary()
+
+def main():
+    """Run the pipeline benchmark."""
+    parser = argparse.ArgumentParser(description="Time the full claim pipeline on a corpus of claims")
+    parser.add_argument("corpus", type=Path, help="Directory of claim folders, each holding <doc_type>.pdf files")
+    parser.add_argument("--transport", default="replay", choices=TRANSPORT_MODES, help="record once with a key, then replay offline")
+    parser.add_argument("--cassettes", default=settings.LLM_CASSETTE_PATH, help="Cassette directory to record to or replay from")
+    parser.add_argument("--latency", help="Fixed replay latency per call in seconds (default: as recorded)")
+    parser.add_argument("--latency-scale", type=float, default=settings.LLM_REPLAY_LATENCY_SCALE, help="Multiplier for replay latency")
+    parser.add_argument("--combined", action="store_true", help="Analyze each claim in a single call where it fits")
+    parser.add_argument("--cache", action="store_true", help="Keep the LLM response cache on (off to measure every call)")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the corpus")
+    args = parser.parse_args()
+    
+    claims = {path.name: claim_files(path) for path in sorted(args.corpus.iterdir()) if path.is_dir()}
+    claims = {name: files for name, files in claims.items() if files}
+    if not claims:
+        print(f"❌ No claim folders with <doc_type>.pdf files found in {args.corpus}")
+        sys.exit(1)
+    
+    settings.LLM_CASSETTE_PATH = args.cassettes
+    settings.LLM_REPLAY_LATENCY = args.latency or "recorded"
+    settings.LLM_REPLAY_LATENCY_SCALE = args.latency_scale
+    settings.LLM_CACHE_ENABLED = args.cache
+    analyzer_options = {'transport': args.transport, 'combined': args.combined}
+    
+    print(f"📊 Claim Pipeline Benchmark - {len(claims)} claims, transport: {args.transport}")
+    print("=" * 72)
+    print(f"{'claim':<20} {'extract':>8} {'analyze':>8} {'1st flag':>9} {'evaluate':>9} {'calls':>6} {'decision':>10}")
+    
+    analyze_times = []
+    for _ in range(args.repeat):
+        for name, files in claims.items():
+            try:
+                timings, decision, telemetry = benchmark_claim(files, analyzer_options)
+            except Exception as e:
+                print(f"   ⚠️  {name} failed: {e}")
+                continue
+            analyze_times.append(timings['analyze'])
+            first_flag = f"{timings['first_flag']:.2f}" if timings['first_flag'] is not None else "-"
+            print(
+                f"{name[:20]:<20} {timings['extract']:>8.2f} {timings['analyze']:>8.2f} {first_flag:>9} "
+                f"{timings['evaluate']:>9.3f} {telemetry['calls']:>6} {decision['recommendation']:>10}"
+            )
+    
+    if analyze_times:
+        print("=" * 72)
+        print(f"analyze seconds: median {statistics.median(analyze_times):.2f}, max {max(analyze_times):.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark PDF extraction backends for Insurance Claim Coverage Analyzer
+Reports pages/sec and text similarity against a reference backend on a corpus of PDFs
+"""
+
+import argparse
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from app.pdf_backends import BACKENDS, available_backends
+from app.pdf_processor import PDFProcessor
+
+def text_similarity(reference: str, candidate: str) -> float:
+    """Word-level similarity ratio between two extractions (1.0 = identical words)."""
+    return SequenceMatcher(None, reference.split(), candidate.split(), autojunk=False).ratio()
+
+def benchmark_backend(backend, pdf_paths, repeat: int):
+    """Extract every corpus PDF with one backend and time it."""
+    processor = PDFProcessor(backend=backend, parallel_workers=0)
+    processor.cache = None  # Always measure real extraction
+    texts = {}
+    pages = 0
+    elapsed = 0.0
+    
+    for path in pdf_paths:
+        with processor.open(path) as pdf:
+            page_count = backend.page_count(pdf.document(backend))
+        
+        for _ in range(repeat):
+            start = time.perf_counter()
+            try:
+                text = processor.extract_text(str(path))
+            except Exception as e:
+                print(f"   ⚠️  {backend.name}: {path.name} failed: {e}")
+                text = ""
+            elapsed += time.perf_counter() - start
+            pages += page_count
+        texts[path] = text
+    
+    return texts, pages, elapsed
+
+def main():
+    """Run the backend benchmark."""
+    parser = argparse.ArgumentParser(description="Compare PDF extraction backends on a corpus of PDFs")
+    parser.add_argument("corpus", type=Path, help="Directory containing *.pdf fixtures")
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), help="Backends to compare (default: all installed)")
+    parser.add_argument("--reference", default="pypdf2", choices=list(BACKENDS), help="Backend used as the similarity baseline")
+    parser.add_argument("--repeat", type=int, default=1, help="Extraction passes per document")
+    args = parser.parse_args()
+    
+    pdf_paths = sorted(args.corpus.glob("*.pdf"))
+    if not pdf_paths:
+        print(f"❌ No PDF files found in {args.corpus}")
+        sys.exit(1)
+    
+    installed = available_backends()
+    names = args.backends or list(installed)
+    missing = [name for name in names + [args.reference] if name not in installed]
+    if missing:
+        print(f"❌ Backends not installed: {', '.join(sorted(set(missing)))}")
+        sys.exit(1)
+    if args.reference not in names:
+        names.insert(0, args.reference)
+    
+    print(f"📊 PDF Backend Benchmark - {len(pdf_paths)} documents, reference: {args.reference}")
+    print("=" * 60)
+    
+    results = {name: benchmark_backend(installed[name], pdf_paths, args.repeat) for name in names}
+    reference_texts = results[args.reference][0]
+    
+    print(f"{'backend':<10} {'pages':>7} {'seconds':>9} {'pages/sec':>10} {'similarity':>11}")
+    for name in names:
+        texts, pages, elapsed = results[name]
+        similarity = sum(text_similarity(reference_texts[path], texts[path]) for path in pdf_paths) / len(pdf_paths)
+        rate = pages / elapsed if elapsed else float("inf")
+        print(f"{name:<10} {pages:>7} {elapsed:>9.2f} {rate:>10.1f} {similarity:>11.3f}")
+
+if __name__ == "__main__":
+    main()
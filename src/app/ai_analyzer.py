@@ -3,25 +3,129 @@ AI-powered document analysis using OpenAI GPT models.
 """
 
 import os
+import asyncio
 import logging
 import json
-import openai
-from typing import Dict, Any, List
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
+from pydantic import ValidationError
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
 from dotenv import load_dotenv
 
+try:
+    from ..config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+try:
+    from .analysis_schemas import analysis_model, combined_model, response_format, validate_item
+    from .chunking import context_window, count_tokens, merge_analyses, request_tokens, split_document
+    from .contract_forms import fingerprint, redact_declared_values, split_declarations
+    from .llm_cache import LLMResponseCache, get_response_cache
+    from .openai_client import get_async_openai_client, get_openai_client, run_async, submit_async
+    from .rate_limiter import RateLimiter, get_rate_limiter
+    from .retry import RetryPolicy, get_retry_policy
+    from .stream_parser import IncrementalJSONParser
+    from .llm_transport import (
+        TRANSPORT_MODES, AsyncRecordingClient, AsyncReplayClient, CassetteStore, RecordingClient, ReplayClient,
+        replay_latency
+    )
+    from .telemetry import MetricsSink, estimate_cost, get_metrics_sink, new_call_record, summarize
+    from .text_cleanup import CHARS_PER_TOKEN
+except ImportError:
+    from analysis_schemas import analysis_model, combined_model, response_format, validate_item
+    from chunking import context_window, count_tokens, merge_analyses, request_tokens, split_document
+    from contract_forms import fingerprint, redact_declared_values, split_declarations
+    from llm_cache import LLMResponseCache, get_response_cache
+    from openai_client import get_async_openai_client, get_openai_client, run_async, submit_async
+    from rate_limiter import RateLimiter, get_rate_limiter
+    from retry import RetryPolicy, get_retry_policy
+    from stream_parser import IncrementalJSONParser
+    from llm_transport import (
+        TRANSPORT_MODES, AsyncRecordingClient, AsyncReplayClient, CassetteStore, RecordingClient, ReplayClient,
+        replay_latency
+    )
+    from telemetry import MetricsSink, estimate_cost, get_metrics_sink, new_call_record, summarize
+    from text_cleanup import CHARS_PER_TOKEN
+
 load_dotenv()
 
+# (field, item) for a completed list item, or ('done', full analysis)
+StreamEvent = Tuple[str, Any]
+
+# Appended to the system prompt on the cascade's fast tier so its answer can be judged
+CONFIDENCE_INSTRUCTION = """
+
+Also include a top-level "confidence" field: a number from 0 to 1 for how sure you are that this analysis is complete and correct."""
+
+# System prompt lead-in for combined mode, followed by each document type's own prompt
+COMBINED_INSTRUCTION = """You are an expert insurance claims analyst. The user message contains several documents from one claim, each starting with a header line such as "=== CONTRACT ===".
+
+Analyze every document as its section below describes. Return one JSON object with a key per document type (e.g. "contract"), each holding that document's analysis in the format its section shows."""
+
+# Request field (stripped before the API call) that replaces the user message in the cache key
+CACHE_CONTENT_FIELD = '_cache_content'
+
+# Prompt tokens kept free per chunk for the part label and the cascade's confidence instruction
+CHUNK_RESERVE_TOKENS = 64
+
+# User message lead-in for each document type; model and token budget come from Settings routes
+DOCUMENT_INSTRUCTIONS = {
+    'contract': "Analyze this insurance contract",
+    'inspection': "Analyze this inspection report",
+    'acv': "Analyze this ACV document",
+    'history': "Analyze this vehicle history",
+    'adjuster': "Analyze this adjuster assessment"
+}
+
 class AIAnalyzer:
     """AI-powered document analysis using OpenAI GPT models."""
     
-    def __init__(self):
+    def __init__(self, rate_limiter: RateLimiter = None, cache: LLMResponseCache = None,
+                 cascade: bool = None, confidence_threshold: float = None, retry_policy: RetryPolicy = None,
+                 combined: bool = None, metrics_sink: MetricsSink = None, transport: str = None):
+        # Record saves every response as a cassette; replay serves cassettes offline, without a key
+        self.transport = settings.LLM_TRANSPORT if transport is None else transport
+        if self.transport not in TRANSPORT_MODES:
+            raise ValueError(f"Unknown LLM transport {self.transport!r}; expected one of {', '.join(TRANSPORT_MODES)}")
+        self.cassettes = CassetteStore(settings.LLM_CASSETTE_PATH) if self.transport != 'live' else None
+        
         # Use the API key from environment variables only
         api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
+        if not api_key and self.transport != 'replay':
             raise ValueError("OPENAI_API_KEY environment variable is required")
-        self.client = openai.OpenAI(api_key=api_key)
+        self.api_key = api_key
+        if self.transport == 'replay':
+            self.client = ReplayClient(self.cassettes, replay_latency(), settings.LLM_REPLAY_LATENCY_SCALE)
+        else:
+            # Process-wide client, so keep-alive connections outlive this analyzer
+            self.client = get_openai_client(api_key)
+            if self.transport == 'record':
+                self.client = RecordingClient(self.client, self.cassettes)
         self.logger = logging.getLogger(__name__)
         
+        # Shared across analyzers so concurrent sessions respect one RPM/TPM quota
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        # Retries transient failures and hedges calls slower than the model's recent p95
+        self.retry_policy = retry_policy or get_retry_policy()
+        
+        # Cascade mode tries OPENAI_FAST_MODEL first and escalates below the confidence threshold
+        self.cascade = settings.ANALYSIS_CASCADE if cascade is None else cascade
+        self.confidence_threshold = (
+            settings.CONFIDENCE_THRESHOLD if confidence_threshold is None else confidence_threshold
+        )
+        
+        # Combined mode analyzes a whole claim in one call when it fits ANALYSIS_COMBINED_TOKENS
+        self.combined = settings.ANALYSIS_COMBINED if combined is None else combined
+        
+        # One telemetry record per call: kept here for the claim summary and exported to the shared sink
+        self.metrics_sink = metrics_sink if metrics_sink is not None else get_metrics_sink()
+        self.call_records: List[Dict[str, Any]] = []
+        self._records_lock = threading.Lock()
+        
         # Analysis prompts for different document types
         self.prompts = {
             'contract': self._get_contract_prompt(),
@@ -30,101 +134,692 @@ class AIAnalyzer:
             'history': self._get_history_prompt(),
             'adjuster': self._get_adjuster_prompt()
         }
-    
-    def analyze_contract(self, content: str) -> Dict[str, Any]:
-        """Analyze insurance contract for coverage terms and exclusions."""
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": self.prompts['contract']},
-                    {"role": "user", "content": f"Analyze this insurance contract:\n\n{content}"}
-                ],
-                temperature=0.1,
-                max_tokens=2000
+        
+        # Response models compiled from each prompt's JSON example, keyed by the system prompt sent
+        self.schemas = {}
+        for doc_type, prompt in self.prompts.items():
+            name = f"{doc_type.title()}Analysis"
+            self.schemas[prompt] = analysis_model(prompt, name)
+            self.schemas[prompt + CONFIDENCE_INSTRUCTION] = analysis_model(prompt, name, with_confidence=True)
+        
+        # One composite prompt and schema for every set of two or more document types
+        self.combined_prompts = {}
+        for size in range(2, len(self.prompts) + 1):
+            for doc_types in combinations(self.prompts, size):
+                prompt = self._get_combined_prompt(doc_types)
+                self.combined_prompts[doc_types] = prompt
+                self.schemas[prompt] = combined_model(
+                    tuple((doc_type, self.schemas[self.prompts[doc_type]]) for doc_type in doc_types)
+                )
+        
+        # Shared response cache; drop answers from prompt templates that have since changed
+        self.cache = cache if cache is not None else get_response_cache()
+        if self.cache is not None:
+            self.cache.retain_prompts(
+                LLMResponseCache.prompt_hash(prompt) for prompt in self.schemas
             )
+    
+    def analyze_contract(self, content: str, stream: bool = False) -> Union[Dict[str, Any], Iterator[StreamEvent]]:
+        """
+        Analyze insurance contract for coverage terms and exclusions.
+        
+        Every analyze_* method takes stream=True to return an iterator of
+        (field, item) events instead: each red flag, finding or other list
+        item as soon as the model finishes writing it, then ('done', analysis)
+        with the full result.
+        """
+        return self._stream('contract', content) if stream else self._analyze('contract', content)
+    
+    def analyze_inspection(self, content: str, stream: bool = False) -> Union[Dict[str, Any], Iterator[StreamEvent]]:
+        """Analyze vehicle inspection report for damage and condition issues."""
+        return self._stream('inspection', content) if stream else self._analyze('inspection', content)
+    
+    def analyze_acv(self, content: str, stream: bool = False) -> Union[Dict[str, Any], Iterator[StreamEvent]]:
+        """Analyze ACV value document for valuation accuracy."""
+        return self._stream('acv', content) if stream else self._analyze('acv', content)
+    
+    def analyze_history(self, content: str, stream: bool = False) -> Union[Dict[str, Any], Iterator[StreamEvent]]:
+        """Analyze vehicle history report for title issues and accidents."""
+        return self._stream('history', content) if stream else self._analyze('history', content)
+    
+    def analyze_adjuster(self, content: str, stream: bool = False) -> Union[Dict[str, Any], Iterator[StreamEvent]]:
+        """Analyze adjuster assessment form for recommendations and concerns."""
+        return self._stream('adjuster', content) if stream else self._analyze('adjuster', content)
+    
+    def analyze_all(self, documents: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze every document of a claim concurrently.
+        
+        All requests are in flight at once, so a claim takes about as long as
+        its slowest document. A failure only affects its own document, which
+        gets the usual error response.
+        
+        Args:
+            documents: Document text keyed by document type
             
-            return self._parse_analysis_response(response.choices[0].message.content)
+        Returns:
+            dict: Analysis results keyed by document type
+        """
+        return run_async(self.analyze_all_async(documents))
+    
+    async def analyze_all_async(self, documents: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Coroutine form of analyze_all, for callers already running an event loop."""
+        client = self._async_client()
+        analyses = {}
+        if self._use_combined(documents):
+            analyses = await self._analyze_combined_async(client, documents)
+        
+        # Everything the combined call did not cover is analyzed per document
+        doc_types = [doc_type for doc_type in documents if doc_type not in analyses]
+        results = await asyncio.gather(
+            *(self._analyze_async(client, doc_type, documents[doc_type]) for doc_type in doc_types),
+            return_exceptions=True
+        )
+        
+        for doc_type, result in zip(doc_types, results):
+            if isinstance(result, BaseException):
+                self.logger.error(f"Error analyzing {doc_type}: {result}")
+                result = self._get_error_response(doc_type)
+            analyses[doc_type] = result
+        return analyses
+    
+    def stream_all(self, documents: Dict[str, str]) -> Iterator[Tuple[str, str, Any]]:
+        """
+        Analyze every document concurrently, yielding results as they are produced.
+        
+        Args:
+            documents: Document text keyed by document type
             
+        Yields:
+            tuple: (doc_type, field, item) for each completed list item, and
+                (doc_type, 'done', analysis) once a document is finished
+        """
+        events = queue.Queue()
+        
+        async def stream_document(client, doc_type: str) -> None:
+            def emit(field: str, item: Any) -> None:
+                events.put((doc_type, field, item))
+            
+            try:
+                analysis = await self._stream_async(client, doc_type, documents[doc_type], emit)
+            except Exception as e:
+                self.logger.error(f"Error analyzing {doc_type}: {e}")
+                analysis = self._get_error_response(doc_type)
+            events.put((doc_type, 'done', analysis))
+        
+        async def stream_documents() -> None:
+            client = self._async_client()
+            remaining = list(documents)
+            if self._use_combined(documents):
+                # One JSON object holds every document, so results are replayed once the call finishes
+                analyses = await self._analyze_combined_async(client, documents)
+                for doc_type, analysis in analyses.items():
+                    for field, item in self._replay(analysis):
+                        events.put((doc_type, field, item))
+                remaining = [doc_type for doc_type in documents if doc_type not in analyses]
+            await asyncio.gather(*(stream_document(client, doc_type) for doc_type in remaining))
+        
+        # Requests run on the shared loop while this thread hands events to the caller
+        finished = object()
+        future = submit_async(stream_documents())
+        # Posted however the run ends, so an early failure cannot leave the consumer waiting
+        future.add_done_callback(lambda _: events.put(finished))
+        while True:
+            event = events.get()
+            if event is finished:
+                break
+            yield event
+        future.result()
+    
+    def _with_response_format(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Constrain the request's output to its schema, as far as the model supports it."""
+        request = {key: value for key, value in request.items() if key != 'response_format'}
+        constraint = response_format(
+            request['model'], self._schema(request), settings.OPENAI_STRUCTURED_OUTPUT
+        )
+        if constraint is not None:
+            request['response_format'] = constraint
+        return request
+    
+    def _schema(self, request: Dict[str, Any]) -> Optional[type]:
+        """Response model for a request, looked up by its system prompt."""
+        return self.schemas.get(request['messages'][0]['content'])
+    
+    def _async_client(self):
+        """Async client for the current event loop, wrapped for the configured transport."""
+        if self.transport == 'replay':
+            return AsyncReplayClient(self.cassettes, replay_latency(), settings.LLM_REPLAY_LATENCY_SCALE)
+        client = get_async_openai_client(self.api_key)
+        if self.transport == 'record':
+            return AsyncRecordingClient(client, self.cassettes)
+        return client
+    
+    def telemetry_summary(self) -> Dict[str, Any]:
+        """
+        Summarize every call this analyzer made, e.g. for one claim's report.
+        
+        Returns:
+            dict: Calls, cache hits, retries, tokens, estimated cost and time, overall and per model
+        """
+        with self._records_lock:
+            records = list(self.call_records)
+        return summarize(records)
+    
+    def _use_combined(self, documents: Dict[str, str]) -> bool:
+        """Whether a claim's documents should be analyzed in one combined call."""
+        if not self.combined or len(documents) < 2:
+            return False
+        model = settings.get_model_route('combined')['model']
+        total_tokens = sum(count_tokens(text, model) for text in documents.values())
+        if total_tokens > settings.ANALYSIS_COMBINED_TOKENS:
+            self.logger.info(
+                f"Claim has {total_tokens} document tokens, over the combined budget of "
+                f"{settings.ANALYSIS_COMBINED_TOKENS}; analyzing documents separately"
+            )
+            return False
+        
+        # The prompt, documents and output allowance must all fit the model, or the API rejects the call
+        request = self._build_combined_request(documents)
+        needed = request_tokens(request['messages'], model) + request['max_tokens']
+        if needed > context_window(model):
+            self.logger.info(
+                f"Combined request needs {needed} tokens, over the {context_window(model)}-token "
+                f"context of {model}; analyzing documents separately"
+            )
+            return False
+        return True
+    
+    def _build_combined_request(self, documents: Dict[str, str]) -> Dict[str, Any]:
+        """Build one chat completion that analyzes every document of a claim."""
+        doc_types = tuple(doc_type for doc_type in self.prompts if doc_type in documents)
+        route = settings.get_model_route('combined')
+        # Room for every document's answer, up to the combined output cap
+        max_tokens = min(
+            sum(settings.get_model_route(doc_type)['max_tokens'] for doc_type in doc_types),
+            settings.ANALYSIS_COMBINED_MAX_TOKENS
+        )
+        content = "\n\n".join(f"=== {doc_type.upper()} ===\n{documents[doc_type]}" for doc_type in doc_types)
+        return self._with_response_format({
+            'model': route['model'],
+            'messages': [
+                {"role": "system", "content": self.combined_prompts[doc_types]},
+                {"role": "user", "content": f"Analyze these claim documents:\n\n{content}"}
+            ],
+            'temperature': route['temperature'],
+            'max_tokens': max_tokens,
+            'timeout': route['timeout'],
+            '_doc_type': 'combined'
+        })
+    
+    async def _analyze_combined_async(self, client, documents: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze a claim's documents in one call.
+        
+        Returns:
+            dict: Analyses keyed by document type, only for the documents the
+                response covered; the caller analyzes the rest separately
+        """
+        try:
+            combined = await self._call_model_async(client, self._build_combined_request(documents))
         except Exception as e:
-            self.logger.error(f"Error analyzing contract: {e}")
-            return self._get_error_response("contract")
+            self.logger.error(f"Combined analysis failed, analyzing documents separately: {e}")
+            return {}
+        
+        analyses = {}
+        for doc_type in documents:
+            analysis = combined.get(doc_type)
+            if isinstance(analysis, dict):
+                analyses[doc_type] = self._validate(analysis, self.schemas[self.prompts[doc_type]])
+        missing = [doc_type for doc_type in documents if doc_type not in analyses]
+        if missing:
+            self.logger.warning(f"Combined response did not cover {', '.join(missing)}; analyzing separately")
+        return analyses
     
-    def analyze_inspection(self, content: str) -> Dict[str, Any]:
-        """Analyze vehicle inspection report for damage and condition issues."""
+    def _build_request(self, doc_type: str, content: str, part: str = None) -> Dict[str, Any]:
+        """Build the chat completion arguments for one document or one part of it."""
+        route = settings.get_model_route(doc_type)
+        instruction = DOCUMENT_INSTRUCTIONS[doc_type]
+        if part:
+            instruction = f"{instruction} ({part})"
+        return self._with_response_format({
+            'model': route['model'],
+            'messages': [
+                {"role": "system", "content": self.prompts[doc_type]},
+                {"role": "user", "content": f"{instruction}:\n\n{content}"}
+            ],
+            'temperature': route['temperature'],
+            'max_tokens': route['max_tokens'],
+            'timeout': route['timeout'],
+            '_doc_type': doc_type
+        })
+    
+    def _chunk_tokens(self, doc_type: str, model: str) -> int:
+        """
+        Document tokens allowed per call for a document type.
+        
+        ANALYSIS_CHUNK_TOKENS, capped so the prompt, the document part and the
+        output allowance fit the model's context window; a request over the
+        window is rejected by the API and not retried.
+        """
+        empty = self._build_request(doc_type, "")
+        room = (context_window(model) - request_tokens(empty['messages'], model)
+                - empty['max_tokens'] - CHUNK_RESERVE_TOKENS)
+        if settings.ANALYSIS_CHUNK_TOKENS and settings.ANALYSIS_CHUNK_TOKENS <= room:
+            return settings.ANALYSIS_CHUNK_TOKENS
+        return max(room, 1)
+    
+    def _build_requests(self, doc_type: str, content: str) -> List[Dict[str, Any]]:
+        """Build one request per chunk, splitting documents too long for a single call."""
+        model = settings.get_model_route(doc_type)['model']
+        chunk_tokens = self._chunk_tokens(doc_type, model)
+        if doc_type == 'contract' and settings.CONTRACT_FORM_CACHE and self.cache is not None:
+            sections = split_declarations(content)
+            if sections is not None and count_tokens(sections[0], model) <= chunk_tokens:
+                return self._build_contract_requests(*sections, chunk_tokens, model)
+        
+        chunks = split_document(content, chunk_tokens, model)
+        if len(chunks) == 1:
+            return [self._build_request(doc_type, content)]
+        
+        self.logger.info(f"Analyzing {doc_type} in {len(chunks)} parts")
+        return [
+            self._build_request(doc_type, chunk, f"part {i + 1} of {len(chunks)}")
+            for i, chunk in enumerate(chunks)
+        ]
+    
+    def _build_contract_requests(self, declarations: str, form: str, chunk_tokens: int,
+                                 model: str) -> List[Dict[str, Any]]:
+        """
+        Build the declarations request plus policy-form requests cached by form fingerprint.
+        
+        The form is the same for every claim written on it, so its analysis is
+        keyed by the fingerprint of its normalized text rather than its exact
+        content; after the first claim on a form only the declarations page,
+        with the policyholder's own limits and deductibles, reaches the model.
+        Policyholder details the form repeats are redacted first, so the shared
+        analysis cannot quote them.
+        """
+        requests = [self._build_request('contract', declarations, "declarations page")]
+        form = redact_declared_values(form, declarations)
+        chunks = split_document(form, chunk_tokens, model)
+        for i, chunk in enumerate(chunks):
+            part = "policy form" if len(chunks) == 1 else f"policy form part {i + 1} of {len(chunks)}"
+            request = self._build_request('contract', chunk, f"{part}; the declarations page is analyzed separately")
+            request[CACHE_CONTENT_FIELD] = f"contract-form:{fingerprint(chunk)}"
+            requests.append(request)
+        return requests
+    
+    def _api_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Chat completion arguments of a request, without the analyzer's private fields."""
+        return {key: value for key, value in request.items() if not key.startswith('_')}
+    
+    def _estimate_tokens(self, request: Dict[str, Any]) -> int:
+        """Estimate prompt plus worst-case completion tokens for rate limiting."""
+        prompt_chars = sum(len(message['content']) for message in request['messages'])
+        return prompt_chars // CHARS_PER_TOKEN + request['max_tokens']
+    
+    def _record_usage(self, estimated_tokens: int, response, record: Dict[str, Any] = None) -> None:
+        """Settle the rate limiter's token estimate against the reported usage, noting it in the call record."""
+        usage = getattr(response, 'usage', None)
+        total_tokens = getattr(usage, 'total_tokens', None)
+        if isinstance(total_tokens, int):
+            self.rate_limiter.adjust(estimated_tokens - total_tokens)
+            if record is not None:
+                for field in ('prompt_tokens', 'completion_tokens'):
+                    count = getattr(usage, field, None)
+                    record[field] = count if isinstance(count, int) else None
+                record['total_tokens'] = total_tokens
+    
+    def _start_call(self, request: Dict[str, Any], cache_key: Optional[str], stream: bool = False) -> Dict[str, Any]:
+        """Open the telemetry record for a call that missed the cache."""
+        return new_call_record(request['model'], request.get('_doc_type'), "off" if cache_key is None else "miss", stream)
+    
+    def _timed_attempt(self, record: Dict[str, Any], estimated_tokens: int, send):
+        """Wrap one blocking API call for the retry policy, timing its rate-limiter wait."""
+        def attempt():
+            started = time.monotonic()
+            record['attempts'] += 1
+            self.rate_limiter.acquire(estimated_tokens)
+            record['_sent'] = time.monotonic()
+            record['queue_wait'] += record['_sent'] - started
+            return send()
+        return attempt
+    
+    def _timed_attempt_async(self, record: Dict[str, Any], estimated_tokens: int, send):
+        """Async form of _timed_attempt; send returns a new coroutine each time."""
+        async def attempt():
+            started = time.monotonic()
+            record['attempts'] += 1
+            await self.rate_limiter.acquire_async(estimated_tokens)
+            record['_sent'] = time.monotonic()
+            record['queue_wait'] += record['_sent'] - started
+            return await send()
+        return attempt
+    
+    def _finish_call(self, record: Dict[str, Any], error: Exception = None) -> None:
+        """Complete a telemetry record and hand it to the claim's records and the metrics sink."""
+        sent = record.pop('_sent', None)
+        if sent is not None:
+            record['latency'] = time.monotonic() - sent
+        # Hedged duplicates count as attempts too
+        record['retries'] = max(record['attempts'] - 1, 0)
+        record['cost'] = estimate_cost(record['model'], record['prompt_tokens'], record['completion_tokens'])
+        if error is not None:
+            record['status'] = "error"
+            record['error'] = f"{type(error).__name__}: {error}"
+        
+        with self._records_lock:
+            self.call_records.append(record)
+        if self.metrics_sink is not None:
+            try:
+                self.metrics_sink.record(record)
+            except Exception as e:
+                # Telemetry must never fail an analysis
+                self.logger.warning(f"Could not export call telemetry: {e}")
+    
+    def _cache_key(self, request: Dict[str, Any]) -> Optional[str]:
+        """Get the response cache key for a request, or None when caching is off."""
+        if self.cache is None:
+            return None
+        system_message, user_message = request['messages']
+        content = request.get(CACHE_CONTENT_FIELD, user_message['content'])
+        return LLMResponseCache.make_key(
+            request['model'], system_message['content'], content, request['max_tokens']
+        )
+    
+    def _get_cached_analysis(self, request: Dict[str, Any], cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Parse a cached response for the key, if there is one."""
+        if cache_key is None:
+            return None
+        response_text = self.cache.get(cache_key)
+        if response_text is None:
+            return None
+        self._finish_call(new_call_record(request['model'], request.get('_doc_type'), "hit"))
+        return self._parse_analysis_response(response_text, self._schema(request))
+    
+    def _finish_analysis(self, request: Dict[str, Any], cache_key: Optional[str], response_text: str) -> Dict[str, Any]:
+        """Parse a fresh response, caching it only if it parsed into structured JSON."""
+        analysis = self._parse_analysis_response(response_text, self._schema(request))
+        if cache_key is not None and 'analysis' not in analysis and 'error' not in analysis:
+            self.cache.put(cache_key, response_text)
+        return analysis
+    
+    def _use_cascade(self, request: Dict[str, Any]) -> bool:
+        """Whether a request should try the fast tier first."""
+        return self.cascade and request['model'] != settings.OPENAI_FAST_MODEL
+    
+    def _fast_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Fast-tier variant of a request that also asks the model for its confidence."""
+        system_message, user_message = request['messages']
+        return self._with_response_format({
+            **request,
+            'model': settings.OPENAI_FAST_MODEL,
+            'messages': [
+                {**system_message, 'content': system_message['content'] + CONFIDENCE_INSTRUCTION},
+                user_message
+            ]
+        })
+    
+    def _escalation_reason(self, analysis: Dict[str, Any]) -> Optional[str]:
+        """Why a fast-tier analysis must be redone on the routed model, or None to accept it."""
+        if 'error' in analysis or 'analysis' in analysis:
+            return "response was not valid JSON"
+        
+        confidence = analysis.get('confidence')
+        if not isinstance(confidence, (int, float)) or confidence < self.confidence_threshold:
+            return f"confidence {confidence} is below {self.confidence_threshold}"
+        
+        if settings.CASCADE_CONFIRM_CRITICAL and any(
+            isinstance(flag, dict) and str(flag.get('severity', '')).upper() == 'CRITICAL'
+            for flag in analysis.get('red_flags', [])
+        ):
+            return "CRITICAL red flag needs confirmation"
+        return None
+    
+    def _accept_fast_tier(self, request: Dict[str, Any], analysis: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the fast-tier analysis if it can stand, otherwise log why it is escalated."""
+        reason = self._escalation_reason(analysis)
+        if reason is None:
+            return analysis
+        self.logger.info(f"Escalating from {settings.OPENAI_FAST_MODEL} to {request['model']}: {reason}")
+        return None
+    
+    def _try_fast_tier(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Run the fast tier with a blocking call; None means escalate."""
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": self.prompts['inspection']},
-                    {"role": "user", "content": f"Analyze this inspection report:\n\n{content}"}
-                ],
-                temperature=0.1,
-                max_tokens=2000
-            )
-            
-            return self._parse_analysis_response(response.choices[0].message.content)
-            
+            analysis = self._call_model(self._fast_request(request))
         except Exception as e:
-            self.logger.error(f"Error analyzing inspection: {e}")
-            return self._get_error_response("inspection")
+            analysis = {'error': str(e)}
+        return self._accept_fast_tier(request, analysis)
     
-    def analyze_acv(self, content: str) -> Dict[str, Any]:
-        """Analyze ACV value document for valuation accuracy."""
+    async def _try_fast_tier_async(self, client, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Run the fast tier with a non-blocking call; None means escalate."""
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": self.prompts['acv']},
-                    {"role": "user", "content": f"Analyze this ACV document:\n\n{content}"}
-                ],
-                temperature=0.1,
-                max_tokens=1500
-            )
+            analysis = await self._call_model_async(client, self._fast_request(request))
+        except Exception as e:
+            analysis = {'error': str(e)}
+        return self._accept_fast_tier(request, analysis)
+    
+    def _complete(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the parsed analysis for one request, trying the fast tier first in cascade mode."""
+        if self._use_cascade(request):
+            analysis = self._try_fast_tier(request)
+            if analysis is not None:
+                return analysis
+        return self._call_model(request)
+    
+    async def _complete_async(self, client, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Async form of _complete."""
+        if self._use_cascade(request):
+            analysis = await self._try_fast_tier_async(client, request)
+            if analysis is not None:
+                return analysis
+        return await self._call_model_async(client, request)
+    
+    def _call_model(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the parsed analysis for one request, from the cache or a blocking API call."""
+        cache_key = self._cache_key(request)
+        cached = self._get_cached_analysis(request, cache_key)
+        if cached is not None:
+            return cached
+        
+        estimated_tokens = self._estimate_tokens(request)
+        record = self._start_call(request, cache_key)
+        attempt = self._timed_attempt(
+            record, estimated_tokens, lambda: self.client.chat.completions.create(**self._api_request(request))
+        )
+        try:
+            response = self.retry_policy.call(attempt, request['model'])
+        except Exception as e:
+            self._finish_call(record, e)
+            raise
+        self._record_usage(estimated_tokens, response, record)
+        self._finish_call(record)
+        
+        return self._finish_analysis(request, cache_key, response.choices[0].message.content)
+    
+    async def _call_model_async(self, client, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the parsed analysis for one request, from the cache or a non-blocking API call."""
+        cache_key = self._cache_key(request)
+        cached = self._get_cached_analysis(request, cache_key)
+        if cached is not None:
+            return cached
+        
+        estimated_tokens = self._estimate_tokens(request)
+        record = self._start_call(request, cache_key)
+        attempt = self._timed_attempt_async(
+            record, estimated_tokens, lambda: client.chat.completions.create(**self._api_request(request))
+        )
+        try:
+            response = await self.retry_policy.call_async(attempt, request['model'])
+        except Exception as e:
+            self._finish_call(record, e)
+            raise
+        self._record_usage(estimated_tokens, response, record)
+        self._finish_call(record)
+        
+        return self._finish_analysis(request, cache_key, response.choices[0].message.content)
+    
+    def _complete_part(self, doc_type: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze one part of a long document, isolating its failure from the other parts."""
+        try:
+            return self._complete(request)
+        except Exception as e:
+            self.logger.error(f"Error analyzing part of {doc_type}: {e}")
+            return self._get_error_response(doc_type)
+    
+    def _analyze(self, doc_type: str, content: str) -> Dict[str, Any]:
+        """Run a blocking analysis of one document; parts of long documents run in parallel threads."""
+        try:
+            requests = self._build_requests(doc_type, content)
+            if len(requests) == 1:
+                return self._complete(requests[0])
             
-            return self._parse_analysis_response(response.choices[0].message.content)
+            workers = min(len(requests), settings.ANALYSIS_CHUNK_CONCURRENCY)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                analyses = list(pool.map(lambda request: self._complete_part(doc_type, request), requests))
+            return merge_analyses(analyses)
             
         except Exception as e:
-            self.logger.error(f"Error analyzing ACV: {e}")
-            return self._get_error_response("acv")
+            self.logger.error(f"Error analyzing {doc_type}: {e}")
+            return self._get_error_response(doc_type)
     
-    def analyze_history(self, content: str) -> Dict[str, Any]:
-        """Analyze vehicle history report for title issues and accidents."""
+    async def _analyze_async(self, client, doc_type: str, content: str) -> Dict[str, Any]:
+        """Run a non-blocking analysis of one document; parts of long documents run concurrently."""
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": self.prompts['history']},
-                    {"role": "user", "content": f"Analyze this vehicle history:\n\n{content}"}
-                ],
-                temperature=0.1,
-                max_tokens=1500
-            )
+            requests = self._build_requests(doc_type, content)
+            if len(requests) == 1:
+                return await self._complete_async(client, requests[0])
             
-            return self._parse_analysis_response(response.choices[0].message.content)
+            results = await asyncio.gather(
+                *(self._complete_async(client, request) for request in requests),
+                return_exceptions=True
+            )
+            analyses = []
+            for result in results:
+                if isinstance(result, BaseException):
+                    self.logger.error(f"Error analyzing part of {doc_type}: {result}")
+                    result = self._get_error_response(doc_type)
+                analyses.append(result)
+            return merge_analyses(analyses)
             
         except Exception as e:
-            self.logger.error(f"Error analyzing history: {e}")
-            return self._get_error_response("history")
+            self.logger.error(f"Error analyzing {doc_type}: {e}")
+            return self._get_error_response(doc_type)
     
-    def analyze_adjuster(self, content: str) -> Dict[str, Any]:
-        """Analyze adjuster assessment form for recommendations and concerns."""
+    def _stream_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Streaming variant of a request; the final chunk reports token usage."""
+        return {**self._api_request(request), 'stream': True, 'stream_options': {"include_usage": True}}
+    
+    def _replay(self, analysis: Dict[str, Any]) -> Iterator[StreamEvent]:
+        """Events for an analysis that is already complete (cache hit or multi-part merge)."""
+        for field, value in analysis.items():
+            if isinstance(value, list):
+                for item in value:
+                    yield field, item
+        yield 'done', analysis
+    
+    def _stream(self, doc_type: str, content: str) -> Iterator[StreamEvent]:
+        """Stream a blocking analysis of one document as (field, item) events."""
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": self.prompts['adjuster']},
-                    {"role": "user", "content": f"Analyze this adjuster assessment:\n\n{content}"}
-                ],
-                temperature=0.1,
-                max_tokens=1500
+            requests = self._build_requests(doc_type, content)
+            if len(requests) > 1:
+                # Parts are merged before anything is final, so there is nothing to stream early
+                yield from self._replay(self._analyze(doc_type, content))
+                return
+            
+            request = requests[0]
+            cache_key = self._cache_key(request)
+            cached = self._get_cached_analysis(request, cache_key)
+            if cached is not None:
+                yield from self._replay(cached)
+                return
+            
+            # The fast tier is quick enough to run whole; only an escalation is streamed
+            if self._use_cascade(request):
+                fast_analysis = self._try_fast_tier(request)
+                if fast_analysis is not None:
+                    yield from self._replay(fast_analysis)
+                    return
+            
+            estimated_tokens = self._estimate_tokens(request)
+            record = self._start_call(request, cache_key, stream=True)
+            attempt = self._timed_attempt(
+                record, estimated_tokens, lambda: self.client.chat.completions.create(**self._stream_request(request))
             )
+            parser = IncrementalJSONParser()
+            response_text = []
+            try:
+                # Only opening the stream is retried; items already yielded cannot be taken back
+                stream = self.retry_policy.call(attempt, request['model'], hedge=False)
+                for chunk in stream:
+                    self._record_usage(estimated_tokens, chunk, record)
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content or ""
+                    response_text.append(delta)
+                    for field, item in parser.feed(delta):
+                        yield field, validate_item(self._schema(request), field, item)
+            except Exception as e:
+                self._finish_call(record, e)
+                raise
+            self._finish_call(record)
             
-            return self._parse_analysis_response(response.choices[0].message.content)
+            analysis = self._finish_analysis(request, cache_key, "".join(response_text))
             
         except Exception as e:
-            self.logger.error(f"Error analyzing adjuster assessment: {e}")
-            return self._get_error_response("adjuster")
+            self.logger.error(f"Error analyzing {doc_type}: {e}")
+            analysis = self._get_error_response(doc_type)
+        yield 'done', analysis
+    
+    async def _stream_async(self, client, doc_type: str, content: str, emit) -> Dict[str, Any]:
+        """Stream a non-blocking analysis of one document, calling emit(field, item) per completed item."""
+        requests = self._build_requests(doc_type, content)
+        if len(requests) > 1:
+            analysis = await self._analyze_async(client, doc_type, content)
+            for field, item in self._replay(analysis):
+                if field != 'done':
+                    emit(field, item)
+            return analysis
+        
+        request = requests[0]
+        cache_key = self._cache_key(request)
+        cached = self._get_cached_analysis(request, cache_key)
+        if cached is None and self._use_cascade(request):
+            cached = await self._try_fast_tier_async(client, request)
+        if cached is None:
+            estimated_tokens = self._estimate_tokens(request)
+            record = self._start_call(request, cache_key, stream=True)
+            attempt = self._timed_attempt_async(
+                record, estimated_tokens, lambda: client.chat.completions.create(**self._stream_request(request))
+            )
+            parser = IncrementalJSONParser()
+            response_text = []
+            try:
+                stream = await self.retry_policy.call_async(attempt, request['model'], hedge=False)
+                async for chunk in stream:
+                    self._record_usage(estimated_tokens, chunk, record)
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content or ""
+                    response_text.append(delta)
+                    for field, item in parser.feed(delta):
+                        emit(field, validate_item(self._schema(request), field, item))
+            except Exception as e:
+                self._finish_call(record, e)
+                raise
+            self._finish_call(record)
+            return self._finish_analysis(request, cache_key, "".join(response_text))
+        
+        for field, item in self._replay(cached):
+            if field != 'done':
+                emit(field, item)
+        return cached
+    
+    def _get_combined_prompt(self, doc_types: Tuple[str, ...]) -> str:
+        """Get the prompt for analyzing several document types in one call."""
+        sections = [f"## {doc_type}\n\n{self.prompts[doc_type]}" for doc_type in doc_types]
+        return "\n\n".join([COMBINED_INSTRUCTION] + sections)
     
     def _get_contract_prompt(self) -> str:
         """Get the prompt for contract analysis."""
@@ -261,8 +956,8 @@ Return your analysis in this JSON format:
     "recommendations": ["list of recommendations"]
 }"""
 
-    def _parse_analysis_response(self, response_text: str) -> Dict[str, Any]:
-        """Parse the AI response and extract structured data."""
+    def _parse_analysis_response(self, response_text: str, schema: type = None) -> Dict[str, Any]:
+        """Parse the AI response and extract structured data, validated against schema when given."""
         try:
             # Try to extract JSON from the response
             start_idx = response_text.find('{')
@@ -270,7 +965,7 @@ Return your analysis in this JSON format:
             
             if start_idx != -1 and end_idx != 0:
                 json_str = response_text[start_idx:end_idx]
-                return json.loads(json_str)
+                return self._validate(json.loads(json_str), schema)
             else:
                 # Fallback to structured text parsing
                 return self._parse_fallback_response(response_text)
@@ -282,6 +977,16 @@ Return your analysis in this JSON format:
             self.logger.error(f"Error parsing response: {e}")
             return self._get_error_response("unknown")
     
+    def _validate(self, analysis: Any, schema: type = None) -> Any:
+        """Normalize parsed JSON through the response model, keeping it as-is if it does not fit."""
+        if schema is None or not isinstance(analysis, dict):
+            return analysis
+        try:
+            return schema.model_validate(analysis).model_dump()
+        except ValidationError as e:
+            self.logger.warning(f"Response does not match {schema.__name__}: {e.error_count()} error(s)")
+            return analysis
+    
     def _parse_fallback_response(self, response_text: str) -> Dict[str, Any]:
         """Parse response when JSON parsing fails."""
         return {
@@ -0,0 +1,168 @@
+"""
+Pydantic models and structured-output schemas derived from the analysis prompt templates.
+"""
+
+import json
+import re
+from functools import lru_cache
+from typing import Annotated, Any, Dict, List, Literal, Optional, Tuple, Type
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, TypeAdapter, ValidationError, create_model
+
+# Template placeholders like "LOW|MEDIUM|HIGH|CRITICAL" become enums
+_CHOICES_RE = re.compile(r"^[A-Z_]+(\|[A-Z_]+)+$")
+
+# Model name prefixes that support response_format json_schema, and the older ones limited to json_object
+_JSON_SCHEMA_MODELS = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
+_JSON_OBJECT_MODELS = ("gpt-4-turbo", "gpt-4-1106", "gpt-4-0125", "gpt-3.5-turbo")
+
+def _upper(value: Any) -> Any:
+    """Accept enum values in any case, e.g. "High" for "HIGH"."""
+    return value.upper() if isinstance(value, str) else value
+
+def _class_name(field: str) -> str:
+    """Model name for the items of a list field, e.g. red_flags -> RedFlag."""
+    singular = field[:-1] if field.endswith('s') else field
+    return "".join(part.title() for part in singular.split('_'))
+
+def _field_definition(name: str, example: Any) -> Tuple[Any, Any]:
+    """Infer a pydantic (type, default) pair from a template example value."""
+    if isinstance(example, str):
+        if _CHOICES_RE.match(example):
+            choices = Literal[tuple(example.split('|'))]
+            return Annotated[choices, BeforeValidator(_upper)], ...
+        return str, ""
+    if isinstance(example, bool):
+        return bool, False
+    if isinstance(example, (int, float)):
+        return float, 0.0
+    if isinstance(example, dict):
+        return _model_from_example(_class_name(name), example), ...
+    if isinstance(example, list):
+        if example and isinstance(example[0], dict):
+            item_model = _model_from_example(_class_name(name), example[0])
+            return List[item_model], Field(default_factory=list)
+        return List[str], Field(default_factory=list)
+    return Any, None
+
+def _model_from_example(name: str, example: Dict[str, Any], **extra_fields: Tuple[Any, Any]) -> Type[BaseModel]:
+    """Build a pydantic model whose fields mirror a JSON example object."""
+    fields = {key: _field_definition(key, value) for key, value in example.items()}
+    fields.update(extra_fields)
+    return create_model(name, __config__=ConfigDict(extra='ignore'), **fields)
+
+def template_example(prompt: str) -> Dict[str, Any]:
+    """
+    Extract the JSON format example from an analysis prompt.
+    
+    The prompts end with "Return your analysis in this JSON format:" followed
+    by an example object, which is the single source of truth for the schema.
+    """
+    start = prompt.find('{')
+    end = prompt.rfind('}') + 1
+    return json.loads(prompt[start:end])
+
+@lru_cache(maxsize=None)
+def analysis_model(prompt: str, name: str, with_confidence: bool = False) -> Type[BaseModel]:
+    """
+    Get the compiled pydantic model for a prompt template, building it on first use.
+    
+    Args:
+        prompt: Analysis prompt containing the JSON format example
+        name: Model class name, e.g. "ContractAnalysis"
+        with_confidence: Add the cascade's 0-1 "confidence" field
+        
+    Returns:
+        type: Pydantic model class
+    """
+    extra = {'confidence': (float, 0.0)} if with_confidence else {}
+    return _model_from_example(name, template_example(prompt), **extra)
+
+@lru_cache(maxsize=None)
+def combined_model(parts: Tuple[Tuple[str, Type[BaseModel]], ...], name: str = "CombinedAnalysis") -> Type[BaseModel]:
+    """
+    Composite model for one response that analyzes several documents.
+    
+    Args:
+        parts: (document type, response model) pairs, one required field each
+        name: Model class name
+        
+    Returns:
+        type: Pydantic model class
+    """
+    fields = {doc_type: (model, ...) for doc_type, model in parts}
+    return create_model(name, __config__=ConfigDict(extra='ignore'), **fields)
+
+@lru_cache(maxsize=None)
+def _field_adapter(schema_model: Type[BaseModel], field: str) -> Optional[TypeAdapter]:
+    """Validator for one field of a response model, or None if the model has no such field."""
+    info = schema_model.model_fields.get(field)
+    return TypeAdapter(info.annotation) if info is not None else None
+
+def validate_item(schema_model: Optional[Type[BaseModel]], field: str, item: Any) -> Any:
+    """
+    Normalize one streamed list item the way validating the whole response would.
+    
+    Args:
+        schema_model: Response model, or None to pass the item through
+        field: List field the item belongs to, e.g. "red_flags"
+        item: Decoded list element
+        
+    Returns:
+        Normalized item, or the item unchanged if it does not fit the schema
+    """
+    adapter = _field_adapter(schema_model, field) if schema_model is not None else None
+    if adapter is None:
+        return item
+    try:
+        return adapter.dump_python(adapter.validate_python([item]))[0]
+    except ValidationError:
+        return item
+
+def _strict(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Adapt a pydantic JSON schema to OpenAI strict mode: closed objects, all fields required, no defaults."""
+    if isinstance(schema, list):
+        return [_strict(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    
+    strict = {key: _strict(value) for key, value in schema.items() if key not in ('default', 'title')}
+    if strict.get('type') == 'object' and 'properties' in schema:
+        # Property names are data here, so restore any that were dropped as keywords
+        strict['properties'] = {key: _strict(value) for key, value in schema['properties'].items()}
+        strict['required'] = list(strict['properties'])
+        strict['additionalProperties'] = False
+    return strict
+
+def response_format(model_name: str, schema_model: Type[BaseModel], mode: str = "auto") -> Optional[Dict[str, Any]]:
+    """
+    Build the response_format argument for a chat completion.
+    
+    Args:
+        model_name: OpenAI model the request goes to
+        schema_model: Pydantic model for the expected response
+        mode: "json_schema", "json_object", "off", or "auto" to pick by model
+        
+    Returns:
+        dict: response_format value, or None to send no constraint
+    """
+    if mode == "auto":
+        if model_name.startswith(_JSON_SCHEMA_MODELS):
+            mode = "json_schema"
+        elif model_name.startswith(_JSON_OBJECT_MODELS):
+            mode = "json_object"
+        else:
+            mode = "off"
+    
+    if mode == "json_schema":
+        return {
+            'type': "json_schema",
+            'json_schema': {
+                'name': schema_model.__name__,
+                'strict': True,
+                'schema': _strict(schema_model.model_json_schema())
+            }
+        }
+    if mode == "json_object":
+        return {'type': "json_object"}
+    return None
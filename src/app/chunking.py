@@ -0,0 +1,199 @@
+"""
+Token-aware splitting of long documents and merging of per-chunk analyses.
+"""
+
+import re
+from typing import Dict, Any, List
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+try:
+    from .text_cleanup import CHARS_PER_TOKEN
+except ImportError:
+    from text_cleanup import CHARS_PER_TOKEN
+
+# Boundaries to split on, coarsest first: PDFProcessor page markers, blank-line sections, lines
+_BOUNDARIES = [
+    re.compile(r"\n(?=--- Page \d+ ---\n)"),
+    re.compile(r"\n\s*\n"),
+    re.compile(r"\n")
+]
+
+_SEVERITY_RANK = {'LOW': 0, 'MEDIUM': 1, 'HIGH': 2, 'CRITICAL': 3}
+
+# Context windows in tokens (prompt plus completion), matched by longest model-name prefix
+MODEL_CONTEXT_WINDOWS = {
+    'gpt-4': 8192,
+    'gpt-4-32k': 32768,
+    'gpt-4-turbo': 128000,
+    'gpt-4-1106': 128000,
+    'gpt-4-0125': 128000,
+    'gpt-4o': 128000,
+    'gpt-4.1': 1047576,
+    'gpt-5': 400000,
+    'gpt-3.5-turbo': 16385,
+    'o1': 200000,
+    'o3': 200000,
+    'o4': 200000
+}
+# Unknown models are assumed to have the smallest window above
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Chat formatting tokens added per message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encodings = {}
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    """
+    Count tokens for a model, using tiktoken when installed.
+    
+    Without tiktoken the count is estimated from CHARS_PER_TOKEN.
+    """
+    if tiktoken is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    if model not in _encodings:
+        try:
+            _encodings[model] = tiktoken.encoding_for_model(model)
+        except KeyError:
+            _encodings[model] = tiktoken.get_encoding("cl100k_base")
+    return len(_encodings[model].encode(text, disallowed_special=()))
+
+def context_window(model: str) -> int:
+    """Context window of a model in tokens, or DEFAULT_CONTEXT_WINDOW if it is not known."""
+    prefixes = [prefix for prefix in MODEL_CONTEXT_WINDOWS if model.startswith(prefix)]
+    if not prefixes:
+        return DEFAULT_CONTEXT_WINDOW
+    return MODEL_CONTEXT_WINDOWS[max(prefixes, key=len)]
+
+def request_tokens(messages: List[Dict[str, Any]], model: str = "gpt-4") -> int:
+    """Prompt tokens of a chat request's messages, including per-message formatting."""
+    return sum(count_tokens(message['content'], model) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+def _split_units(text: str, max_tokens: int, model: str, level: int = 0) -> List[str]:
+    """Split text into pieces under max_tokens, using the coarsest boundary that works."""
+    if count_tokens(text, model) <= max_tokens:
+        return [text]
+    if level >= len(_BOUNDARIES):
+        # No boundary left (e.g. one enormous line); fall back to fixed-size slices
+        size = max_tokens * CHARS_PER_TOKEN
+        return [text[i:i + size] for i in range(0, len(text), size)]
+    
+    units = []
+    for part in _BOUNDARIES[level].split(text):
+        if part.strip():
+            units.extend(_split_units(part, max_tokens, model, level + 1))
+    return units
+
+def split_document(text: str, max_tokens: int, model: str = "gpt-4") -> List[str]:
+    """
+    Split a document into chunks of at most max_tokens.
+    
+    Whole pages are packed together first; a page that is too long on its own
+    is split at section breaks, then at lines.
+    
+    Args:
+        text: Extracted document text
+        max_tokens: Token budget per chunk
+        model: Model whose tokenizer is used for counting
+        
+    Returns:
+        list: Chunk texts in document order
+    """
+    if max_tokens <= 0 or count_tokens(text, model) <= max_tokens:
+        return [text]
+    
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+    for unit in _split_units(text, max_tokens, model):
+        unit_tokens = count_tokens(unit, model)
+        if current and current_tokens + unit_tokens > max_tokens:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += unit_tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+def _normalize(text: str) -> str:
+    """Dedup key that ignores case, punctuation and spacing."""
+    return " ".join(re.sub(r"[^\w\s]", " ", str(text).lower()).split())
+
+def _flag_text(flag: Any) -> str:
+    """Issue text of a red flag, whether the model returned an object or a string."""
+    return flag.get('issue', '') if isinstance(flag, dict) else str(flag)
+
+def _merge_red_flags(flag_lists: List[List[Any]]) -> List[Any]:
+    """Merge red flags, keeping the most severe copy of each distinct issue."""
+    merged: Dict[str, Any] = {}
+    for flags in flag_lists:
+        for flag in flags:
+            key = _normalize(_flag_text(flag))
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = flag
+            elif isinstance(flag, dict) and isinstance(existing, dict):
+                rank = _SEVERITY_RANK.get(str(flag.get('severity', '')).upper(), -1)
+                if rank > _SEVERITY_RANK.get(str(existing.get('severity', '')).upper(), -1):
+                    merged[key] = flag
+    return list(merged.values())
+
+def _merge_lists(lists: List[List[Any]]) -> List[Any]:
+    """Concatenate lists in order, dropping near-duplicate entries."""
+    seen = set()
+    merged = []
+    for items in lists:
+        for item in items:
+            key = _normalize(item)
+            if key not in seen:
+                seen.add(key)
+                merged.append(item)
+    return merged
+
+def merge_analyses(analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine per-chunk analyses into one result with the single-call schema.
+    
+    List fields (red_flags, exclusions, key_findings, ...) are concatenated
+    with duplicates removed; a red flag seen in several chunks keeps its
+    highest severity. Text fields join their distinct values. Chunks that
+    failed are noted in key_findings so the gap is reviewed manually.
+    
+    Args:
+        analyses: Parsed analysis per chunk, in document order
+        
+    Returns:
+        dict: Merged analysis
+    """
+    succeeded = [analysis for analysis in analyses if 'error' not in analysis]
+    if not succeeded:
+        return analyses[0]
+    
+    merged: Dict[str, Any] = {}
+    fields = list(dict.fromkeys(field for analysis in succeeded for field in analysis))
+    for field in fields:
+        values = [analysis[field] for analysis in succeeded if analysis.get(field) not in (None, "", [])]
+        if not values:
+            merged[field] = succeeded[0].get(field)
+        elif field == 'red_flags':
+            merged[field] = _merge_red_flags([value for value in values if isinstance(value, list)])
+        elif all(isinstance(value, list) for value in values):
+            merged[field] = _merge_lists(values)
+        elif all(isinstance(value, str) for value in values):
+            merged[field] = "; ".join(_merge_lists([[value] for value in values]))
+        else:
+            merged[field] = values[0]
+    
+    failed = [i + 1 for i, analysis in enumerate(analyses) if 'error' in analysis]
+    if failed:
+        parts = ", ".join(str(part) for part in failed)
+        merged['key_findings'] = list(merged.get('key_findings') or []) + [
+            f"Part(s) {parts} of {len(analyses)} could not be analyzed - manual review required"
+        ]
+    merged['chunks_analyzed'] = len(analyses)
+    return merged
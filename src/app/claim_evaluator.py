@@ -1,6 +1,25 @@
 from typing import Dict, List, Any
 import logging
 
+# Phrases that set a red flag's severity, checked most severe first; the local pre-screen scans for them too
+SEVERITY_PHRASES = {
+    # Critical flags that immediately suggest denial
+    'CRITICAL': [
+        'fraud', 'forgery', 'stolen', 'salvage title', 'rebuilt title',
+        'policy violation', 'coverage exclusion', 'material misrepresentation'
+    ],
+    # High severity flags
+    'HIGH': [
+        'title issue', 'odometer rollback', 'previous total loss',
+        'unreported damage', 'modification', 'racing'
+    ],
+    # Medium severity flags
+    'MEDIUM': [
+        'wear and tear', 'maintenance issue', 'pre-existing condition',
+        'delayed reporting', 'minor damage'
+    ]
+}
+
 class ClaimEvaluator:
     """Evaluates overall claim coverage based on all document analysis results."""
     
@@ -75,26 +94,9 @@ class ClaimEvaluator:
         """Assess the severity of a red flag based on content and document type."""
         flag_lower = flag.lower()
         
-        # Critical flags that immediately suggest denial
-        if any(critical in flag_lower for critical in [
-            'fraud', 'forgery', 'stolen', 'salvage title', 'rebuilt title',
-            'policy violation', 'coverage exclusion', 'material misrepresentation'
-        ]):
-            return 'CRITICAL'
-        
-        # High severity flags
-        if any(high in flag_lower for high in [
-            'title issue', 'odometer rollback', 'previous total loss',
-            'unreported damage', 'modification', 'racing'
-        ]):
-            return 'HIGH'
-        
-        # Medium severity flags
-        if any(medium in flag_lower for medium in [
-            'wear and tear', 'maintenance issue', 'pre-existing condition',
-            'delayed reporting', 'minor damage'
-        ]):
-            return 'MEDIUM'
+        for severity, phrases in SEVERITY_PHRASES.items():
+            if any(phrase in flag_lower for phrase in phrases):
+                return severity
         
         # Default to medium if unclear
         return 'MEDIUM'
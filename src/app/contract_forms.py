@@ -0,0 +1,111 @@
+"""
+Fingerprinting of standard policy forms, so a form shared by many claims is analyzed once.
+"""
+
+import hashlib
+import re
+from typing import List, Optional, Tuple
+
+_PAGE_SPLIT = re.compile(r"\n?(?=--- Page \d+ ---\n)")
+_PAGE_MARKER = re.compile(r"--- Page \d+ ---\n?")
+
+# A declarations page announces itself in its heading; the form body only refers to "the Declarations"
+_DECLARATIONS_HEADING = re.compile(r"\bdeclarations?\b", re.IGNORECASE)
+_HEADING_LINES = 3
+_HEADING_MAX_CHARS = 60
+_DECLARATIONS_SEARCH_PAGES = 5
+
+# Data that varies per policyholder, removed before hashing; amounts, limits and
+# form edition numbers stay in the key, since forms differing in them are different forms
+_LABELED_VALUE = re.compile(
+    r"\b(named insured|policyholder|insured|name|address|policy\s*(?:number|no\.?|#)|vin)\b\s*[:#]\s*([^\n]*)",
+    re.IGNORECASE
+)
+_EMAIL = re.compile(r"\S+@\S+\.\w+")
+_DATE = re.compile(
+    r"\b\d{1,4}[/.-]\d{1,2}[/.-]\d{1,4}\b"
+    r"|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{1,2},?\s+\d{4}\b",
+    re.IGNORECASE
+)
+
+# Declared values shorter than this are too likely to occur in the form by chance
+_MIN_DECLARED_CHARS = 3
+
+def split_pages(text: str) -> List[str]:
+    """Split PDFProcessor output into pages, each starting with its marker."""
+    return [page for page in _PAGE_SPLIT.split(text) if page.strip()]
+
+def _is_declarations_page(page: str) -> bool:
+    """Whether a page is titled as declarations: a short heading line near the top, not a sentence."""
+    lines = [line.strip() for line in _PAGE_MARKER.sub("", page, count=1).splitlines() if line.strip()]
+    return any(
+        len(line) <= _HEADING_MAX_CHARS and not line.endswith('.') and _DECLARATIONS_HEADING.search(line)
+        for line in lines[:_HEADING_LINES]
+    )
+
+def split_declarations(text: str) -> Optional[Tuple[str, str]]:
+    """
+    Separate a contract's declarations pages from the policy form.
+    
+    Args:
+        text: Extracted contract text with page markers
+        
+    Returns:
+        tuple: (declarations text, form text), or None when no declarations
+            page is found near the start or nothing would be left of the form
+    """
+    pages = split_pages(text)
+    declarations, form = [], []
+    for index, page in enumerate(pages):
+        if index < _DECLARATIONS_SEARCH_PAGES and _is_declarations_page(page):
+            declarations.append(page)
+        else:
+            form.append(page)
+    if not declarations or not form:
+        return None
+    return "\n".join(declarations), "\n".join(form)
+
+def redact_declared_values(form: str, declarations: str) -> str:
+    """
+    Replace the policyholder's own details in the policy form with placeholders.
+    
+    Names, addresses, policy numbers, VINs and dates stated on the declarations
+    page are removed wherever the form repeats them, e.g. a policy number in a
+    page footer, so neither the fingerprint nor the cached form analysis
+    carries one policyholder's data over to the next.
+    
+    Args:
+        form: Policy form text
+        declarations: The same contract's declarations pages
+        
+    Returns:
+        str: Form text with declared values replaced by "[label]" placeholders
+    """
+    values = {}
+    for match in _LABELED_VALUE.finditer(declarations):
+        values[match.group(2).strip()] = f"[{match.group(1).lower()}]"
+    for match in _DATE.finditer(declarations):
+        values.setdefault(match.group(0), "[date]")
+    
+    for value in sorted(values, key=len, reverse=True):
+        if len(value) >= _MIN_DECLARED_CHARS:
+            form = re.sub(rf"(?<!\w){re.escape(value)}(?!\w)", values[value], form, flags=re.IGNORECASE)
+    return form
+
+def normalize_form_text(text: str) -> str:
+    """
+    Reduce policy form text to what is the same for every policyholder on the form.
+    
+    Page markers, labeled names/addresses/policy numbers, emails and dates are
+    replaced by placeholders; case and spacing are ignored. Amounts, limits
+    and edition numbers are kept.
+    """
+    text = _PAGE_MARKER.sub(" ", text)
+    text = _LABELED_VALUE.sub(lambda match: f"{match.group(1)}: <value>", text)
+    text = _EMAIL.sub("<email>", text)
+    text = _DATE.sub("<date>", text)
+    return " ".join(text.lower().split())
+
+def fingerprint(text: str) -> str:
+    """SHA-256 of the normalized form text, identical for every claim on the same form."""
+    return hashlib.sha256(normalize_form_text(text).encode('utf-8')).hexdigest()
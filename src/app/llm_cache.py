@@ -0,0 +1,257 @@
+"""
+Two-tier cache of LLM responses keyed by model, prompt and content.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+try:
+    from ..config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+def _digest(text: str) -> str:
+    """SHA-256 hex digest of a string."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class LLMResponseCache:
+    """
+    In-memory LRU tier in front of an optional SQLite tier.
+    
+    Keys combine the model, the hashes of the system prompt and user content,
+    and max_tokens, so editing a prompt template naturally stops old answers
+    from matching; retain_prompts then reclaims their space.
+    """
+    
+    def __init__(self, path: Optional[str] = None, memory_entries: int = 256, ttl: int = 0,
+                 max_bytes: int = 64 * 1024 * 1024):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.memory_entries = memory_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._retained = None
+        self._lock = threading.Lock()
+        self._conn = None
+        
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Streamlit serves sessions from several threads, so share one guarded connection
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    prompt_hash TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_responses_access ON llm_responses (last_access)"
+            )
+            self._conn.commit()
+    
+    @staticmethod
+    def prompt_hash(system_prompt: str) -> str:
+        """Hash identifying a system prompt template."""
+        return _digest(system_prompt)
+    
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_content: str, max_tokens: int) -> str:
+        """Build a cache key from the request fields that determine the response."""
+        # Prompt hash first: fine-tuned model names contain colons
+        return f"{_digest(system_prompt)}:{_digest(user_content)}:{max_tokens}:{model}"
+    
+    def _expired(self, created: float) -> bool:
+        return bool(self.ttl) and time.time() - created > self.ttl
+    
+    def _remember(self, key: str, response: str, created: float) -> None:
+        """Insert into the memory tier, evicting the least recently used entry."""
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = (response, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response, promoting disk hits into memory.
+        
+        Args:
+            key: Key from make_key
+            
+        Returns:
+            str: Cached response text, or None on a miss or expired entry
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[1]):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[0]
+                del self._memory[key]
+            
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT response, created FROM llm_responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    response, created = row
+                    if not self._expired(created):
+                        self._conn.execute(
+                            "UPDATE llm_responses SET last_access = ? WHERE key = ?", (time.time(), key)
+                        )
+                        self._conn.commit()
+                        self._remember(key, response, created)
+                        self.disk_hits += 1
+                        return response
+                    self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                    self._conn.commit()
+            
+            self.misses += 1
+            return None
+    
+    def put(self, key: str, response: str) -> None:
+        """
+        Store a response in both tiers.
+        
+        Args:
+            key: Key from make_key
+            response: Raw response text from the model
+        """
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            if self._conn is None:
+                return
+            
+            size = len(response.encode('utf-8'))
+            if size > self.max_bytes:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, prompt_hash, response, size, created, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, key.split(':')[0], response, size, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+    
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones until the disk tier fits."""
+        if self.ttl:
+            self._conn.execute("DELETE FROM llm_responses WHERE created < ?", (time.time() - self.ttl,))
+        
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        rows = self._conn.execute(
+            "SELECT key, size FROM llm_responses ORDER BY last_access ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+            total -= size
+    
+    def retain_prompts(self, prompt_hashes: Iterable[str]) -> int:
+        """
+        Invalidate responses produced by prompt templates that are no longer in use.
+        
+        Args:
+            prompt_hashes: prompt_hash() of every current system prompt
+            
+        Returns:
+            int: Number of disk entries removed
+        """
+        current = frozenset(prompt_hashes)
+        with self._lock:
+            if current == self._retained:
+                return 0
+            self._retained = current
+            
+            for key in [key for key in self._memory if key.split(':')[0] not in current]:
+                del self._memory[key]
+            if self._conn is None:
+                return 0
+            
+            placeholders = ",".join("?" * len(current))
+            removed = self._conn.execute(
+                f"DELETE FROM llm_responses WHERE prompt_hash NOT IN ({placeholders})", tuple(current)
+            ).rowcount
+            self._conn.commit()
+        if removed:
+            self.logger.info(f"Invalidated {removed} cached responses from changed prompts")
+        return removed
+    
+    def clear(self) -> None:
+        """Remove every cached entry and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_responses")
+                self._conn.commit()
+            self.memory_hits = self.disk_hits = self.misses = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get per-tier hit counters and current sizes."""
+        with self._lock:
+            entries, total = 0, 0
+            if self._conn is not None:
+                entries, total = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses"
+                ).fetchone()
+            memory_size = len(self._memory)
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'memory_entries': memory_size,
+            'disk_entries': entries,
+            'disk_size_bytes': total
+        }
+    
+    def close(self) -> None:
+        """Close the disk tier's database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+_shared_caches: Dict[Tuple[str, int], LLMResponseCache] = {}
+_shared_caches_lock = threading.Lock()
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """Get the process-wide response cache from the LLM_CACHE_* settings, or None when disabled."""
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    # Keyed by pid too: SQLite connections must not be shared with forked workers
+    key = (settings.LLM_CACHE_PATH, os.getpid())
+    with _shared_caches_lock:
+        if key not in _shared_caches:
+            _shared_caches[key] = LLMResponseCache(
+                path=settings.LLM_CACHE_PATH or None,
+                memory_entries=settings.LLM_CACHE_MEMORY_ENTRIES,
+                ttl=settings.LLM_CACHE_TTL,
+                max_bytes=settings.LLM_CACHE_MAX_BYTES
+            )
+        return _shared_caches[key]
@@ -0,0 +1,235 @@
+"""
+Record/replay transport for chat completions, for offline and deterministic runs.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+try:
+    from ..config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+TRANSPORT_MODES = ('live', 'record', 'replay')
+
+# Request fields that do not change the response
+_UNKEYED_FIELDS = ('timeout',)
+
+class CassetteMissError(LookupError):
+    """Replay was asked for a request that was never recorded."""
+
+def request_key(request: Dict[str, Any]) -> str:
+    """
+    Identify a chat completion request by its content.
+    
+    Args:
+        request: Keyword arguments for chat.completions.create
+        
+    Returns:
+        str: SHA-256 of the request, ignoring transport-only fields like timeout
+    """
+    keyed = {field: value for field, value in request.items() if field not in _UNKEYED_FIELDS}
+    return hashlib.sha256(json.dumps(keyed, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+class CassetteStore:
+    """
+    Directory of recorded request/response pairs, one JSON file per request.
+    
+    Files are named by request_key, so a cassette directory can be built up
+    over several recording runs and checked in or copied to an air-gapped
+    machine as is.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+    
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.json")
+    
+    def load(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get the recording for a request.
+        
+        Raises:
+            CassetteMissError: If the request was never recorded
+        """
+        key = request_key(request)
+        try:
+            with open(self._file(key), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise CassetteMissError(
+                f"No recording of {request.get('model')} request {key[:12]} in {self.path}; "
+                f"run once with LLM_TRANSPORT=record"
+            ) from None
+    
+    def save(self, request: Dict[str, Any], response: Any, latency: float, first_chunk: Optional[float] = None) -> None:
+        """
+        Record one request with its response and timing.
+        
+        Args:
+            request: Keyword arguments for chat.completions.create
+            response: Completion as a dict, or the list of chunk dicts for a stream
+            latency: Seconds from sending the request to the full response
+            first_chunk: Seconds to the first chunk of a stream
+        """
+        key = request_key(request)
+        cassette = {
+            'request': request,
+            'response': response,
+            'latency': latency,
+            'first_chunk': first_chunk
+        }
+        # Write-then-rename, so concurrent recorders and readers never see a partial file
+        temp_path = f"{self._file(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(cassette, f, indent=2, default=str)
+        os.replace(temp_path, self._file(key))
+
+def _dump(item: Any) -> Dict[str, Any]:
+    """Serialize an openai response object."""
+    return item.model_dump(mode='json')
+
+class _Completions:
+    """The chat.completions namespace of a transport client."""
+    
+    def __init__(self, create):
+        self.create = create
+
+class _Chat:
+    """The chat namespace of a transport client, mirroring openai.OpenAI.chat."""
+    
+    def __init__(self, create):
+        self.completions = _Completions(create)
+
+class RecordingClient:
+    """Pass calls through to a live OpenAI client, saving every response to the cassette store."""
+    
+    def __init__(self, client, store: CassetteStore):
+        self.client = client
+        self.store = store
+        self.chat = _Chat(self.create)
+    
+    def create(self, **request: Any) -> Any:
+        start = time.monotonic()
+        response = self.client.chat.completions.create(**request)
+        if request.get('stream'):
+            return self._record_stream(request, response, start)
+        self.store.save(request, _dump(response), time.monotonic() - start)
+        return response
+    
+    def _record_stream(self, request: Dict[str, Any], stream, start: float):
+        chunks: List[Dict[str, Any]] = []
+        first_chunk = None
+        for chunk in stream:
+            if first_chunk is None:
+                first_chunk = time.monotonic() - start
+            chunks.append(_dump(chunk))
+            yield chunk
+        # Only a fully consumed stream is saved
+        self.store.save(request, chunks, time.monotonic() - start, first_chunk)
+
+class AsyncRecordingClient:
+    """Async form of RecordingClient."""
+    
+    def __init__(self, client, store: CassetteStore):
+        self.client = client
+        self.store = store
+        self.chat = _Chat(self.create)
+    
+    async def create(self, **request: Any) -> Any:
+        start = time.monotonic()
+        response = await self.client.chat.completions.create(**request)
+        if request.get('stream'):
+            return self._record_stream(request, response, start)
+        self.store.save(request, _dump(response), time.monotonic() - start)
+        return response
+    
+    async def _record_stream(self, request: Dict[str, Any], stream, start: float):
+        chunks: List[Dict[str, Any]] = []
+        first_chunk = None
+        async for chunk in stream:
+            if first_chunk is None:
+                first_chunk = time.monotonic() - start
+            chunks.append(_dump(chunk))
+            yield chunk
+        self.store.save(request, chunks, time.monotonic() - start, first_chunk)
+
+class ReplayClient:
+    """
+    Serve recorded responses without network access or an API key.
+    
+    Each reply is delayed to simulate the API: by its recorded latency times
+    latency_scale, or by a fixed latency in seconds when one is given.
+    Streams are paced chunk by chunk, first chunk included, so streaming UIs
+    and time-to-first-flag behave as they did when recorded.
+    """
+    
+    def __init__(self, store: CassetteStore, latency: Optional[float] = None, latency_scale: float = 1.0):
+        self.store = store
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.chat = _Chat(self.create)
+    
+    def _delays(self, cassette: Dict[str, Any]) -> List[float]:
+        """Seconds to wait before the response, or before each chunk of a stream."""
+        latency = cassette['latency'] if self.latency is None else self.latency
+        latency = max(latency * self.latency_scale, 0.0)
+        chunks = cassette['response'] if isinstance(cassette['response'], list) else None
+        if not chunks:
+            return [latency]
+        
+        recorded_first = cassette.get('first_chunk')
+        share = recorded_first / cassette['latency'] if recorded_first is not None and cassette['latency'] else 0.0
+        first = latency * share
+        rest = (latency - first) / max(len(chunks) - 1, 1)
+        return [first] + [rest] * (len(chunks) - 1)
+    
+    def create(self, **request: Any) -> Any:
+        cassette = self.store.load(request)
+        delays = self._delays(cassette)
+        if request.get('stream'):
+            return self._replay_stream(cassette['response'], delays)
+        time.sleep(delays[0])
+        return ChatCompletion.model_validate(cassette['response'])
+    
+    def _replay_stream(self, chunks: List[Dict[str, Any]], delays: List[float]):
+        for chunk, delay in zip(chunks, delays):
+            time.sleep(delay)
+            yield ChatCompletionChunk.model_validate(chunk)
+
+class AsyncReplayClient(ReplayClient):
+    """Async form of ReplayClient; waits without blocking the event loop."""
+    
+    async def create(self, **request: Any) -> Any:
+        cassette = self.store.load(request)
+        delays = self._delays(cassette)
+        if request.get('stream'):
+            return self._replay_stream_async(cassette['response'], delays)
+        await asyncio.sleep(delays[0])
+        return ChatCompletion.model_validate(cassette['response'])
+    
+    async def _replay_stream_async(self, chunks: List[Dict[str, Any]], delays: List[float]):
+        for chunk, delay in zip(chunks, delays):
+            await asyncio.sleep(delay)
+            yield ChatCompletionChunk.model_validate(chunk)
+
+def replay_latency() -> Optional[float]:
+    """Fixed replay latency from LLM_REPLAY_LATENCY, or None to use the recorded latencies."""
+    value = settings.LLM_REPLAY_LATENCY
+    if value in ('', 'recorded'):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        logging.getLogger(__name__).warning(f"Invalid LLM_REPLAY_LATENCY {value!r}, using recorded latencies")
+        return None
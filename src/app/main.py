@@ -5,10 +5,16 @@ import tempfile
 from typing import List, Dict, Any
 import json
 import pandas as pd
+import sys
+
+# Make the src/ directory importable so app modules can reach config.settings
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from pdf_processor import PDFProcessor
 from ai_analyzer import AIAnalyzer
 from claim_evaluator import ClaimEvaluator
+from prescreen import PreScreener
+from telemetry import summarize
 from utils import setup_page_config, create_sidebar
 
 def main():
@@ -18,7 +24,7 @@ def main():
     setup_page_config()
     
     # Create sidebar
-    create_sidebar()
+    options = create_sidebar()
     
     # Main header
     st.title("🚗 Insurance Claim Coverage Analyzer")
@@ -88,18 +94,30 @@ def main():
                 )
                 
                 # Analyze with AI
-                analysis_results = analyze_documents(documents)
+                analysis_results, telemetry = analyze_documents(documents, options)
                 
                 # Evaluate claim coverage
                 coverage_decision = evaluate_claim_coverage(analysis_results)
                 
                 # Display results
-                display_results(coverage_decision, analysis_results)
+                display_results(coverage_decision, analysis_results, telemetry)
                 
             except Exception as e:
                 st.error(f"❌ Analysis failed: {str(e)}")
                 st.exception(e)
     
+    # AI analysis held back by the defer pre-screen policy runs only when asked for
+    if st.session_state.get('deferred_documents') and st.button("🤖 Run Deferred AI Analysis", use_container_width=True):
+        documents = st.session_state.pop('deferred_documents')
+        with st.spinner("Running the deferred AI analysis..."):
+            try:
+                analysis_results, telemetry = analyze_documents(documents, {**options, 'prescreen_mode': 'flag'})
+                coverage_decision = evaluate_claim_coverage(analysis_results)
+                display_results(coverage_decision, analysis_results, telemetry)
+            except Exception as e:
+                st.error(f"❌ Analysis failed: {str(e)}")
+                st.exception(e)
+    
     # Show sample analysis if no files uploaded
     if not any([contract_file, inspection_file, acv_file, history_file, adjuster_file]):
         st.info("💡 **Tip**: Upload your documents above to begin analysis. The AI will scan each document for red flags and provide coverage recommendations.")
@@ -109,59 +127,108 @@ def process_uploaded_files(contract_file, inspection_file, acv_file, history_fil
     processor = PDFProcessor()
     documents = {}
     
-    # Process contract first (required)
-    if contract_file:
-        documents['contract'] = {
-            'filename': contract_file.name,
-            'content': processor.extract_text(contract_file),
-            'type': 'contract'
-        }
-    
-    # Process other documents
+    # Contract first (required), then supporting documents
     file_mappings = {
+        'contract': contract_file,
         'inspection': inspection_file,
         'acv': acv_file,
         'history': history_file,
         'adjuster': adjuster_file
     }
+    file_mappings = {doc_type: file for doc_type, file in file_mappings.items() if file}
+    
+    # Extract every document concurrently on the shared worker pool
+    extractions = processor.extract_many(file_mappings)
     
     for doc_type, file in file_mappings.items():
-        if file:
-            documents[doc_type] = {
-                'filename': file.name,
-                'content': processor.extract_text(file),
-                'type': doc_type
-            }
+        documents[doc_type] = build_document_entry(file, doc_type, extractions[doc_type])
     
     return documents
 
-def analyze_documents(documents: Dict[str, Any]):
-    """Analyze all documents using AI to identify red flags and key information."""
-    analyzer = AIAnalyzer()
+def build_document_entry(file, doc_type: str, extraction: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the document record for one extraction, warning when a budget cut it short."""
+    if extraction['truncated']:
+        st.warning(
+            f"⚠️ {file.name}: extraction stopped after page {extraction['pages_covered']} "
+            f"of {extraction['page_count']} (document budget reached)"
+        )
+    
+    return {
+        'filename': file.name,
+        'content': extraction['content'],
+        'type': doc_type,
+        'truncated': extraction['truncated'],
+        'pages_covered': extraction['pages_covered'],
+        'page_count': extraction['page_count'],
+        'dedup': extraction['dedup']
+    }
+
+def analyze_documents(documents: Dict[str, Any], options: Dict[str, Any]):
+    """Analyze all documents using AI, returning the analyses and a summary of the LLM calls made."""
+    texts = {doc_type: doc_data['content'] for doc_type, doc_data in documents.items()}
+    mode = options.get('prescreen_mode', 'flag')
+    
+    # Local phrase scan first: a confirmed CRITICAL hit can make the LLM calls unnecessary
+    prescreen = PreScreener()
+    prescreen_flags = prescreen.scan_all(texts) if mode != 'off' else {}
+    for doc_type, flags in prescreen_flags.items():
+        for flag in flags:
+            if flag['confirmed']:
+                st.warning(f"🔎 Pre-screen {doc_type.title()}: {format_red_flag(flag)}")
+            else:
+                st.info(f"🔎 Pre-screen {doc_type.title()}: {prescreen.review_note(flag)}")
+    
+    if mode in ('defer', 'skip') and prescreen.is_decisive(prescreen_flags):
+        deferred = mode == 'defer'
+        if deferred:
+            st.session_state['deferred_documents'] = documents
+        st.info(
+            f"⏭️ CRITICAL red flag confirmed by pre-screen; AI analysis "
+            f"{'deferred until requested' if deferred else 'skipped'}"
+        )
+        return {
+            doc_type: prescreen.to_analysis(prescreen_flags.get(doc_type, []), deferred)
+            for doc_type in documents
+        }, summarize([])
+    
+    analyzer = AIAnalyzer(
+        cascade=options['cascade'],
+        confidence_threshold=options['confidence_threshold'],
+        combined=options['combined']
+    )
     results = {}
     
-    for doc_type, doc_data in documents.items():
-        st.write(f"📄 Analyzing {doc_type} document...")
-        
-        if doc_type == 'contract':
-            results[doc_type] = analyzer.analyze_contract(doc_data['content'])
-        elif doc_type == 'inspection':
-            results[doc_type] = analyzer.analyze_inspection(doc_data['content'])
-        elif doc_type == 'acv':
-            results[doc_type] = analyzer.analyze_acv(doc_data['content'])
-        elif doc_type == 'history':
-            results[doc_type] = analyzer.analyze_history(doc_data['content'])
-        elif doc_type == 'adjuster':
-            results[doc_type] = analyzer.analyze_adjuster(doc_data['content'])
-    
-    return results
+    st.write(f"📄 Analyzing {', '.join(documents)} documents...")
+    
+    # All documents are analyzed concurrently; red flags are shown as soon as the model writes them
+    events = analyzer.stream_all(texts)
+    for doc_type, field, item in events:
+        if field == 'done':
+            results[doc_type] = prescreen.merge(item, prescreen_flags.get(doc_type, []))
+            st.write(f"✅ {doc_type.title()} analysis complete")
+        elif field == 'red_flags':
+            st.warning(f"⚠️ {doc_type.title()}: {format_red_flag(item)}")
+    
+    telemetry = analyzer.telemetry_summary()
+    st.caption(
+        f"⏱️ {telemetry['calls']} LLM calls ({telemetry['cache_hits']} cached), "
+        f"{telemetry['prompt_tokens'] + telemetry['completion_tokens']} tokens, ~${telemetry['cost']:.4f}"
+    )
+    return results, telemetry
+
+def format_red_flag(flag) -> str:
+    """Format a red flag, which the model returns as an object or a plain string."""
+    if isinstance(flag, dict):
+        return f"[{flag.get('severity', 'UNKNOWN')}] {flag.get('issue', '')}"
+    return str(flag)
 
 def evaluate_claim_coverage(analysis_results: Dict[str, Any]):
     """Evaluate overall claim coverage based on all analysis results."""
     evaluator = ClaimEvaluator()
     return evaluator.evaluate_coverage(analysis_results)
 
-def display_results(coverage_decision: Dict[str, Any], analysis_results: Dict[str, Any]):
+def display_results(coverage_decision: Dict[str, Any], analysis_results: Dict[str, Any],
+                    telemetry: Dict[str, Any] = None):
     """Display comprehensive analysis results."""
     
     st.header("📊 Coverage Analysis Results")
@@ -215,6 +282,7 @@ def display_results(coverage_decision: Dict[str, Any], analysis_results: Dict[st
     report_data = {
         'coverage_decision': coverage_decision,
         'analysis_results': analysis_results,
+        'telemetry': telemetry,
         'timestamp': str(pd.Timestamp.now())
     }
     
@@ -0,0 +1,111 @@
+"""
+Process-wide OpenAI clients with tuned HTTP connection pooling.
+"""
+
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Any, Awaitable, Dict, Optional
+
+import openai
+
+try:
+    import httpx
+except ImportError:
+    # Newer openai releases are built on httpx2, which keeps the same Limits/Timeout API
+    import httpx2 as httpx
+
+try:
+    from ..config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+_lock = threading.Lock()
+_clients: Dict[str, openai.OpenAI] = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, openai.AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _http_options() -> Dict[str, Any]:
+    """Connection pool and timeout options from the OPENAI_* settings."""
+    return {
+        'limits': httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY
+        ),
+        'timeout': httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT)
+    }
+
+def get_openai_client(api_key: str) -> openai.OpenAI:
+    """
+    Get the blocking client shared by every analyzer in the process.
+    
+    Streamlit keeps imported modules across reruns and sessions, so the
+    connection pool, keep-alive connections and TLS sessions survive from one
+    claim to the next instead of being rebuilt on every button click.
+    
+    Args:
+        api_key: OpenAI API key
+        
+    Returns:
+        openai.OpenAI: Shared client
+    """
+    with _lock:
+        if api_key not in _clients:
+            http_client_class = getattr(openai, 'DefaultHttpxClient', httpx.Client)
+            _clients[api_key] = openai.OpenAI(
+                api_key=api_key,
+                http_client=http_client_class(**_http_options()),
+                # Retries are the analyzer's RetryPolicy, which re-acquires rate-limiter quota per attempt
+                max_retries=0
+            )
+        return _clients[api_key]
+
+def get_async_openai_client(api_key: str) -> openai.AsyncOpenAI:
+    """
+    Get the async client shared by every analyzer on the running event loop.
+    
+    Async HTTP connections belong to the loop that opened them, so there is
+    one client per loop; run_async keeps a single long-lived loop so that
+    client is reused too.
+    
+    Args:
+        api_key: OpenAI API key
+        
+    Returns:
+        openai.AsyncOpenAI: Shared client for the current loop
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        if api_key not in clients:
+            http_client_class = getattr(openai, 'DefaultAsyncHttpxClient', httpx.AsyncClient)
+            clients[api_key] = openai.AsyncOpenAI(
+                api_key=api_key,
+                http_client=http_client_class(**_http_options()),
+                max_retries=0
+            )
+        return clients[api_key]
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Start the shared background event loop on first use."""
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="openai-client-loop", daemon=True).start()
+        return _loop
+
+def submit_async(coroutine: Awaitable) -> Future:
+    """Schedule a coroutine on the shared background loop without waiting for it."""
+    return asyncio.run_coroutine_threadsafe(coroutine, _get_loop())
+
+def run_async(coroutine: Awaitable) -> Any:
+    """
+    Run a coroutine on the shared background loop and wait for its result.
+    
+    Unlike asyncio.run, the loop outlives the call, so async clients and
+    their connections are reused by the next claim.
+    """
+    return submit_async(coroutine).result()
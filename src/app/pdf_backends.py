@@ -0,0 +1,199 @@
+"""
+Pluggable text extraction backends for PDFProcessor.
+"""
+
+import io
+import importlib
+import importlib.metadata
+import logging
+from typing import Any, Dict, Iterator, Optional, Tuple, Type
+
+# Bump when PDFProcessor's output format changes so cached text is invalidated
+EXTRACTION_FORMAT_VERSION = 1
+
+class PDFBackend:
+    """Base class for a local PDF text extractor."""
+    
+    name = ""
+    module = ""
+    package = ""
+    
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._version = None
+    
+    @property
+    def version(self) -> str:
+        """Extractor version string used in cache keys."""
+        if self._version is None:
+            self._version = f"{self.name}-{self._library_version()}-{EXTRACTION_FORMAT_VERSION}"
+        return self._version
+    
+    def _library_version(self) -> str:
+        """Import the backend library and report its installed version."""
+        importlib.import_module(self.module)
+        return importlib.metadata.version(self.package)
+    
+    def load(self, pdf) -> Any:
+        """
+        Open a document for this backend.
+        
+        Args:
+            pdf: ParsedPDF handle
+            
+        Returns:
+            Backend-specific document object
+        """
+        raise NotImplementedError
+    
+    def page_count(self, document) -> int:
+        raise NotImplementedError
+    
+    def extract_page(self, document, index: int) -> str:
+        raise NotImplementedError
+    
+    def close(self, document) -> None:
+        """Release resources held by a loaded document."""
+        pass
+    
+    def iter_pages(self, document, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, Optional[str], Optional[Exception]]]:
+        """
+        Extract pages [start, stop) one at a time.
+        
+        Yields:
+            tuple: (0-based page index, text or None, exception or None)
+        """
+        stop = self.page_count(document) if stop is None else stop
+        for index in range(start, stop):
+            try:
+                yield index, self.extract_page(document, index), None
+            except Exception as e:
+                yield index, None, e
+
+class PyPDF2Backend(PDFBackend):
+    """PyPDF2 extractor; the default, and the reader used for metadata."""
+    
+    name = "pypdf2"
+    module = "PyPDF2"
+    package = "PyPDF2"
+    
+    def load(self, pdf) -> Any:
+        return pdf.reader
+    
+    def page_count(self, document) -> int:
+        return len(document.pages)
+    
+    def extract_page(self, document, index: int) -> str:
+        return document.pages[index].extract_text()
+
+class PypdfBackend(PyPDF2Backend):
+    """pypdf, the maintained successor of PyPDF2."""
+    
+    name = "pypdf"
+    module = "pypdf"
+    package = "pypdf"
+    
+    def load(self, pdf) -> Any:
+        import pypdf
+        return pypdf.PdfReader(pdf.stream())
+
+class PdfMinerBackend(PDFBackend):
+    """pdfminer.six layout-based extractor; slower, but preserves reading order well."""
+    
+    name = "pdfminer"
+    module = "pdfminer"
+    package = "pdfminer.six"
+    
+    def load(self, pdf) -> Any:
+        from pdfminer.pdfpage import PDFPage
+        stream = pdf.stream()
+        pages = list(PDFPage.get_pages(stream))
+        return stream, pages
+    
+    def page_count(self, document) -> int:
+        return len(document[1])
+    
+    def extract_page(self, document, index: int) -> str:
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        
+        output = io.StringIO()
+        manager = PDFResourceManager()
+        converter = TextConverter(manager, output, laparams=LAParams())
+        try:
+            PDFPageInterpreter(manager, converter).process_page(document[1][index])
+        finally:
+            converter.close()
+        # TextConverter ends each page with a form feed; page markers already separate pages
+        return output.getvalue().rstrip("\x0c")
+
+class PdfiumBackend(PDFBackend):
+    """pypdfium2 bindings to Chromium's PDFium; the fastest local option."""
+    
+    name = "pdfium"
+    module = "pypdfium2"
+    package = "pypdfium2"
+    
+    def load(self, pdf) -> Any:
+        import pypdfium2
+        return pypdfium2.PdfDocument(pdf.path if pdf.path else bytes(pdf.data))
+    
+    def page_count(self, document) -> int:
+        return len(document)
+    
+    def close(self, document) -> None:
+        document.close()
+    
+    def extract_page(self, document, index: int) -> str:
+        page = document[index]
+        try:
+            textpage = page.get_textpage()
+            try:
+                return textpage.get_text_range().replace("\r\n", "\n")
+            finally:
+                textpage.close()
+        finally:
+            page.close()
+
+BACKENDS: Dict[str, Type[PDFBackend]] = {
+    backend.name: backend
+    for backend in (PyPDF2Backend, PypdfBackend, PdfMinerBackend, PdfiumBackend)
+}
+
+def get_backend(name: str) -> PDFBackend:
+    """
+    Instantiate a backend by name, checking its library is installed.
+    
+    Args:
+        name: One of the keys of BACKENDS
+        
+    Returns:
+        PDFBackend: Ready-to-use backend
+        
+    Raises:
+        ValueError: Unknown backend name
+        ImportError: Backend library is not installed
+    """
+    backend_class = BACKENDS.get(name.lower())
+    if backend_class is None:
+        raise ValueError(f"Unknown PDF backend '{name}'. Available: {', '.join(BACKENDS)}")
+    
+    backend = backend_class()
+    try:
+        backend._library_version()
+    except ImportError as e:
+        raise ImportError(
+            f"PDF backend '{name}' requires the '{backend_class.package}' package: pip install {backend_class.package}"
+        ) from e
+    return backend
+
+def available_backends() -> Dict[str, PDFBackend]:
+    """Get every backend whose library is importable in this environment."""
+    backends = {}
+    for name in BACKENDS:
+        try:
+            backends[name] = get_backend(name)
+        except ImportError:
+            continue
+    return backends
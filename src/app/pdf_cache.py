@@ -0,0 +1,135 @@
+"""
+Persistent, content-addressed cache of extracted PDF text.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+
+class PDFTextCache:
+    """SQLite-backed cache of extracted text keyed by PDF content hash and extractor version."""
+    
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # Streamlit serves sessions from several threads, so share one guarded connection
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS extracted_text (
+                key TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_extracted_text_access ON extracted_text (last_access)"
+        )
+        self._conn.commit()
+    
+    @staticmethod
+    def make_key(content_sha256: str, extractor_version: str) -> str:
+        """Build a cache key from the SHA-256 of the PDF bytes and the extractor version."""
+        return f"{content_sha256}:{extractor_version}"
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up cached text and refresh its LRU position.
+        
+        Args:
+            key: Key from make_key
+            
+        Returns:
+            str: Cached text, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text FROM extracted_text WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            
+            self._conn.execute(
+                "UPDATE extracted_text SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+    
+    def put(self, key: str, text: str) -> None:
+        """
+        Store extracted text, evicting least recently used entries past max_bytes.
+        
+        Args:
+            key: Key from make_key
+            text: Extracted text content
+        """
+        size = len(text.encode('utf-8'))
+        if size > self.max_bytes:
+            self.logger.info(f"Skipping cache for {key}: {size} bytes exceeds cache limit")
+            return
+        
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extracted_text (key, text, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, text, size, time.time())
+            )
+            self._evict()
+            self._conn.commit()
+    
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM extracted_text").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        rows = self._conn.execute(
+            "SELECT key, size FROM extracted_text ORDER BY last_access ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM extracted_text WHERE key = ?", (key,))
+            total -= size
+    
+    def clear(self) -> None:
+        """Remove every cached entry and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM extracted_text")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and current cache size."""
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extracted_text"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'size_bytes': total,
+            'max_bytes': self.max_bytes
+        }
+    
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -1,74 +1,668 @@
 import PyPDF2
 import streamlit as st
-from typing import Union, Optional
+from typing import Any, Union, Optional, Dict, Iterator, List, Tuple, TextIO
 import io
+import os
+import re
+import mmap
+import hashlib
 import logging
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+
+try:
+    from ..config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+try:
+    from .pdf_cache import PDFTextCache
+    from .pdf_backends import PDFBackend, get_backend
+    from .text_cleanup import strip_repeated_lines
+except ImportError:
+    from pdf_cache import PDFTextCache
+    from pdf_backends import PDFBackend, get_backend
+    from text_cleanup import strip_repeated_lines
+
+PDFSource = Union[str, os.PathLike, bytes, bytearray, memoryview]
+
+def _extract_page_range(source: Union[str, bytes], start: int, stop: int,
+                        backend_name: str) -> List[Tuple[int, Optional[str], Optional[str]]]:
+    """
+    Extract text for pages [start, stop) in a worker process.
+    
+    Each worker opens its own document, since extractor handles cannot be
+    shared across processes. Path sources are memory-mapped in the worker
+    rather than copied through the pool.
+    
+    Returns:
+        list: (1-based page number, text or None, error message or None) per page
+    """
+    backend = get_backend(backend_name)
+    with (ParsedPDF.from_path(source) if isinstance(source, str) else ParsedPDF(source)) as pdf:
+        return [
+            (index + 1, page_text, None if error is None else str(error))
+            for index, page_text, error in backend.iter_pages(pdf.document(backend), start, stop)
+        ]
+
+_STARTXREF_RE = re.compile(rb"startxref\s+(\d+)")
+_XREF_SUBSECTION_RE = re.compile(rb"\s*(\d+)[ \t]+(\d+)[ \t]*\r?\n")
+_ROOT_RE = re.compile(rb"/Root\s+(\d+)\s+(\d+)\s+R")
+_PREV_RE = re.compile(rb"/Prev\s+(\d+)")
+_PAGES_RE = re.compile(rb"/Pages\s+(\d+)\s+(\d+)\s+R")
+_COUNT_RE = re.compile(rb"/Count\s+(\d+)")
+
+def _window(data, start: int, length: int) -> bytes:
+    """Copy a small slice of any supported buffer into bytes."""
+    return bytes(data[max(start, 0):start + length])
+
+def _find_object_offset(data, xref_offset: int, obj_num: int) -> Optional[int]:
+    """Look up an object's byte offset in a classic xref table, following /Prev links."""
+    seen = set()
+    while xref_offset not in seen and 0 <= xref_offset < len(data):
+        seen.add(xref_offset)
+        section = _window(data, xref_offset, 64 * 1024)
+        if not section.startswith(b"xref"):
+            return None  # Cross-reference streams need a real parser
+        
+        # Entries are fixed 20-byte lines; a wrong offset is caught by _read_object
+        pos = 4
+        while True:
+            header = _XREF_SUBSECTION_RE.match(section, pos)
+            if header is None:
+                break
+            first, count = int(header.group(1)), int(header.group(2))
+            pos = header.end()
+            if first <= obj_num < first + count:
+                entry = section[pos + 20 * (obj_num - first):][:18]
+                return int(entry[:10]) if entry.endswith(b"n") else None
+            pos += 20 * count
+        
+        trailer_at = section.find(b"trailer", pos)
+        if trailer_at == -1:
+            return None
+        prev = _PREV_RE.search(section, trailer_at)
+        if prev is None:
+            return None
+        xref_offset = int(prev.group(1))
+    return None
+
+def _read_object(data, offset: int, obj_num: int) -> Optional[bytes]:
+    """Read the dictionary text of an indirect object at a known offset."""
+    chunk = _window(data, offset, 4096)
+    if not re.match(rb"\s*%d\s+\d+\s+obj" % obj_num, chunk):
+        return None
+    end = chunk.find(b"endobj")
+    return chunk if end == -1 else chunk[:end]
+
+def _quick_page_count(data) -> Optional[int]:
+    """
+    Read the page count from the header, trailer and page tree root only.
+    
+    Returns:
+        int: Page count, or None when the structure is not a simple classic
+        PDF and a full parse is needed to decide
+    """
+    if b"%PDF-" not in _window(data, 0, 1024):
+        return None
+    
+    tail = _window(data, len(data) - 1024, 1024)
+    matches = list(_STARTXREF_RE.finditer(tail))
+    if not matches:
+        return None
+    xref_offset = int(matches[-1].group(1))
+    
+    trailer = _window(data, xref_offset, 64 * 1024)
+    trailer_at = trailer.find(b"trailer")
+    root = _ROOT_RE.search(trailer, trailer_at) if trailer_at != -1 else None
+    if root is None:
+        return None
+    
+    root_num = int(root.group(1))
+    root_offset = _find_object_offset(data, xref_offset, root_num)
+    catalog = _read_object(data, root_offset, root_num) if root_offset is not None else None
+    pages = _PAGES_RE.search(catalog) if catalog else None
+    if pages is None:
+        return None
+    
+    pages_num = int(pages.group(1))
+    pages_offset = _find_object_offset(data, xref_offset, pages_num)
+    page_tree = _read_object(data, pages_offset, pages_num) if pages_offset is not None else None
+    count = _COUNT_RE.search(page_tree) if page_tree else None
+    if count is None:
+        return None
+    return int(count.group(1))
+
+_PAGE_MARKER_RE = re.compile(r"(?:^|\n)--- Page (\d+) ---\n")
+
+def _split_pages(text: str) -> Iterator[Tuple[int, str]]:
+    """Split extract_text output back into (page number, page text) pairs."""
+    parts = _PAGE_MARKER_RE.split(text)
+    for i in range(1, len(parts) - 1, 2):
+        yield int(parts[i]), parts[i + 1]
+
+_shared_caches: Dict[Tuple[str, int], PDFTextCache] = {}
+
+def _get_shared_cache(path: str, max_bytes: int) -> PDFTextCache:
+    """Reuse one cache connection per path for every PDFProcessor in the process."""
+    # Keyed by pid too: SQLite connections must not be shared with forked pool workers
+    key = (path, os.getpid())
+    if key not in _shared_caches:
+        _shared_caches[key] = PDFTextCache(path, max_bytes=max_bytes)
+    return _shared_caches[key]
+
+_shared_pool: Optional[ProcessPoolExecutor] = None
+_shared_pool_lock = threading.Lock()
+
+def get_shared_pool() -> ProcessPoolExecutor:
+    """
+    Get the process pool shared by every PDFProcessor, creating it on first use.
+    
+    The pool lives as long as the process, so Streamlit reruns and concurrent
+    sessions reuse warm workers instead of starting new ones per claim.
+    Workers come from a forkserver (spawn where that is unavailable): forking
+    the threaded Streamlit server directly can deadlock a child on a lock
+    another thread held at fork time.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        # A worker that dies (e.g. OOM on a huge scan) breaks the pool for good; replace it
+        if _shared_pool is None or getattr(_shared_pool, '_broken', False):
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _shared_pool = ProcessPoolExecutor(
+                max_workers=settings.PDF_POOL_WORKERS or None,
+                mp_context=multiprocessing.get_context(start_method)
+            )
+        return _shared_pool
+
+def _extract_document_worker(source: Union[str, bytes], name: str, doc_type: str, backend_name: str,
+                             cache_path: Optional[str], cache_max_bytes: int,
+                             max_pages: int, max_chars: int, dedup: bool) -> Dict[str, Any]:
+    """
+    Run extract_document for one file inside a pool worker.
+    
+    Workers do not share the caller's memory, so the cache is reopened from
+    its path and the budgets are passed as resolved by the caller.
+    """
+    cache = _get_shared_cache(cache_path, cache_max_bytes) if cache_path else None
+    processor = PDFProcessor(backend=backend_name, parallel_workers=0, cache=cache)
+    processor.cache = cache  # A caller without a cache stays uncached, whatever the worker's settings say
+    with (ParsedPDF.from_path(source) if isinstance(source, str) else ParsedPDF(source, name=name)) as pdf:
+        return processor.extract_document(pdf, doc_type, max_pages=max_pages, max_chars=max_chars, dedup=dedup)
+
+class _BufferStream(io.RawIOBase):
+    """Read-only seekable stream over a memoryview or mmap, so extractors can parse it without a copy."""
+    
+    def __init__(self, buffer: Union[memoryview, mmap.mmap]):
+        self._buffer = buffer
+        self._pos = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._buffer) if size is None or size < 0 else min(self._pos + size, len(self._buffer))
+        chunk = bytes(self._buffer[self._pos:end])
+        self._pos = max(self._pos, end)
+        return chunk
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._buffer)
+        self._pos = max(0, offset)
+        return self._pos
+    
+    def tell(self) -> int:
+        return self._pos
+
+class ParsedPDF:
+    """A PDF document read and parsed once, shared across validation, info and extraction."""
+    
+    def __init__(self, data: Union[bytes, bytearray, memoryview, mmap.mmap], name: str = "document.pdf",
+                 size: Optional[int] = None, path: Optional[str] = None):
+        self.data = data
+        self.name = name
+        self.size = size if size is not None else len(data)
+        self.path = path
+        self._reader = None
+        self._sha256 = None
+        self._quick_page_count = None
+        self._quick_checked = False
+        self._documents = {}
+    
+    @classmethod
+    def from_path(cls, path: Union[str, os.PathLike]) -> "ParsedPDF":
+        """
+        Memory-map a PDF on disk instead of reading it into memory.
+        
+        Args:
+            path: Filesystem path to the PDF
+            
+        Returns:
+            ParsedPDF: Handle backed by a read-only memory map; call close() when done
+        """
+        path = os.fspath(path)
+        with open(path, 'rb') as fh:
+            # The map keeps its own reference to the file, so the descriptor can close here
+            data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(data, name=os.path.basename(path), path=path)
+    
+    @classmethod
+    def from_upload(cls, pdf_file) -> "ParsedPDF":
+        """
+        Read an uploaded file exactly once and wrap its bytes.
+        
+        Args:
+            pdf_file: Streamlit uploaded file object
+            
+        Returns:
+            ParsedPDF: Handle owning the file bytes
+        """
+        data = pdf_file.read()
+        pdf_file.seek(0)  # Reset file pointer for potential reuse
+        return cls(data, name=pdf_file.name, size=getattr(pdf_file, 'size', None))
+    
+    @property
+    def reader(self) -> PyPDF2.PdfReader:
+        """PyPDF2 reader, built on first access and reused afterwards."""
+        if self._reader is None:
+            self._reader = PyPDF2.PdfReader(self.stream())
+        return self._reader
+    
+    def stream(self) -> io.RawIOBase:
+        """Get a new seekable stream over the document bytes without copying them."""
+        if isinstance(self.data, (bytes, bytearray)):
+            return io.BytesIO(self.data)
+        if isinstance(self.data, mmap.mmap):
+            return _BufferStream(self.data)
+        return _BufferStream(memoryview(self.data).cast('B'))
+    
+    def document(self, backend: PDFBackend):
+        """Backend-specific document, loaded on first use and reused afterwards."""
+        if backend.name not in self._documents:
+            self._documents[backend.name] = backend.load(self)
+        return self._documents[backend.name]
+    
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 digest of the document bytes."""
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.data).hexdigest()
+        return self._sha256
+    
+    @property
+    def page_count(self) -> int:
+        """Number of pages in the parsed document."""
+        return len(self.reader.pages)
+    
+    @property
+    def quick_page_count(self) -> Optional[int]:
+        """Page count read from the trailer and page tree root without a full parse, if decidable."""
+        if not self._quick_checked:
+            try:
+                self._quick_page_count = _quick_page_count(self.data)
+            except (ValueError, IndexError):
+                self._quick_page_count = None
+            self._quick_checked = True
+        return self._quick_page_count
+    
+    def close(self) -> None:
+        """Release loaded backend documents and any memory map backing a path-based document."""
+        for backend_name, document in self._documents.items():
+            get_backend(backend_name).close(document)
+        self._documents = {}
+        self._reader = None
+        if isinstance(self.data, mmap.mmap) and not self.data.closed:
+            self.data.close()
+    
+    def __enter__(self) -> "ParsedPDF":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
 class PDFProcessor:
     """Handles PDF file processing and text extraction."""
     
-    def __init__(self):
+    def __init__(self, parallel_workers: Optional[int] = None, parallel_min_pages: Optional[int] = None,
+                 cache: Optional[PDFTextCache] = None, backend: Union[str, PDFBackend, None] = None,
+                 pool: Optional[Executor] = None):
         self.logger = logging.getLogger(__name__)
+        
+        # Worker pool for parallel pages and multi-document batches; the process-wide pool by default
+        self._pool = pool
+        
+        # Text extractor; PyPDF2 unless another backend is configured
+        if backend is None:
+            backend = settings.PDF_BACKEND
+        self.backend = get_backend(backend) if isinstance(backend, str) else backend
+        
+        # Extracted text cache keyed by content hash; configured through settings when not supplied
+        if cache is None and settings.PDF_TEXT_CACHE_PATH:
+            cache = _get_shared_cache(settings.PDF_TEXT_CACHE_PATH, settings.PDF_TEXT_CACHE_MAX_BYTES)
+        self.cache = cache
+        
+        # Parallel extraction is opt-in; documents below the crossover stay serial
+        self.parallel_workers = settings.PDF_PARALLEL_WORKERS if parallel_workers is None else parallel_workers
+        self.parallel_min_pages = settings.PDF_PARALLEL_MIN_PAGES if parallel_min_pages is None else parallel_min_pages
     
-    def extract_text(self, pdf_file) -> str:
+    def open(self, pdf_file) -> ParsedPDF:
         """
-        Extract text content from uploaded PDF file.
+        Get a shared parsed handle for an uploaded file, path or buffer.
+        
+        Pass the returned handle to validate_pdf, get_pdf_info and extract_text
+        so the upload is read and parsed only once. Paths are memory-mapped and
+        bytes/memoryview buffers are used in place, so neither is copied.
         
         Args:
-            pdf_file: Streamlit uploaded file object
+            pdf_file: Streamlit uploaded file object, filesystem path, bytes,
+                memoryview or an existing ParsedPDF
             
         Returns:
-            str: Extracted text content
+            ParsedPDF: Parsed document handle
         """
+        if isinstance(pdf_file, ParsedPDF):
+            return pdf_file
+        if isinstance(pdf_file, (str, os.PathLike)):
+            return ParsedPDF.from_path(pdf_file)
+        if isinstance(pdf_file, (bytes, bytearray, memoryview)):
+            return ParsedPDF(pdf_file)
+        return ParsedPDF.from_upload(pdf_file)
+    
+    @contextmanager
+    def _opened(self, pdf_file) -> Iterator[ParsedPDF]:
+        """Open an input for one call, releasing any memory map this call created."""
+        pdf = self.open(pdf_file)
         try:
-            # Create PDF reader object
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file.read()))
-            
-            # Extract text from all pages
-            text_content = ""
-            for page_num, page in enumerate(pdf_reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_content += f"\n--- Page {page_num + 1} ---\n"
-                        text_content += page_text
-                except Exception as e:
-                    self.logger.warning(f"Could not extract text from page {page_num + 1}: {e}")
-                    continue
+            yield pdf
+        finally:
+            if pdf is not pdf_file:
+                pdf.close()
+    
+    def _source_name(self, pdf_file) -> str:
+        """Get a display name for any supported input without reading it."""
+        if isinstance(pdf_file, (str, os.PathLike)):
+            return os.path.basename(os.fspath(pdf_file))
+        return getattr(pdf_file, 'name', 'document.pdf')
+    
+    def iter_pages(self, pdf_file, max_pages: int = 0) -> Iterator[Tuple[int, str]]:
+        """
+        Yield the text of each page as soon as it is decoded.
+        
+        Pages that fail to decode or contain no text are skipped, matching
+        extract_text. Only one page of text is held at a time.
+        
+        Args:
+            pdf_file: Streamlit uploaded file object, path, buffer or ParsedPDF
+            max_pages: Decode only the first N pages (0 = all pages)
             
-            # Reset file pointer for potential reuse
-            pdf_file.seek(0)
+        Yields:
+            tuple: (1-based page number, page text)
+        """
+        with self._opened(pdf_file) as pdf:
+            document = pdf.document(self.backend)
+            stop = self.backend.page_count(document)
+            if max_pages:
+                stop = min(stop, max_pages)
+            
+            if self._use_parallel(stop):
+                yield from self._iter_pages_parallel(pdf, stop)
+                return
+            
+            for index, page_text, error in self.backend.iter_pages(document, 0, stop):
+                if error is not None:
+                    self.logger.warning(f"Could not extract text from page {index + 1}: {error}")
+                    continue
+                if page_text:
+                    yield index + 1, page_text
+    
+    @property
+    def pool(self) -> Executor:
+        """Executor used for parallel work, shared across processors unless one was supplied."""
+        return self._pool if self._pool is not None else get_shared_pool()
+    
+    def _use_parallel(self, page_count: int) -> bool:
+        """Decide whether a document is large enough to pay for a process pool."""
+        return self.parallel_workers > 1 and page_count >= self.parallel_min_pages
+    
+    def _iter_pages_parallel(self, pdf: ParsedPDF, page_count: int) -> Iterator[Tuple[int, str]]:
+        """Extract contiguous page ranges across a process pool, yielding pages in order."""
+        workers = min(self.parallel_workers, page_count)
+        chunk_size = -(-page_count // workers)
+        starts = list(range(0, page_count, chunk_size))
+        stops = [min(start + chunk_size, page_count) for start in starts]
+        
+        # Path-backed documents are re-mapped by each worker instead of pickling their bytes
+        source = pdf.path if pdf.path else bytes(pdf.data)
+        futures = [
+            self.pool.submit(_extract_page_range, source, start, stop, self.backend.name)
+            for start, stop in zip(starts, stops)
+        ]
+        try:
+            # Collect ranges in submission order so pages come back ordered
+            for future in futures:
+                for page_num, page_text, error in future.result():
+                    if error is not None:
+                        self.logger.warning(f"Could not extract text from page {page_num}: {error}")
+                        continue
+                    if page_text:
+                        yield page_num, page_text
+        finally:
+            # A consumer that stops early (e.g. a character budget) abandons the remaining ranges
+            for future in futures:
+                future.cancel()
+    
+    def extract_text(self, pdf_file) -> str:
+        """
+        Extract text content from uploaded PDF file.
+        
+        Args:
+            pdf_file: Streamlit uploaded file object, path, buffer or ParsedPDF
             
-            if not text_content.strip():
-                raise ValueError("No text content could be extracted from PDF")
+        Returns:
+            str: Extracted text content, with page boilerplate left verbatim
+        """
+        return self.extract_document(pdf_file, dedup=False)['content']
+    
+    def extract_document(self, pdf_file, doc_type: Optional[str] = None,
+                         max_pages: Optional[int] = None, max_chars: Optional[int] = None,
+                         dedup: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Extract text under a page and character budget, stopping early when either is hit.
+        
+        Args:
+            pdf_file: Streamlit uploaded file object, path, buffer or ParsedPDF
+            doc_type: Document type used to look up budgets in settings
+            max_pages: Page budget (0 = unlimited, None = from settings)
+            max_chars: Character budget for the returned text (0 = unlimited, None = from settings)
+            dedup: Strip header/footer lines repeated across pages (None = from settings)
             
-            return text_content.strip()
+        Returns:
+            dict: content, truncated flag, pages_covered, page_count and dedup stats
+        """
+        name = self._source_name(pdf_file)
+        default_pages, default_chars = settings.get_extraction_limits(doc_type)
+        max_pages = default_pages if max_pages is None else max_pages
+        max_chars = default_chars if max_chars is None else max_chars
+        dedup = settings.PDF_DEDUP_BOILERPLATE if dedup is None else dedup
+        
+        try:
+            with self._opened(pdf_file) as pdf:
+                # The cache holds the verbatim full text; budgets and dedup are applied on every read
+                cached_text = None
+                if self.cache is not None:
+                    cache_key = PDFTextCache.make_key(pdf.sha256, self.backend.version)
+                    cached_text = self.cache.get(cache_key)
+                
+                if cached_text is not None:
+                    pages = list(_split_pages(cached_text))
+                    page_count = pdf.quick_page_count
+                    if page_count is None:
+                        page_count = pages[-1][0] if pages else 0
+                else:
+                    page_count = self.backend.page_count(pdf.document(self.backend))
+                    pages = self.iter_pages(pdf, max_pages=max_pages)
+                
+                # Whole pages as decoded on a miss; cached only if the budget let the full document through
+                decoded = [] if cached_text is None and self.cache is not None else None
+                kept_pages = []
+                chars = 0
+                last_page = 0
+                char_limited = False
+                for page_num, page_text in pages:
+                    if max_pages and page_num > max_pages:
+                        break
+                    last_page = page_num
+                    if decoded is not None:
+                        decoded.append((page_num, page_text))
+                    
+                    marker = f"--- Page {page_num} ---\n"
+                    separator = 1 if kept_pages else 0
+                    if max_chars and chars + separator + len(marker) + len(page_text) > max_chars:
+                        remaining = max_chars - chars - separator - len(marker)
+                        if remaining > 0:
+                            kept_pages.append((page_num, page_text[:remaining]))
+                        char_limited = True
+                        break
+                    kept_pages.append((page_num, page_text))
+                    chars += separator + len(marker) + len(page_text)
+                
+                if not isinstance(pages, list):
+                    pages.close()  # Stop any parallel workers still decoding pages past the budget
+                
+                # Pages without text after the last one still count as covered unless a budget cut in
+                if char_limited:
+                    pages_covered = last_page
+                else:
+                    pages_covered = min(page_count, max_pages) if max_pages else page_count
+                truncated = char_limited or pages_covered < page_count
+                
+                if decoded is not None and not truncated and any(page_text.strip() for _, page_text in decoded):
+                    self.cache.put(
+                        cache_key, "\n".join(f"--- Page {page_num} ---\n{page_text}" for page_num, page_text in decoded)
+                    )
+                
+                dedup_stats = None
+                if dedup:
+                    kept_pages, dedup_stats = strip_repeated_lines(kept_pages)
+                    if dedup_stats['lines_removed']:
+                        self.logger.info(
+                            f"Removed {dedup_stats['lines_removed']} repeated boilerplate lines from {name} "
+                            f"(~{dedup_stats['tokens_saved']} tokens)"
+                        )
+                
+                text_content = "\n".join(f"--- Page {page_num} ---\n{page_text}" for page_num, page_text in kept_pages)
+                if not text_content.strip():
+                    raise ValueError("No text content could be extracted from PDF")
+                
+                text_content = text_content.strip()
+                
+                if truncated:
+                    self.logger.info(f"Extraction of {name} stopped early after page {pages_covered} (budget reached)")
+                
+                return {
+                    'content': text_content,
+                    'truncated': truncated,
+                    'pages_covered': pages_covered,
+                    'page_count': page_count,
+                    'dedup': dedup_stats
+                }
             
         except Exception as e:
-            self.logger.error(f"Error processing PDF {pdf_file.name}: {e}")
-            raise Exception(f"Failed to process PDF {pdf_file.name}: {str(e)}")
+            self.logger.error(f"Error processing PDF {name}: {e}")
+            raise Exception(f"Failed to process PDF {name}: {str(e)}")
+    
+    def extract_many(self, files: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Extract all of a claim's documents at once on the shared worker pool.
+        
+        Each document runs extract_document in its own worker, so wall time
+        tracks the slowest document rather than the sum of all of them.
+        
+        Args:
+            files: Mapping of document type to upload, path, buffer or ParsedPDF;
+                empty entries are skipped
+            
+        Returns:
+            dict: extract_document results keyed by document type
+        """
+        files = {doc_type: pdf_file for doc_type, pdf_file in files.items() if pdf_file is not None}
+        if len(files) <= 1:
+            return {doc_type: self.extract_document(pdf_file, doc_type) for doc_type, pdf_file in files.items()}
+        
+        cache_path = self.cache.path if self.cache is not None else None
+        cache_max_bytes = self.cache.max_bytes if self.cache is not None else 0
+        futures = {}
+        for doc_type, pdf_file in files.items():
+            # Workers receive a path or raw bytes; uploads are read once here
+            if isinstance(pdf_file, (str, os.PathLike)):
+                source, name = os.fspath(pdf_file), self._source_name(pdf_file)
+            else:
+                pdf = self.open(pdf_file)
+                source, name = (pdf.path if pdf.path else bytes(pdf.data)), pdf.name
+            max_pages, max_chars = settings.get_extraction_limits(doc_type)
+            futures[doc_type] = self.pool.submit(
+                _extract_document_worker, source, name, doc_type, self.backend.name,
+                cache_path, cache_max_bytes, max_pages, max_chars, settings.PDF_DEDUP_BOILERPLATE
+            )
+        
+        return {doc_type: future.result() for doc_type, future in futures.items()}
+    
+    def write_text(self, pdf_file, output: TextIO) -> int:
+        """
+        Stream extracted text to a writable text stream page by page.
+        
+        Bounded-memory alternative to extract_text for very long documents:
+        the full document text is never assembled in memory.
+        
+        Args:
+            pdf_file: Streamlit uploaded file object, path, buffer or ParsedPDF
+            output: Writable text stream (open file, socket wrapper, etc.)
+            
+        Returns:
+            int: Number of pages written
+        """
+        pages_written = 0
+        for page_num, page_text in self.iter_pages(pdf_file):
+            if pages_written:
+                output.write("\n")
+            output.write(f"--- Page {page_num} ---\n{page_text}")
+            pages_written += 1
+        
+        if not pages_written:
+            raise ValueError("No text content could be extracted from PDF")
+        
+        return pages_written
     
     def validate_pdf(self, pdf_file) -> bool:
         """
         Validate that uploaded file is a valid PDF.
         
         Args:
-            pdf_file: Streamlit uploaded file object
+            pdf_file: Streamlit uploaded file object, path, buffer or ParsedPDF
             
         Returns:
             bool: True if valid PDF, False otherwise
         """
         try:
             # Check file extension
-            if not pdf_file.name.lower().endswith('.pdf'):
+            if not self._source_name(pdf_file).lower().endswith('.pdf'):
                 return False
             
-            # Try to read PDF header
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file.read()))
-            pdf_file.seek(0)  # Reset file pointer
-            
-            # Check if PDF has pages
-            return len(pdf_reader.pages) > 0
+            # Check if PDF has pages, falling back to a full parse only when
+            # the header/trailer/page tree fast path cannot decide
+            with self._opened(pdf_file) as pdf:
+                page_count = pdf.quick_page_count
+                if page_count is None:
+                    page_count = pdf.page_count
+                return page_count > 0
             
         except Exception:
             return False
@@ -78,34 +672,34 @@ class PDFProcessor:
         Get basic information about the PDF file.
         
         Args:
-            pdf_file: Streamlit uploaded file object
+            pdf_file: Streamlit uploaded file object, path, buffer or ParsedPDF
             
         Returns:
             dict: PDF metadata and information
         """
         try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file.read()))
-            pdf_file.seek(0)  # Reset file pointer
-            
-            info = {
-                'filename': pdf_file.name,
-                'file_size': f"{pdf_file.size / 1024:.1f} KB",
-                'page_count': len(pdf_reader.pages),
-                'is_encrypted': pdf_reader.is_encrypted,
-                'metadata': {}
-            }
-            
-            # Try to get metadata
-            if pdf_reader.metadata:
-                for key, value in pdf_reader.metadata.items():
-                    if value:
-                        info['metadata'][key] = str(value)
-            
-            return info
+            with self._opened(pdf_file) as pdf:
+                pdf_reader = pdf.reader
+                
+                info = {
+                    'filename': pdf.name,
+                    'file_size': f"{pdf.size / 1024:.1f} KB",
+                    'page_count': len(pdf_reader.pages),
+                    'is_encrypted': pdf_reader.is_encrypted,
+                    'metadata': {}
+                }
+                
+                # Try to get metadata
+                if pdf_reader.metadata:
+                    for key, value in pdf_reader.metadata.items():
+                        if value:
+                            info['metadata'][key] = str(value)
+                
+                return info
             
         except Exception as e:
             self.logger.error(f"Error getting PDF info: {e}")
             return {
-                'filename': pdf_file.name,
+                'filename': self._source_name(pdf_file),
                 'error': str(e)
             }
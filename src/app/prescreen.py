@@ -0,0 +1,204 @@
+"""
+Rule-based local pre-screen of extracted document text for decisive red flags.
+"""
+
+import logging
+import re
+from bisect import bisect_right
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    from ..config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+try:
+    from .claim_evaluator import SEVERITY_PHRASES
+except ImportError:
+    from claim_evaluator import SEVERITY_PHRASES
+
+_PAGE_MARKER = re.compile(r"--- Page (\d+) ---")
+
+# "No salvage title", "not reported stolen", "clear of fraud" describe the absence of a problem
+_NEGATION = re.compile(
+    r"\b(no|not|never|without|none|negative|free of|clear of|absence of)\b[^.;:\n]{0,40}$",
+    re.IGNORECASE
+)
+
+# Checklist answers after the phrase: "Salvage title: No", "Stolen vehicle check: No record found"
+_ANSWER = r"[^.;:?\n]{0,40}?(?:\s*[:?=]|\s[-\u2013])\s*"
+_NEGATIVE_ANSWER = re.compile(
+    _ANSWER + r"(no|not\b[^.;\n]{0,30}|none|nil|clear|clean|negative|false|n/?a|n|unknown|0)\b"
+    r"|[^.;\n]{0,60}\b(no records?|none found|not found)\b",
+    re.IGNORECASE
+)
+_POSITIVE_ANSWER = re.compile(
+    _ANSWER + r"(yes|y|true|confirmed|positive|present|reported|branded|found)\b",
+    re.IGNORECASE
+)
+
+# The phrase is the value of a field, e.g. "Title brand: Rebuilt title"
+_FIELD_VALUE = re.compile(r":\s*(\w+\s+){0,2}$")
+
+# How much text around a match to quote as evidence
+_EVIDENCE_CHARS = 80
+
+def _phrase_pattern(phrase: str) -> re.Pattern:
+    """Whole-word, case-insensitive pattern for a phrase, tolerating line breaks between words."""
+    words = [re.escape(word) for word in phrase.split()]
+    return re.compile(r"\b" + r"[\s-]+".join(words) + r"\b", re.IGNORECASE)
+
+class PreScreener:
+    """
+    Scan extracted text for the decisive phrases ClaimEvaluator grades by severity.
+    
+    Runs in milliseconds before any AIAnalyzer call. Each hit becomes a red
+    flag in the analysis schema, with the quoted evidence and the page it
+    came from, so a salvage title on page 2 of a history report is known
+    before a minute of model time is spent on it. Negated mentions ("no
+    salvage title reported") and negative checklist answers ("Salvage
+    title: No", "Fraud referral: Not required") are ignored. A hit is
+    confirmed when it is stated as a field value or answered yes, or when
+    it is mentioned more than once; only confirmed hits become red flags,
+    and only confirmed CRITICAL hits can skip or defer the LLM calls.
+    Unconfirmed hits are passed on as review notes.
+    """
+    
+    def __init__(self, doc_types: Optional[List[str]] = None):
+        self.logger = logging.getLogger(__name__)
+        # Contracts list fraud, exclusions and violations as conditions, not findings, so they are not scanned
+        self.doc_types = settings.PRESCREEN_DOC_TYPES if doc_types is None else doc_types
+        self.patterns: List[Tuple[str, str, re.Pattern]] = [
+            (severity, phrase, _phrase_pattern(phrase))
+            for severity, phrases in SEVERITY_PHRASES.items()
+            for phrase in phrases
+        ]
+    
+    def scan(self, doc_type: str, text: str) -> List[Dict[str, Any]]:
+        """
+        Find decisive phrases in one document.
+        
+        Args:
+            doc_type: Document type, e.g. "history"
+            text: Extracted text with PDFProcessor page markers
+            
+        Returns:
+            list: Red flags with issue, severity, impact, evidence, page and
+                confirmed; one per phrase, at its first non-negated mention
+        """
+        if doc_type not in self.doc_types or not text:
+            return []
+        
+        page_starts, page_numbers = [], []
+        for marker in _PAGE_MARKER.finditer(text):
+            page_starts.append(marker.start())
+            page_numbers.append(int(marker.group(1)))
+        
+        flags = []
+        for severity, phrase, pattern in self.patterns:
+            flag = None
+            mentions = 0
+            for match in pattern.finditer(text):
+                line_start = text.rfind("\n", 0, match.start()) + 1
+                line_end = text.find("\n", match.end())
+                after = text[match.end():line_end if line_end != -1 else len(text)]
+                sentence_start = max(text.rfind(boundary, 0, match.start()) for boundary in ".;\n") + 1
+                if _NEGATION.search(text[sentence_start:match.start()]) or _NEGATIVE_ANSWER.match(after):
+                    continue
+                
+                mentions += 1
+                affirmed = bool(_POSITIVE_ANSWER.match(after) or _FIELD_VALUE.search(text[line_start:match.start()]))
+                if flag is not None:
+                    flag['confirmed'] = flag['confirmed'] or affirmed
+                    continue
+                
+                index = bisect_right(page_starts, match.start()) - 1
+                page = page_numbers[index] if index >= 0 else None
+                evidence = text[max(match.start() - _EVIDENCE_CHARS, 0):match.end() + _EVIDENCE_CHARS]
+                flag = {
+                    'issue': f"{phrase.capitalize()} found in {doc_type} document"
+                             + (f" (page {page})" if page else ""),
+                    'severity': severity,
+                    'impact': "Detected by local pre-screen; confirm against the source document",
+                    'evidence': " ".join(evidence.split()),
+                    'page': page,
+                    'phrase': phrase,
+                    'source': "prescreen",
+                    'confirmed': affirmed
+                }
+            if flag is not None:
+                flag['confirmed'] = flag['confirmed'] or mentions > 1
+                flags.append(flag)
+        return flags
+    
+    def scan_all(self, documents: Dict[str, str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Scan every document, returning its pre-screen flags keyed by document type."""
+        results = {doc_type: self.scan(doc_type, text) for doc_type, text in documents.items()}
+        total = sum(len(flags) for flags in results.values())
+        if total:
+            self.logger.info(f"Pre-screen found {total} red flag(s)")
+        return results
+    
+    @staticmethod
+    def is_decisive(results: Dict[str, List[Dict[str, Any]]]) -> bool:
+        """Whether any document has a confirmed CRITICAL pre-screen hit."""
+        return any(
+            flag['severity'] == 'CRITICAL' and flag.get('confirmed')
+            for flags in results.values() for flag in flags
+        )
+    
+    @staticmethod
+    def review_note(flag: Dict[str, Any]) -> str:
+        """Recommendation asking a reviewer to check an unconfirmed hit."""
+        return f"Check unconfirmed pre-screen mention of \"{flag['phrase']}\": {flag['evidence']}"
+    
+    @staticmethod
+    def to_analysis(flags: List[Dict[str, Any]], deferred: bool = False) -> Dict[str, Any]:
+        """
+        Stand-in analysis for a document whose LLM call was skipped or deferred.
+        
+        Args:
+            flags: The document's pre-screen flags
+            deferred: Whether the LLM analysis can still be run on request
+            
+        Returns:
+            dict: Analysis with the usual red_flags, key_findings and recommendations
+        """
+        status = "deferred" if deferred else "skipped"
+        confirmed = [flag for flag in flags if flag.get('confirmed')]
+        return {
+            'red_flags': confirmed,
+            'key_findings': [flag['issue'] for flag in confirmed] or ["No decisive phrases found by pre-screen"],
+            'recommendations': [f"AI analysis {status} after a CRITICAL pre-screen hit; review the document manually"]
+                               + [PreScreener.review_note(flag) for flag in flags if not flag.get('confirmed')],
+            'prescreen': status
+        }
+    
+    @staticmethod
+    def merge(analysis: Dict[str, Any], flags: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Add confirmed pre-screen flags to an LLM analysis, skipping phrases the model already flagged.
+        
+        Unconfirmed hits the model did not flag are added as review notes
+        under recommendations instead of red flags.
+        
+        Args:
+            analysis: Parsed LLM analysis of the document
+            flags: The document's pre-screen flags
+            
+        Returns:
+            dict: Analysis with the extra red flags and review notes
+        """
+        existing = " ".join(
+            str(flag.get('issue', '') if isinstance(flag, dict) else flag).lower()
+            for flag in analysis.get('red_flags') or []
+        )
+        extra = [flag for flag in flags if flag['phrase'] not in existing]
+        if not extra:
+            return analysis
+        return {
+            **analysis,
+            'red_flags': list(analysis.get('red_flags') or []) + [flag for flag in extra if flag.get('confirmed')],
+            'recommendations': list(analysis.get('recommendations') or [])
+                               + [PreScreener.review_note(flag) for flag in extra if not flag.get('confirmed')]
+        }
@@ -0,0 +1,197 @@
+"""
+Client-side token-bucket rate limiting for OpenAI requests and tokens per minute.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+try:
+    from ..config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+# (requests available, tokens available, last refill timestamp)
+BucketState = Tuple[float, float, float]
+
+class RateLimiter:
+    """
+    Paired token buckets for requests per minute (RPM) and tokens per minute (TPM).
+    
+    Each bucket holds up to one minute of allowance and refills continuously.
+    Callers block until both buckets can cover their request instead of
+    receiving 429s from the API. With a path, bucket state lives in a SQLite
+    file so every worker process on the host draws from the same allowance.
+    """
+    
+    def __init__(self, rpm: int = 0, tpm: int = 0, path: Optional[str] = None, name: str = "openai"):
+        self.logger = logging.getLogger(__name__)
+        self.rpm = rpm
+        self.tpm = tpm
+        self.path = path
+        self.name = name
+        self._lock = threading.Lock()
+        self._state: Optional[BucketState] = None
+        self._conn = None
+        
+        if path and self.enabled:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Writers serialize on BEGIN IMMEDIATE; wait for the lock rather than failing
+            self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_buckets (
+                    name TEXT PRIMARY KEY,
+                    requests REAL NOT NULL,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL
+                )
+            """)
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether any limit is configured."""
+        return self.rpm > 0 or self.tpm > 0
+    
+    def _refill(self, state: Optional[BucketState], now: float) -> BucketState:
+        """Top up both buckets for the time elapsed since the last refill."""
+        if state is None:
+            return float(self.rpm), float(self.tpm), now
+        requests, tokens, updated = state
+        elapsed = max(0.0, now - updated)
+        return (
+            min(float(self.rpm), requests + elapsed * self.rpm / 60.0),
+            min(float(self.tpm), tokens + elapsed * self.tpm / 60.0),
+            now
+        )
+    
+    def _take(self, state: Optional[BucketState], now: float, tokens: int) -> Tuple[BucketState, float]:
+        """
+        Try to take one request and the given tokens from the buckets.
+        
+        Returns:
+            tuple: New bucket state and seconds to wait (0 when taken)
+        """
+        available_requests, available_tokens, _ = self._refill(state, now)
+        # A request larger than the whole bucket would never fit; let it through at a full bucket
+        tokens = min(tokens, self.tpm)
+        
+        wait = 0.0
+        if self.rpm > 0 and available_requests < 1:
+            wait = max(wait, (1 - available_requests) * 60.0 / self.rpm)
+        if self.tpm > 0 and available_tokens < tokens:
+            wait = max(wait, (tokens - available_tokens) * 60.0 / self.tpm)
+        
+        if wait == 0:
+            if self.rpm > 0:
+                available_requests -= 1
+            available_tokens -= tokens
+        return (available_requests, available_tokens, now), wait
+    
+    def _update(self, change) -> float:
+        """Apply a state change under the in-process lock or a SQLite write transaction."""
+        with self._lock:
+            if self._conn is None:
+                self._state, result = change(self._state, time.monotonic())
+                return result
+            
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT requests, tokens, updated FROM rate_buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                # Wall-clock time, since monotonic clocks aren't comparable across processes
+                state, result = change(tuple(row) if row else None, time.time())
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_buckets (name, requests, tokens, updated) VALUES (?, ?, ?, ?)",
+                    (self.name, *state)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return result
+    
+    def try_acquire(self, tokens: int = 0) -> float:
+        """
+        Take one request and the estimated tokens if both buckets allow it.
+        
+        Args:
+            tokens: Estimated prompt plus completion tokens
+            
+        Returns:
+            float: 0 when acquired, otherwise seconds until it could succeed
+        """
+        if not self.enabled:
+            return 0.0
+        return self._update(lambda state, now: self._take(state, now, tokens))
+    
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until one request and the estimated tokens are available.
+        
+        Args:
+            tokens: Estimated prompt plus completion tokens
+            
+        Returns:
+            float: Seconds spent waiting
+        """
+        started = time.monotonic()
+        wait = self.try_acquire(tokens)
+        while wait > 0:
+            time.sleep(wait)
+            wait = self.try_acquire(tokens)
+        return time.monotonic() - started
+    
+    async def acquire_async(self, tokens: int = 0) -> float:
+        """Coroutine form of acquire that yields to the event loop while waiting."""
+        started = time.monotonic()
+        wait = self.try_acquire(tokens)
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = self.try_acquire(tokens)
+        return time.monotonic() - started
+    
+    def adjust(self, token_delta: int) -> None:
+        """
+        Correct the token bucket once actual usage is known.
+        
+        Args:
+            token_delta: Estimated minus actual tokens; positive refunds, negative charges
+        """
+        if not self.enabled or not token_delta:
+            return
+        
+        def change(state, now):
+            requests, tokens, updated = self._refill(state, now)
+            return (requests, min(float(self.tpm), tokens + token_delta), updated), None
+        
+        self._update(change)
+    
+    def close(self) -> None:
+        """Close the shared bucket database, if any."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+_shared_limiters: Dict[Tuple[int, int, str, int], RateLimiter] = {}
+_shared_limiters_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide limiter configured by the OPENAI_*_LIMIT settings."""
+    # Keyed by pid too: SQLite connections must not be shared with forked workers
+    key = (settings.OPENAI_RPM_LIMIT, settings.OPENAI_TPM_LIMIT, settings.OPENAI_RATE_LIMIT_PATH, os.getpid())
+    with _shared_limiters_lock:
+        if key not in _shared_limiters:
+            _shared_limiters[key] = RateLimiter(
+                rpm=settings.OPENAI_RPM_LIMIT,
+                tpm=settings.OPENAI_TPM_LIMIT,
+                path=settings.OPENAI_RATE_LIMIT_PATH or None
+            )
+        return _shared_limiters[key]
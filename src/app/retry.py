@@ -0,0 +1,268 @@
+"""
+Retries with jittered exponential backoff, and hedged requests against tail latency.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+import openai
+
+try:
+    from ..config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+# Status codes worth another attempt besides 429 and 5xx: request timeout and lock conflict
+_RETRYABLE_STATUS = {408, 409}
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an API error is transient: timeouts, dropped connections, 429s and 5xx."""
+    if isinstance(error, openai.APIConnectionError):
+        # Includes APITimeoutError
+        return True
+    if isinstance(error, openai.APIStatusError):
+        if getattr(error, 'code', None) == 'insufficient_quota':
+            # Billing problem, not load; waiting will not help
+            return False
+        return error.status_code == 429 or error.status_code >= 500 or error.status_code in _RETRYABLE_STATUS
+    return False
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """
+    Seconds the server asked us to wait, from the Retry-After headers of an API error.
+    
+    Args:
+        error: Exception raised by the OpenAI client
+        
+    Returns:
+        float: Delay in seconds, or None when the response did not say
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    
+    milliseconds = headers.get('retry-after-ms')
+    if milliseconds:
+        try:
+            return max(float(milliseconds) / 1000, 0.0)
+        except ValueError:
+            pass
+    
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        # HTTP-date form
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+class RetryPolicy:
+    """
+    Retry transient API failures and optionally hedge slow calls.
+    
+    Each retry waits a random delay up to base_delay * 2**attempt (full
+    jitter, so a burst of 429s does not come back in lockstep), or longer if
+    the server sent Retry-After. With hedge_quantile set, a call still
+    running after that quantile of recent latencies for its model gets a
+    duplicate request, and whichever finishes first wins.
+    """
+    
+    def __init__(self, max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 30.0,
+                 hedge_quantile: float = 0.0, hedge_min_samples: int = 20, window: int = 200):
+        self.logger = logging.getLogger(__name__)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.window = window
+        self.retries = 0
+        self.hedges = 0
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+    
+    def record_latency(self, key: str, seconds: float) -> None:
+        """Add a successful call's duration to the key's recent history."""
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=self.window)).append(seconds)
+    
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """
+        How long to wait before hedging a call.
+        
+        Args:
+            key: Latency history to use, normally the model name
+            
+        Returns:
+            float: The hedge_quantile latency, or None when hedging is off or
+                there are fewer than hedge_min_samples observations yet
+        """
+        if not 0 < self.hedge_quantile < 1:
+            return None
+        with self._lock:
+            samples = sorted(self._latencies.get(key, ()))
+        if len(samples) < max(self.hedge_min_samples, 1):
+            return None
+        return samples[min(int(len(samples) * self.hedge_quantile), len(samples) - 1)]
+    
+    def backoff(self, attempt: int, error: BaseException = None) -> float:
+        """Delay before retry number attempt (0-based), honoring Retry-After when it is longer."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        requested = retry_after(error) if error is not None else None
+        if requested is not None:
+            delay = max(delay, min(requested, self.max_delay))
+        return delay
+    
+    def _should_retry(self, attempt: int, error: BaseException) -> bool:
+        """Whether to retry after a failed attempt, counting the retry."""
+        if attempt >= self.max_retries or not is_retryable(error):
+            return False
+        with self._lock:
+            self.retries += 1
+        return True
+    
+    def call(self, attempt: Callable[[], Any], key: str = "", hedge: bool = True) -> Any:
+        """
+        Run a blocking call with retries.
+        
+        Args:
+            attempt: Makes one request; called again for each retry or hedge
+            key: Latency history for hedging, normally the model name
+            hedge: Allow a hedged duplicate (False for streams, whose output is consumed as it arrives)
+            
+        Returns:
+            The first successful attempt's result
+        """
+        for number in range(self.max_retries + 1):
+            try:
+                return self._hedged(attempt, key) if hedge else attempt()
+            except Exception as e:
+                if not self._should_retry(number, e):
+                    raise
+                delay = self.backoff(number, e)
+                self.logger.warning(f"Retrying {key or 'request'} in {delay:.1f}s after {type(e).__name__}: {e}")
+                time.sleep(delay)
+    
+    async def call_async(self, attempt: Callable[[], Awaitable[Any]], key: str = "", hedge: bool = True) -> Any:
+        """Async form of call; attempt returns a new coroutine each time."""
+        for number in range(self.max_retries + 1):
+            try:
+                return await (self._hedged_async(attempt, key) if hedge else attempt())
+            except Exception as e:
+                if not self._should_retry(number, e):
+                    raise
+                delay = self.backoff(number, e)
+                self.logger.warning(f"Retrying {key or 'request'} in {delay:.1f}s after {type(e).__name__}: {e}")
+                await asyncio.sleep(delay)
+    
+    def _timed(self, attempt: Callable[[], Any], key: str) -> Any:
+        """Run one attempt, recording its latency if it succeeds."""
+        start = time.monotonic()
+        result = attempt()
+        self.record_latency(key, time.monotonic() - start)
+        return result
+    
+    async def _timed_async(self, attempt: Callable[[], Awaitable[Any]], key: str) -> Any:
+        """Async form of _timed."""
+        start = time.monotonic()
+        result = await attempt()
+        self.record_latency(key, time.monotonic() - start)
+        return result
+    
+    def _hedge_pool(self) -> ThreadPoolExecutor:
+        """Threads for blocking hedged calls, created on first use."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=max(settings.OPENAI_MAX_CONNECTIONS, 2), thread_name_prefix="openai-hedge"
+                )
+            return self._pool
+    
+    def _hedged(self, attempt: Callable[[], Any], key: str) -> Any:
+        """Run a blocking attempt, racing a duplicate against it once it passes the hedge delay."""
+        delay = self.hedge_delay(key)
+        if delay is None:
+            return self._timed(attempt, key)
+        
+        pool = self._hedge_pool()
+        first = pool.submit(self._timed, attempt, key)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+        
+        self.logger.info(f"Hedging {key} call still running after {delay:.1f}s")
+        with self._lock:
+            self.hedges += 1
+        pending = {first, pool.submit(self._timed, attempt, key)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # A blocking request cannot be interrupted; the loser finishes and is ignored
+                    return future.result()
+        return first.result()
+    
+    async def _hedged_async(self, attempt: Callable[[], Awaitable[Any]], key: str) -> Any:
+        """Run an async attempt, racing a duplicate against it once it passes the hedge delay."""
+        delay = self.hedge_delay(key)
+        if delay is None:
+            return await self._timed_async(attempt, key)
+        
+        first = asyncio.ensure_future(self._timed_async(attempt, key))
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return first.result()
+            
+            self.logger.info(f"Hedging {key} call still running after {delay:.1f}s")
+            with self._lock:
+                self.hedges += 1
+            tasks.add(asyncio.ensure_future(self._timed_async(attempt, key)))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            return first.result()
+        finally:
+            # Cancelling the loser closes its HTTP request
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+_shared_policies: Dict[Tuple[Any, ...], RetryPolicy] = {}
+_shared_policies_lock = threading.Lock()
+
+def get_retry_policy() -> RetryPolicy:
+    """Get the process-wide retry policy from the OPENAI_RETRY_* and OPENAI_HEDGE_* settings."""
+    # Shared so hedge delays learn from every claim's latencies
+    key = (
+        settings.OPENAI_MAX_RETRIES, settings.OPENAI_RETRY_BASE_DELAY, settings.OPENAI_RETRY_MAX_DELAY,
+        settings.OPENAI_HEDGE_QUANTILE, settings.OPENAI_HEDGE_MIN_SAMPLES
+    )
+    with _shared_policies_lock:
+        if key not in _shared_policies:
+            _shared_policies[key] = RetryPolicy(
+                max_retries=settings.OPENAI_MAX_RETRIES,
+                base_delay=settings.OPENAI_RETRY_BASE_DELAY,
+                max_delay=settings.OPENAI_RETRY_MAX_DELAY,
+                hedge_quantile=settings.OPENAI_HEDGE_QUANTILE,
+                hedge_min_samples=settings.OPENAI_HEDGE_MIN_SAMPLES
+            )
+        return _shared_policies[key]
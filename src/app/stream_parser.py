@@ -0,0 +1,112 @@
+"""
+Incremental parsing of streamed JSON analysis responses.
+"""
+
+import json
+import logging
+from typing import Any, List, Optional, Set, Tuple
+
+class IncrementalJSONParser:
+    """
+    Emit the items of a streamed JSON object's top-level arrays as soon as each one is complete.
+    
+    Feed the response text in whatever pieces it arrives; every complete
+    element of an array such as "red_flags" or "key_findings" is returned as
+    a (field, item) pair without waiting for the rest of the response. Text
+    before the opening brace (e.g. a preamble the model added) is skipped.
+    """
+    
+    def __init__(self, fields: Optional[Set[str]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.fields = fields
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._key: Optional[str] = None
+        self._array_field: Optional[str] = None
+        self._item_start: Optional[int] = None
+        self._done = False
+    
+    def _in_array(self) -> bool:
+        """Whether the scanner is directly inside a top-level array."""
+        return self._stack == ['{', '[']
+    
+    def _emit(self, end: int, events: List[Tuple[str, Any]]) -> None:
+        """Decode the array element ending at end and record it as an event."""
+        text = self._buffer[self._item_start:end].strip()
+        self._item_start = None
+        if not text or (self.fields is not None and self._array_field not in self.fields):
+            return
+        try:
+            events.append((self._array_field, json.loads(text)))
+        except json.JSONDecodeError as e:
+            self.logger.warning(f"Skipping malformed streamed item in {self._array_field}: {e}")
+    
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """
+        Consume the next piece of the response.
+        
+        Args:
+            text: Newly received response text
+            
+        Returns:
+            list: (field, item) for each array element completed by this piece
+        """
+        events: List[Tuple[str, Any]] = []
+        self._buffer += text
+        buffer = self._buffer
+        
+        while self._pos < len(buffer) and not self._done:
+            i = self._pos
+            char = buffer[i]
+            self._pos += 1
+            
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._stack == ['{']:
+                        self._key = json.loads(buffer[self._string_start:i + 1])
+                    elif self._in_array() and self._item_start == self._string_start:
+                        self._emit(i + 1, events)
+                continue
+            
+            if not self._stack:
+                # Skip any preamble before the top-level object
+                if char == '{':
+                    self._stack.append(char)
+                continue
+            
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+                if self._in_array() and self._item_start is None:
+                    self._item_start = i
+            elif char in '{[':
+                if self._in_array() and self._item_start is None:
+                    self._item_start = i
+                self._stack.append(char)
+                if self._in_array():
+                    self._array_field = self._key
+            elif char in '}]':
+                if self._in_array() and self._item_start is not None:
+                    # A bare number/literal is the last element of the array
+                    self._emit(i, events)
+                self._stack.pop()
+                if self._in_array() and self._item_start is not None:
+                    self._emit(i + 1, events)
+                if not self._stack:
+                    self._done = True
+            elif char == ',':
+                if self._in_array() and self._item_start is not None:
+                    self._emit(i, events)
+            elif not char.isspace() and self._in_array() and self._item_start is None:
+                self._item_start = i
+        
+        return events
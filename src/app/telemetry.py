@@ -0,0 +1,225 @@
+"""
+Per-call LLM telemetry records, metrics sinks and per-claim summaries.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+try:
+    from ..config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+# USD per 1K (prompt, completion) tokens, matched by longest model-name prefix; estimates for reporting only
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    'gpt-4': (0.03, 0.06),
+    'gpt-4-32k': (0.06, 0.12),
+    'gpt-4-turbo': (0.01, 0.03),
+    'gpt-4o': (0.0025, 0.01),
+    'gpt-4o-mini': (0.00015, 0.0006),
+    'gpt-4.1': (0.002, 0.008),
+    'gpt-4.1-mini': (0.0004, 0.0016),
+    'gpt-3.5-turbo': (0.0005, 0.0015)
+}
+
+def estimate_cost(model: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> Optional[float]:
+    """
+    Estimate the USD cost of a call from its token usage.
+    
+    Args:
+        model: Model the call went to
+        prompt_tokens: Reported prompt tokens
+        completion_tokens: Reported completion tokens
+        
+    Returns:
+        float: Estimated cost, or None for an unknown model or missing usage
+    """
+    if prompt_tokens is None or completion_tokens is None:
+        return None
+    prefixes = [prefix for prefix in MODEL_PRICES if model.startswith(prefix)]
+    if not prefixes:
+        return None
+    prompt_price, completion_price = MODEL_PRICES[max(prefixes, key=len)]
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+def new_call_record(model: str, doc_type: Optional[str], cache: str, stream: bool = False) -> Dict[str, Any]:
+    """Start a telemetry record for one analysis call."""
+    return {
+        'timestamp': time.time(),
+        'model': model,
+        'doc_type': doc_type,
+        'cache': cache,  # hit, miss or off
+        'stream': stream,
+        'attempts': 0,
+        'retries': 0,
+        'queue_wait': 0.0,  # seconds waiting on the rate limiter
+        'latency': 0.0,  # seconds from sending the winning attempt to its full response
+        'prompt_tokens': None,
+        'completion_tokens': None,
+        'total_tokens': None,
+        'cost': None,
+        'status': "ok",
+        'error': None
+    }
+
+def summarize(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate call records, e.g. all calls made for one claim.
+    
+    Args:
+        records: Records from new_call_record, completed by the analyzer
+        
+    Returns:
+        dict: Call, cache, retry, token, cost and time totals, overall and per model
+    """
+    summary = {
+        'calls': 0,
+        'cache_hits': 0,
+        'errors': 0,
+        'retries': 0,
+        'prompt_tokens': 0,
+        'completion_tokens': 0,
+        'cost': 0.0,
+        'queue_wait': 0.0,
+        'latency': 0.0,
+        'max_latency': 0.0,
+        'by_model': {}
+    }
+    for record in records:
+        model = summary['by_model'].setdefault(
+            record['model'], {'calls': 0, 'cache_hits': 0, 'tokens': 0, 'cost': 0.0, 'latency': 0.0}
+        )
+        for totals in (summary, model):
+            totals['calls'] += 1
+            totals['cache_hits'] += record['cache'] == "hit"
+            totals['cost'] += record['cost'] or 0.0
+            totals['latency'] += record['latency']
+        summary['errors'] += record['status'] != "ok"
+        summary['retries'] += record['retries']
+        summary['prompt_tokens'] += record['prompt_tokens'] or 0
+        summary['completion_tokens'] += record['completion_tokens'] or 0
+        summary['queue_wait'] += record['queue_wait']
+        summary['max_latency'] = max(summary['max_latency'], record['latency'])
+        model['tokens'] += record['total_tokens'] or 0
+    return summary
+
+class MetricsSink:
+    """Destination for completed call records."""
+    
+    def record(self, record: Dict[str, Any]) -> None:
+        """Accept one completed call record."""
+        raise NotImplementedError
+
+class InMemorySink(MetricsSink):
+    """Keep the most recent records in memory, e.g. for tests or a debug page."""
+    
+    def __init__(self, max_records: int = 1000):
+        self._records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+    
+    def record(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._records.append(dict(record))
+    
+    def records(self) -> List[Dict[str, Any]]:
+        """Get a copy of the retained records, oldest first."""
+        with self._lock:
+            return list(self._records)
+
+class JSONLSink(MetricsSink):
+    """Append each record as one JSON line, for offline analysis with pandas or jq."""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    def record(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, default=str)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+
+class PrometheusSink(MetricsSink):
+    """
+    Aggregate records into Prometheus counters in the text exposition format.
+    
+    render() returns the current metrics; with a path, the file is rewritten
+    after every record so node_exporter's textfile collector can scrape it.
+    """
+    
+    PREFIX = "claim_analyzer_llm"
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+    
+    def _add(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        self._counters[key] = self._counters.get(key, 0.0) + value
+    
+    def record(self, record: Dict[str, Any]) -> None:
+        model = record['model']
+        with self._lock:
+            self._add("calls_total", 1, model=model, doc_type=str(record['doc_type']),
+                      cache=record['cache'], status=record['status'])
+            self._add("retries_total", record['retries'], model=model)
+            self._add("prompt_tokens_total", record['prompt_tokens'] or 0, model=model)
+            self._add("completion_tokens_total", record['completion_tokens'] or 0, model=model)
+            self._add("cost_usd_total", record['cost'] or 0.0, model=model)
+            self._add("latency_seconds_sum", record['latency'], model=model)
+            self._add("latency_seconds_count", 1, model=model)
+            self._add("queue_wait_seconds_sum", record['queue_wait'], model=model)
+            self._add("queue_wait_seconds_count", 1, model=model)
+            if self.path:
+                # Write-then-rename so a scrape never sees a half-written file
+                temp_path = f"{self.path}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(self._render())
+                os.replace(temp_path, self.path)
+    
+    def _render(self) -> str:
+        lines = []
+        declared = set()
+        for (name, labels), value in sorted(self._counters.items()):
+            family = name.rsplit('_', 1)[0] if name.endswith(('_sum', '_count')) else name
+            if family not in declared:
+                declared.add(family)
+                kind = "summary" if family != name else "counter"
+                lines.append(f"# TYPE {self.PREFIX}_{family} {kind}")
+            label_text = ",".join(f'{label}="{label_value}"' for label, label_value in labels)
+            lines.append(f"{self.PREFIX}_{name}{{{label_text}}} {value:g}")
+        return "\n".join(lines) + "\n"
+    
+    def render(self) -> str:
+        """Get all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            return self._render()
+
+_shared_sinks: Dict[Tuple[str, str, int], MetricsSink] = {}
+_shared_sinks_lock = threading.Lock()
+
+def get_metrics_sink() -> Optional[MetricsSink]:
+    """Get the process-wide sink from the TELEMETRY_* settings, or None when telemetry export is off."""
+    kind = settings.TELEMETRY_SINK
+    if kind == 'off':
+        return None
+    key = (kind, settings.TELEMETRY_PATH, os.getpid())
+    with _shared_sinks_lock:
+        if key not in _shared_sinks:
+            if kind == 'jsonl':
+                _shared_sinks[key] = JSONLSink(settings.TELEMETRY_PATH or "llm_calls.jsonl")
+            elif kind == 'prometheus':
+                _shared_sinks[key] = PrometheusSink(settings.TELEMETRY_PATH or None)
+            else:
+                if kind != 'memory':
+                    logging.getLogger(__name__).warning(f"Unknown TELEMETRY_SINK {kind!r}, keeping records in memory")
+                _shared_sinks[key] = InMemorySink(settings.TELEMETRY_MEMORY_RECORDS)
+        return _shared_sinks[key]
@@ -0,0 +1,102 @@
+"""
+Post-extraction cleanup of repeated page boilerplate.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+# Rough prompt-size estimate; GPT tokenizers average about four characters per token in English
+CHARS_PER_TOKEN = 4
+
+_DIGITS_RE = re.compile(r"\d+")
+_SPACE_RE = re.compile(r"\s+")
+_LETTER_RE = re.compile(r"[^\W\d_]")
+
+def _line_key(line: str) -> str:
+    """Normalize case and spacing so reflowed copies of a line still match."""
+    return _SPACE_RE.sub(" ", line.strip().lower())
+
+def _edge_key(line: str) -> str:
+    """Normalize a header/footer line so changing page numbers and dates don't hide repetition."""
+    return "#" + _DIGITS_RE.sub("#", _line_key(line))
+
+def _is_value(line: str) -> bool:
+    """Single words and letterless lines are answers or amounts (Yes, Fail, N/A, $500), not boilerplate."""
+    stripped = line.strip()
+    return len(stripped.split()) == 1 or not _LETTER_RE.search(stripped)
+
+def _page_keys(text: str, edge_lines: int, min_body_chars: int) -> List[List[str]]:
+    """Get the repetition keys for each line of a page; blank and value lines get none."""
+    lines = text.splitlines()
+    content_indexes = [i for i, line in enumerate(lines) if line.strip()]
+    edges = set(content_indexes[:edge_lines] + content_indexes[-edge_lines:]) if edge_lines else set()
+    
+    keys = []
+    for i, line in enumerate(lines):
+        if not line.strip() or _is_value(line):
+            keys.append([])
+        elif i in edges:
+            keys.append([_line_key(line), _edge_key(line)])
+        elif len(_line_key(line)) >= min_body_chars:
+            keys.append([_line_key(line)])
+        else:
+            keys.append([])
+    return keys
+
+def strip_repeated_lines(pages: List[Tuple[int, str]], min_pages: int = 3, min_ratio: float = 0.5,
+                         edge_lines: int = 2, min_body_chars: int = 20) -> Tuple[List[Tuple[int, str]], Dict[str, Any]]:
+    """
+    Remove header, footer and boilerplate lines that repeat across pages.
+    
+    A line counts as boilerplate when it appears on at least min_ratio of the
+    pages. Lines in the top and bottom edge_lines of a page also match with
+    digits ignored, which catches "Page 3 of 40" style headers and footers
+    without folding numbered body text together. Lines in the body must also
+    be at least min_body_chars long, and single-word or letterless lines never
+    match, so repeated checklist answers like "Fail" or "N/A" survive. The
+    first occurrence is kept so letterheads and legal notices still reach the
+    model once.
+    
+    Args:
+        pages: (page number, page text) pairs
+        min_pages: Documents with fewer pages are returned unchanged
+        min_ratio: Fraction of pages a line must appear on to be stripped
+        edge_lines: Lines at the top and bottom of each page treated as header/footer
+        min_body_chars: Shortest line outside the header/footer zone that can be stripped
+        
+    Returns:
+        tuple: Cleaned pages and stats (lines_removed, chars_saved, tokens_saved)
+    """
+    stats = {'lines_removed': 0, 'chars_saved': 0, 'tokens_saved': 0}
+    if len(pages) < min_pages:
+        return pages, stats
+    
+    # Count each key once per page
+    page_keys = [_page_keys(text, edge_lines, min_body_chars) for _, text in pages]
+    page_counts = Counter()
+    for keys in page_keys:
+        page_counts.update({key for line_keys in keys for key in line_keys})
+    
+    threshold = max(2, min_ratio * len(pages))
+    repeated = {key for key, count in page_counts.items() if count >= threshold}
+    if not repeated:
+        return pages, stats
+    
+    seen = set()
+    cleaned = []
+    for (page_num, text), keys in zip(pages, page_keys):
+        kept_lines = []
+        for line, line_keys in zip(text.splitlines(), keys):
+            key = next((key for key in line_keys if key in repeated), None)
+            if key is not None:
+                if key in seen:
+                    stats['lines_removed'] += 1
+                    stats['chars_saved'] += len(line) + 1
+                    continue
+                seen.add(key)
+            kept_lines.append(line)
+        cleaned.append((page_num, "\n".join(kept_lines)))
+    
+    stats['tokens_saved'] = stats['chars_saved'] // CHARS_PER_TOKEN
+    return cleaned, stats
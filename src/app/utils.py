@@ -12,8 +12,8 @@ def setup_page_config():
         initial_sidebar_state="expanded"
     )
 
-def create_sidebar():
-    """Create the application sidebar."""
+def create_sidebar() -> dict:
+    """Create the application sidebar and return the analysis options it collects."""
     with st.sidebar:
         st.title("🚗 Claim Analyzer")
         st.markdown("---")
@@ -47,6 +47,31 @@ def create_sidebar():
             help="Minimum confidence level for AI analysis"
         )
         
+        # Model cascade
+        use_cascade = st.checkbox(
+            "Fast-Model Cascade",
+            value=os.getenv('ANALYSIS_CASCADE', 'False').lower() == 'true',
+            help="Analyze with a fast model first and escalate to the full model only when its confidence is below the threshold"
+        )
+        
+        # Combined single-call mode
+        use_combined = st.checkbox(
+            "Combined Single Call",
+            value=os.getenv('ANALYSIS_COMBINED', 'False').lower() == 'true',
+            help="Analyze all documents of a short claim in one request; longer claims are analyzed per document"
+        )
+        
+        # Local pre-screen policy
+        prescreen_modes = ["flag", "defer", "skip", "off"]
+        default_mode = os.getenv('PRESCREEN_MODE', 'flag').lower()
+        prescreen_mode = st.selectbox(
+            "Pre-screen Policy",
+            options=prescreen_modes,
+            index=prescreen_modes.index(default_mode) if default_mode in prescreen_modes else 0,
+            help="What to do when the local phrase scan finds a CRITICAL red flag (e.g. salvage title): "
+                 "flag it and still run AI analysis, defer AI analysis until requested, or skip it"
+        )
+        
         # Red flag sensitivity
         red_flag_sensitivity = st.selectbox(
             "Red Flag Sensitivity",
@@ -85,6 +110,14 @@ def create_sidebar():
             🔶 **Medium**: Minor issues requiring attention
             ✅ **Low**: Informational items only
             """)
+    
+    return {
+        'confidence_threshold': confidence_threshold,
+        'red_flag_sensitivity': red_flag_sensitivity,
+        'cascade': use_cascade,
+        'combined': use_combined,
+        'prescreen_mode': prescreen_mode
+    }
 
 def validate_environment():
     """Validate that required environment variables are set."""
@@ -1,9 +1,28 @@
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
 
+def _parse_limits(value: str) -> Dict[str, int]:
+    """Parse per-document-type limits such as "history:60,inspection:40"."""
+    limits = {}
+    for item in value.split(','):
+        if ':' in item:
+            doc_type, limit = item.split(':', 1)
+            limits[doc_type.strip().lower()] = int(limit)
+    return limits
+
+def _parse_routes(value: str) -> Dict[str, str]:
+    """Parse per-document-type model names such as "acv:gpt-4o-mini,history:gpt-4o-mini"."""
+    routes = {}
+    for item in value.split(','):
+        if ':' in item:
+            # Split once only: fine-tuned model names contain colons
+            doc_type, model = item.split(':', 1)
+            routes[doc_type.strip().lower()] = model.strip()
+    return routes
+
 class Settings:
     """Application configuration settings."""
     
@@ -13,6 +32,52 @@ class Settings:
     OPENAI_MAX_TOKENS: int = int(os.getenv('OPENAI_MAX_TOKENS', '2000'))
     OPENAI_TEMPERATURE: float = float(os.getenv('OPENAI_TEMPERATURE', '0.1'))
     
+    # Per-document-type routing; types not listed use the defaults above
+    OPENAI_MODEL_ROUTES: Dict[str, str] = _parse_routes(os.getenv('OPENAI_MODEL_ROUTES', ''))  # e.g. "acv:gpt-4o-mini"
+    OPENAI_MAX_TOKENS_ROUTES: Dict[str, int] = _parse_limits(
+        os.getenv('OPENAI_MAX_TOKENS_ROUTES', 'acv:1500,history:1500,adjuster:1500')
+    )
+    OPENAI_TIMEOUT_ROUTES: Dict[str, int] = _parse_limits(os.getenv('OPENAI_TIMEOUT_ROUTES', ''))  # seconds, e.g. "acv:30"
+    # response_format per call: auto (by model), json_schema, json_object or off
+    OPENAI_STRUCTURED_OUTPUT: str = os.getenv('OPENAI_STRUCTURED_OUTPUT', 'auto').lower()
+    
+    # Shared HTTP connection pool for OpenAI clients
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv('OPENAI_MAX_CONNECTIONS', '20'))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv('OPENAI_MAX_KEEPALIVE_CONNECTIONS', '10'))
+    OPENAI_KEEPALIVE_EXPIRY: float = float(os.getenv('OPENAI_KEEPALIVE_EXPIRY', '120'))  # seconds
+    OPENAI_TIMEOUT: float = float(os.getenv('OPENAI_TIMEOUT', '120'))  # seconds per request
+    OPENAI_CONNECT_TIMEOUT: float = float(os.getenv('OPENAI_CONNECT_TIMEOUT', '10'))
+    
+    # Retries of transient failures (timeouts, 429, 5xx) and hedging of slow calls
+    OPENAI_MAX_RETRIES: int = int(os.getenv('OPENAI_MAX_RETRIES', '3'))
+    OPENAI_RETRY_BASE_DELAY: float = float(os.getenv('OPENAI_RETRY_BASE_DELAY', '1'))  # seconds, doubled per retry
+    OPENAI_RETRY_MAX_DELAY: float = float(os.getenv('OPENAI_RETRY_MAX_DELAY', '30'))
+    OPENAI_HEDGE_QUANTILE: float = float(os.getenv('OPENAI_HEDGE_QUANTILE', '0'))  # e.g. 0.95, 0 = no hedging
+    OPENAI_HEDGE_MIN_SAMPLES: int = int(os.getenv('OPENAI_HEDGE_MIN_SAMPLES', '20'))
+    
+    # Client-side rate limits matching the account's quota; 0 = unlimited
+    OPENAI_RPM_LIMIT: int = int(os.getenv('OPENAI_RPM_LIMIT', '0'))
+    OPENAI_TPM_LIMIT: int = int(os.getenv('OPENAI_TPM_LIMIT', '0'))
+    OPENAI_RATE_LIMIT_PATH: str = os.getenv('OPENAI_RATE_LIMIT_PATH', '')  # shared SQLite bucket for multi-process hosts
+    
+    # LLM response cache: in-memory LRU, plus a disk tier when a path is set
+    LLM_CACHE_ENABLED: bool = os.getenv('LLM_CACHE_ENABLED', 'True').lower() == 'true'
+    LLM_CACHE_MEMORY_ENTRIES: int = int(os.getenv('LLM_CACHE_MEMORY_ENTRIES', '256'))
+    LLM_CACHE_PATH: str = os.getenv('LLM_CACHE_PATH', '')  # empty = memory tier only
+    LLM_CACHE_TTL: int = int(os.getenv('LLM_CACHE_TTL', '604800'))  # 7 days, 0 = never expire
+    LLM_CACHE_MAX_BYTES: int = int(os.getenv('LLM_CACHE_MAX_BYTES', '67108864'))  # 64MB
+    
+    # Per-call LLM telemetry export: memory, jsonl, prometheus or off
+    TELEMETRY_SINK: str = os.getenv('TELEMETRY_SINK', 'memory').lower()
+    TELEMETRY_PATH: str = os.getenv('TELEMETRY_PATH', '')  # JSONL file, or Prometheus textfile to rewrite
+    TELEMETRY_MEMORY_RECORDS: int = int(os.getenv('TELEMETRY_MEMORY_RECORDS', '1000'))
+    
+    # LLM transport: live, record (save request/response pairs as cassettes) or replay (serve them offline)
+    LLM_TRANSPORT: str = os.getenv('LLM_TRANSPORT', 'live').lower()
+    LLM_CASSETTE_PATH: str = os.getenv('LLM_CASSETTE_PATH', 'cassettes')
+    LLM_REPLAY_LATENCY: str = os.getenv('LLM_REPLAY_LATENCY', 'recorded').lower()  # or fixed seconds per call
+    LLM_REPLAY_LATENCY_SCALE: float = float(os.getenv('LLM_REPLAY_LATENCY_SCALE', '1.0'))
+    
     # Application Configuration
     APP_NAME: str = "Insurance Claim Coverage Analyzer"
     APP_VERSION: str = "1.0.0"
@@ -22,10 +87,37 @@ class Settings:
     MAX_FILE_SIZE: int = int(os.getenv('MAX_FILE_SIZE', '52428800'))  # 50MB
     SUPPORTED_FORMATS: list = ['pdf']
     TEMP_DIR: str = os.getenv('TEMP_DIR', '/tmp')
+    PDF_BACKEND: str = os.getenv('PDF_BACKEND', 'pypdf2')  # pypdf2, pypdf, pdfminer or pdfium
+    PDF_PARALLEL_WORKERS: int = int(os.getenv('PDF_PARALLEL_WORKERS', '0'))  # 0 = serial extraction
+    PDF_PARALLEL_MIN_PAGES: int = int(os.getenv('PDF_PARALLEL_MIN_PAGES', '40'))
+    PDF_POOL_WORKERS: int = int(os.getenv('PDF_POOL_WORKERS', '0'))  # shared worker pool size, 0 = one per CPU
+    PDF_TEXT_CACHE_PATH: str = os.getenv('PDF_TEXT_CACHE_PATH', '')  # empty = cache disabled
+    PDF_TEXT_CACHE_MAX_BYTES: int = int(os.getenv('PDF_TEXT_CACHE_MAX_BYTES', '268435456'))  # 256MB
+    
+    # Extraction budgets; 0 = no limit. Per-type values override the defaults.
+    PDF_MAX_PAGES: int = int(os.getenv('PDF_MAX_PAGES', '0'))
+    PDF_MAX_CHARS: int = int(os.getenv('PDF_MAX_CHARS', '0'))
+    PDF_PAGE_LIMITS: Dict[str, int] = _parse_limits(os.getenv('PDF_PAGE_LIMITS', ''))  # e.g. "history:60,inspection:40"
+    PDF_CHAR_LIMITS: Dict[str, int] = _parse_limits(os.getenv('PDF_CHAR_LIMITS', ''))  # e.g. "contract:120000"
+    PDF_DEDUP_BOILERPLATE: bool = os.getenv('PDF_DEDUP_BOILERPLATE', 'True').lower() == 'true'
     
     # Analysis Configuration
     RED_FLAG_THRESHOLD: int = int(os.getenv('RED_FLAG_THRESHOLD', '3'))
     CONFIDENCE_THRESHOLD: float = float(os.getenv('CONFIDENCE_THRESHOLD', '0.7'))
+    ANALYSIS_CASCADE: bool = os.getenv('ANALYSIS_CASCADE', 'False').lower() == 'true'
+    OPENAI_FAST_MODEL: str = os.getenv('OPENAI_FAST_MODEL', 'gpt-4o-mini')  # cascade's first tier
+    CASCADE_CONFIRM_CRITICAL: bool = os.getenv('CASCADE_CONFIRM_CRITICAL', 'True').lower() == 'true'
+    ANALYSIS_COMBINED: bool = os.getenv('ANALYSIS_COMBINED', 'False').lower() == 'true'  # one call per claim
+    ANALYSIS_COMBINED_TOKENS: int = int(os.getenv('ANALYSIS_COMBINED_TOKENS', '3500'))  # document tokens allowed in one call
+    ANALYSIS_COMBINED_MAX_TOKENS: int = int(os.getenv('ANALYSIS_COMBINED_MAX_TOKENS', '3000'))  # output cap; prompt + documents + cap must fit the model
+    ANALYSIS_CHUNK_TOKENS: int = int(os.getenv('ANALYSIS_CHUNK_TOKENS', '5000'))  # per-call document budget, capped to fit the model's context; 0 = split only to fit
+    ANALYSIS_CHUNK_CONCURRENCY: int = int(os.getenv('ANALYSIS_CHUNK_CONCURRENCY', '4'))
+    CONTRACT_FORM_CACHE: bool = os.getenv('CONTRACT_FORM_CACHE', 'True').lower() == 'true'  # reuse analyses of known policy forms
+    PRESCREEN_MODE: str = os.getenv('PRESCREEN_MODE', 'flag').lower()  # off, flag, defer or skip on a confirmed CRITICAL hit
+    PRESCREEN_DOC_TYPES: list = [
+        doc_type.strip() for doc_type in os.getenv('PRESCREEN_DOC_TYPES', 'inspection,acv,history,adjuster').split(',')
+        if doc_type.strip()
+    ]
     MAX_ANALYSIS_TIME: int = int(os.getenv('MAX_ANALYSIS_TIME', '300'))  # 5 minutes
     
     # Logging Configuration
@@ -47,6 +139,26 @@ class Settings:
             'temperature': cls.OPENAI_TEMPERATURE
         }
     
+    @classmethod
+    def get_model_route(cls, doc_type: str = None) -> Dict[str, Any]:
+        """Get the model, max_tokens, temperature and timeout for a document type."""
+        doc_type = (doc_type or '').lower()
+        return {
+            'model': cls.OPENAI_MODEL_ROUTES.get(doc_type, cls.OPENAI_MODEL),
+            'max_tokens': cls.OPENAI_MAX_TOKENS_ROUTES.get(doc_type, cls.OPENAI_MAX_TOKENS),
+            'temperature': cls.OPENAI_TEMPERATURE,
+            'timeout': cls.OPENAI_TIMEOUT_ROUTES.get(doc_type, cls.OPENAI_TIMEOUT)
+        }
+    
+    @classmethod
+    def get_extraction_limits(cls, doc_type: str = None) -> Tuple[int, int]:
+        """Get (max_pages, max_chars) for a document type; 0 means unlimited."""
+        doc_type = (doc_type or '').lower()
+        return (
+            cls.PDF_PAGE_LIMITS.get(doc_type, cls.PDF_MAX_PAGES),
+            cls.PDF_CHAR_LIMITS.get(doc_type, cls.PDF_MAX_CHARS)
+        )
+    
     @classmethod
     def validate_config(cls) -> bool:
         """Validate that all required configuration is present."""
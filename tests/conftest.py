@@ -0,0 +1,7 @@
+import pytest
+from tests.helpers import build_pdf
+
+@pytest.fixture
+def make_pdf():
+    """Factory fixture returning real PDF bytes for a list of page texts."""
+    return build_pdf
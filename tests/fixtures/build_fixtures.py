@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Build the small synthetic PDF corpora used by the benchmark targets
+Writes tests/fixtures/pdfs and the claim folders in tests/fixtures/claims; rerun after
+changing the document text below, then re-record tests/fixtures/cassettes for the claims
+"""
+
+from pathlib import Path
+
+FIXTURES = Path(__file__).parent
+
+HEADER = ["ACME Mutual Insurance Company", "Claims Department - Confidential"]
+
+# Page line lists per fixture document; the shared header exercises boilerplate removal
+DOCUMENTS = {
+    'contract': [
+        ["PERSONAL AUTO POLICY DECLARATIONS", "Named Insured: Jane Doe", "Policy Number: PA-1001",
+         "Policy Period: 01/01/2024 to 01/01/2025", "Collision deductible: $500",
+         "Comprehensive deductible: $250", "Form PP 00 01 01 05"],
+        ["PART D - COVERAGE FOR DAMAGE TO YOUR AUTO",
+         "We will pay for direct and accidental loss to your covered auto,",
+         "minus any applicable deductible shown in the Declarations.",
+         "Collision coverage applies only if shown in the Declarations."],
+        ["EXCLUSIONS", "We will not pay for loss due to racing or speed contests.",
+         "We will not pay for wear and tear, freezing or mechanical breakdown.",
+         "We will not pay for loss to a vehicle used as a public livery."],
+        ["PART E - DUTIES AFTER AN ACCIDENT OR LOSS", "You must give us prompt notice of the loss.",
+         "You must submit to examination under oath if we require it.",
+         "Material misrepresentation voids coverage under this policy."]
+    ],
+    'inspection': [
+        ["VEHICLE INSPECTION REPORT", "Vehicle: 2018 Honda Accord EX", "Odometer: 48,210 miles",
+         "Inspection date: 03/12/2024"],
+        ["Front bumper cover cracked, replace.", "Left headlamp assembly broken, replace.",
+         "Hood buckled at leading edge, repair 4.0 hours.", "No pre-existing damage observed."],
+        ["Estimate total: $4,860.00", "Inspector: R. Alvarez, license 55-1023"]
+    ],
+    'acv': [
+        ["ACTUAL CASH VALUE REPORT", "Vehicle: 2018 Honda Accord EX", "Base value: $18,900",
+         "Mileage adjustment: -$350", "Condition adjustment: +$200"],
+        ["Comparable 1: 2018 Accord EX, 51,000 miles, $18,750",
+         "Comparable 2: 2018 Accord EX-L, 44,500 miles, $19,400",
+         "Adjusted actual cash value: $18,750"]
+    ],
+    'history': [
+        ["VEHICLE HISTORY REPORT", "VIN: 1HGCV1F34JA000001", "Title status: Clean",
+         "Salvage title: No", "Stolen vehicle check: No record found"],
+        ["Owners: 2", "Last reported odometer: 47,900 miles (01/2024)",
+         "Accidents reported: 1 minor, 2020, no airbag deployment"]
+    ],
+    'adjuster': [
+        ["ADJUSTER ASSESSMENT", "Claim: CL-2024-0042", "Date of loss: 03/10/2024",
+         "Cause: rear-ended at intersection, other driver cited"],
+        ["Damage consistent with reported loss.", "Recommend payment of repair estimate less deductible.",
+         "No indicators of fraud noted."]
+    ]
+}
+
+# Claim folders for the pipeline benchmark: document types, with per-claim replacement pages
+CLAIMS = {
+    'claim-001': {doc_type: None for doc_type in DOCUMENTS},
+    'claim-002': {
+        'contract': None,
+        'inspection': [
+            ["VEHICLE INSPECTION REPORT", "Vehicle: 2016 Ford F-150 XLT", "Odometer: 61,004 miles",
+             "Inspection date: 05/02/2024"],
+            ["Frame rail kinked behind front axle, structural repair required.",
+             "Evidence of prior repair: overspray on door seals, mismatched paint on bed.",
+             "Estimate total: $11,275.00"]
+        ],
+        'history': [
+            ["VEHICLE HISTORY REPORT", "VIN: 1FTEW1EG6GF000002", "Title status: Salvage title issued in TX, 2021",
+             "Previous total loss reported by insurer, 09/2021"],
+            ["Owners: 3", "Last reported odometer: 88,400 miles (06/2022)",
+             "Odometer rollback suspected: current reading lower than 2022 record"]
+        ],
+        'adjuster': [
+            ["ADJUSTER ASSESSMENT", "Claim: CL-2024-0077", "Date of loss: 04/29/2024",
+             "Cause: single vehicle, left roadway"],
+            ["Title history and odometer discrepancy not disclosed at application.",
+             "Refer to special investigations unit before any payment."]
+        ]
+    }
+}
+
+def _escape(text: str) -> str:
+    """Escape a line for a PDF literal string."""
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def build_pdf(pages) -> bytes:
+    """Build a minimal, valid PDF with the given lines of Helvetica text per page."""
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, lines in enumerate(pages):
+        text = " Tj T* ".join(f"({_escape(line)})" for line in lines)
+        stream = f"BT /F1 11 Tf 14 TL 72 740 Td {text} Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+    
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    
+    xref_offset = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        pdf += f"{offset:010d} 00000 n \n".encode()
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return bytes(pdf)
+
+def write_document(path: Path, pages) -> None:
+    """Write one fixture document, with the shared header on every page."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(build_pdf([HEADER + lines for lines in pages]))
+
+def main():
+    """Write the PDF backend corpus and the claim folders."""
+    for doc_type, pages in DOCUMENTS.items():
+        write_document(FIXTURES / "pdfs" / f"{doc_type}.pdf", pages)
+    print(f"✅ Wrote {len(DOCUMENTS)} PDFs to {FIXTURES / 'pdfs'}")
+    
+    for claim, documents in CLAIMS.items():
+        for doc_type, pages in documents.items():
+            write_document(FIXTURES / "claims" / claim / f"{doc_type}.pdf", pages or DOCUMENTS[doc_type])
+    print(f"✅ Wrote {len(CLAIMS)} claims to {FIXTURES / 'claims'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import openai
+from src.app.openai_client import httpx
+
+def build_pdf(pages):
+    """Build a minimal, valid PDF with one line of Helvetica text per page."""
+    page_count = len(pages)
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(page_count))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+    
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    
+    xref_offset = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        pdf += f"{offset:010d} 00000 n \n".encode()
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return bytes(pdf)
+
+def make_contract(name, policy_number, deductible):
+    """Contract text on the standard form for one policyholder."""
+    return (
+        "--- Page 1 ---\nPERSONAL AUTO POLICY DECLARATIONS\n"
+        f"Named Insured: {name}\nPolicy Number: {policy_number}\n"
+        f"Policy Period: 01/01/2024 to 01/01/2025\nCollision deductible: ${deductible}\n"
+        "--- Page 2 ---\nPART D - COVERAGE FOR DAMAGE TO YOUR AUTO\n"
+        f"We will pay for direct and accidental loss to your covered auto, policy {policy_number}.\n"
+        "Deductibles are shown in the Declarations.\n"
+        "--- Page 3 ---\nEXCLUSIONS\nWe will not pay for loss due to racing."
+    )
+
+def make_status_error(status, headers=None, error_class=openai.APIStatusError):
+    """Build an OpenAI status error carrying the given response headers."""
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return error_class("upstream error", response=response, body=None)
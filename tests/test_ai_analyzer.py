@@ -0,0 +1,395 @@
+import asyncio
+import json
+import openai
+import pytest
+from unittest.mock import Mock, patch
+from src.app.ai_analyzer import AIAnalyzer
+from src.app.chunking import context_window, request_tokens
+from src.app.llm_cache import LLMResponseCache
+from src.app.text_cleanup import CHARS_PER_TOKEN
+from src.config.settings import settings
+from src.app.retry import RetryPolicy
+from src.app.telemetry import InMemorySink
+from tests.helpers import make_contract, make_status_error
+
+def make_completion(text):
+    """Build a minimal chat completion response object."""
+    completion = Mock()
+    completion.choices = [Mock()]
+    completion.choices[0].message.content = text
+    return completion
+
+def make_stream(text, size=8):
+    """Build streamed completion chunks carrying text in fixed-size deltas."""
+    chunks = []
+    for i in range(0, len(text), size):
+        chunk = Mock()
+        chunk.choices = [Mock()]
+        chunk.choices[0].delta.content = text[i:i + size]
+        chunks.append(chunk)
+    return chunks
+
+async def iterate_async(items):
+    """Async iterator over items, like an openai AsyncStream."""
+    for item in items:
+        await asyncio.sleep(0)
+        yield item
+
+class FakeAsyncClient:
+    """Stand-in for openai.AsyncOpenAI that answers after a per-document delay."""
+    
+    def __init__(self, replies, delay=0.0):
+        self.replies = replies
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.chat = Mock()
+        self.chat.completions.create = self.create
+    
+    async def create(self, **kwargs):
+        doc_type = kwargs['messages'][1]['content'].split(':')[0]
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            reply = self.replies[doc_type]
+            if isinstance(reply, Exception):
+                raise reply
+            if kwargs.get('stream'):
+                return iterate_async(make_stream(reply))
+            return make_completion(reply)
+        finally:
+            self.in_flight -= 1
+
+class TestAIAnalyzer:
+    """Test cases for AIAnalyzer class."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}), \
+             patch('src.app.ai_analyzer.get_openai_client', return_value=Mock()):
+            self.analyzer = AIAnalyzer(cache=LLMResponseCache())
+    
+    def test_analyze_contract_builds_request(self):
+        """Test single-document analysis keeps the contract prompt and budget."""
+        self.analyzer.client.chat.completions.create.return_value = make_completion(
+            '{"red_flags": [], "key_findings": ["Standard policy"]}'
+        )
+        
+        result = self.analyzer.analyze_contract("Policy text")
+        
+        assert result['key_findings'] == ["Standard policy"]
+        kwargs = self.analyzer.client.chat.completions.create.call_args.kwargs
+        assert kwargs['model'] == "gpt-4"
+        assert kwargs['max_tokens'] == 2000
+        assert kwargs['messages'][1]['content'] == "Analyze this insurance contract:\n\nPolicy text"
+    
+    def test_analyze_all_runs_documents_concurrently(self):
+        """Test all documents are in flight at once and results are keyed by type."""
+        client = FakeAsyncClient({
+            'Analyze this insurance contract': '{"red_flags": [], "key_findings": ["Contract ok"]}',
+            'Analyze this inspection report': '{"red_flags": ["Frame damage"], "key_findings": []}',
+            'Analyze this vehicle history': '{"red_flags": [], "key_findings": ["Clean title"]}'
+        }, delay=0.05)
+        
+        with patch('src.app.ai_analyzer.get_async_openai_client', return_value=client):
+            results = self.analyzer.analyze_all({
+                'contract': "Policy text",
+                'inspection': "Inspection text",
+                'history': "History text"
+            })
+        
+        assert client.max_in_flight == 3
+        assert results['contract']['key_findings'] == ["Contract ok"]
+        assert results['inspection']['red_flags'] == ["Frame damage"]
+        assert results['history']['key_findings'] == ["Clean title"]
+    
+    def test_analyze_all_isolates_document_errors(self):
+        """Test one failed document gets an error response without affecting the others."""
+        client = FakeAsyncClient({
+            'Analyze this insurance contract': '{"red_flags": [], "key_findings": ["Contract ok"]}',
+            'Analyze this ACV document': RuntimeError("upstream timeout")
+        })
+        
+        with patch('src.app.ai_analyzer.get_async_openai_client', return_value=client):
+            results = self.analyzer.analyze_all({'contract': "Policy text", 'acv': "ACV text"})
+        
+        assert results['contract']['key_findings'] == ["Contract ok"]
+        assert results['acv']['error'] == "Failed to analyze acv document"
+        assert results['acv']['red_flags'] == []
+    
+    def test_combined_mode_analyzes_claim_in_one_call(self):
+        """Test a short claim is analyzed in one request, with uncovered documents done separately."""
+        self.analyzer.combined = True
+        client = FakeAsyncClient({
+            'Analyze these claim documents': json.dumps({
+                'contract': {"red_flags": [], "exclusions": ["Racing"]},
+                'history': {"red_flags": [{"issue": "Salvage title", "severity": "critical"}]}
+            }),
+            'Analyze this ACV document': '{"red_flags": [], "key_findings": ["Fair value"]}'
+        })
+        documents = {'contract': "Policy text", 'acv': "ACV text", 'history': "History text"}
+        
+        with patch('src.app.ai_analyzer.get_async_openai_client', return_value=client):
+            results = self.analyzer.analyze_all(documents)
+            events = list(self.analyzer.stream_all(documents))
+        
+        assert results['contract']['exclusions'] == ["Racing"]
+        assert results['history']['red_flags'][0]['severity'] == "CRITICAL"
+        assert results['acv']['key_findings'] == ["Fair value"]
+        # The second run is served from the cache, so its events match the first results
+        done = {doc_type: item for doc_type, field, item in events if field == 'done'}
+        assert done == results
+    
+    def test_combined_mode_falls_back_over_budget(self):
+        """Test claims over the combined token budget are analyzed per document."""
+        self.analyzer.combined = True
+        
+        with patch('src.app.ai_analyzer.settings.ANALYSIS_COMBINED_TOKENS', 100):
+            assert self.analyzer._use_combined({'contract': "x" * 400, 'acv': "y" * 400}) is False
+        assert self.analyzer._use_combined({'contract': "x" * 400, 'acv': "y" * 400}) is True
+        assert self.analyzer._use_combined({'contract': "x" * 400}) is False
+    
+    def test_combined_mode_fits_model_context(self):
+        """Test the prompt, documents and output cap must fit the routed model's context window."""
+        self.analyzer.combined = True
+        per_document = settings.ANALYSIS_COMBINED_TOKENS * CHARS_PER_TOKEN // 2 - 20
+        at_budget = {'contract': "x" * per_document, 'acv': "y" * per_document}
+        
+        assert self.analyzer._use_combined(at_budget) is True
+        with patch('src.app.ai_analyzer.settings.ANALYSIS_COMBINED_TOKENS', 6000), \
+             patch('src.app.ai_analyzer.settings.ANALYSIS_COMBINED_MAX_TOKENS', 4000):
+            large = {'contract': "x" * 11000, 'acv': "y" * 11000}
+            assert self.analyzer._use_combined(large) is False
+            with patch.dict('src.app.ai_analyzer.settings.OPENAI_MODEL_ROUTES', {'combined': "gpt-4o"}):
+                assert self.analyzer._use_combined(large) is True
+    
+    def test_transient_error_is_retried(self):
+        """Test a rate-limit error is retried instead of failing the document."""
+        self.analyzer.retry_policy = RetryPolicy(max_retries=2, base_delay=0)
+        create = self.analyzer.client.chat.completions.create
+        create.side_effect = [
+            make_status_error(429, error_class=openai.RateLimitError),
+            make_completion('{"red_flags": [], "key_findings": ["Second try"]}')
+        ]
+        
+        result = self.analyzer.analyze_acv("ACV text")
+        
+        assert result['key_findings'] == ["Second try"]
+        assert create.call_count == 2
+    
+    def test_analyze_waits_on_rate_limiter(self):
+        """Test each request acquires its estimated tokens and settles against actual usage."""
+        limiter = Mock()
+        self.analyzer.rate_limiter = limiter
+        completion = make_completion('{"red_flags": [], "key_findings": []}')
+        completion.usage.total_tokens = 700
+        self.analyzer.client.chat.completions.create.return_value = completion
+        
+        self.analyzer.analyze_acv("x" * 400)
+        
+        estimated = limiter.acquire.call_args.args[0]
+        assert estimated > 1500
+        limiter.adjust.assert_called_once_with(estimated - 700)
+    
+    def test_repeat_analysis_served_from_cache(self):
+        """Test re-running the same document skips the API call."""
+        create = self.analyzer.client.chat.completions.create
+        create.return_value = make_completion('{"red_flags": [], "key_findings": ["Clean title"]}')
+        
+        first = self.analyzer.analyze_history("History text")
+        second = self.analyzer.analyze_history("History text")
+        
+        assert first == second
+        assert create.call_count == 1
+        
+        self.analyzer.analyze_history("Different history text")
+        assert create.call_count == 2
+    
+    def test_calls_recorded_in_telemetry(self):
+        """Test each call is recorded with tokens, cost and cache outcome, and summarized per claim."""
+        sink = InMemorySink()
+        self.analyzer.metrics_sink = sink
+        completion = make_completion('{"red_flags": [], "key_findings": []}')
+        completion.usage.prompt_tokens = 600
+        completion.usage.completion_tokens = 100
+        completion.usage.total_tokens = 700
+        self.analyzer.client.chat.completions.create.return_value = completion
+        
+        self.analyzer.analyze_acv("ACV text")
+        self.analyzer.analyze_acv("ACV text")
+        
+        miss, hit = sink.records()
+        assert (miss['cache'], hit['cache']) == ("miss", "hit")
+        assert miss['doc_type'] == "acv"
+        assert miss['attempts'] == 1
+        assert miss['total_tokens'] == 700
+        assert miss['cost'] > 0
+        assert hit['total_tokens'] is None
+        
+        summary = self.analyzer.telemetry_summary()
+        assert summary['calls'] == 2
+        assert summary['cache_hits'] == 1
+        assert summary['prompt_tokens'] == 600
+    
+    def test_unstructured_response_not_cached(self):
+        """Test a response that failed JSON parsing is retried on the next run."""
+        create = self.analyzer.client.chat.completions.create
+        create.return_value = make_completion("Sorry, I cannot help with that.")
+        
+        self.analyzer.analyze_adjuster("Adjuster text")
+        self.analyzer.analyze_adjuster("Adjuster text")
+        
+        assert create.call_count == 2
+    
+    def test_long_contract_is_analyzed_in_parts(self):
+        """Test an oversized contract is split, analyzed per part and merged."""
+        create = self.analyzer.client.chat.completions.create
+        create.side_effect = lambda **kwargs: make_completion(
+            '{"red_flags": [], "exclusions": ["Racing"], "key_findings": ["%s"]}'
+            % kwargs['messages'][1]['content'].split(':')[0]
+        )
+        contract = "\n".join(f"--- Page {i} ---\n" + "term " * 200 for i in range(1, 7))
+        
+        with patch('src.app.ai_analyzer.settings.ANALYSIS_CHUNK_TOKENS', 300):
+            result = self.analyzer.analyze_contract(contract)
+        
+        assert create.call_count == 6
+        assert result['chunks_analyzed'] == 6
+        assert result['exclusions'] == ["Racing"]
+        assert "Analyze this insurance contract (part 1 of 6)" in result['key_findings']
+    
+    def test_parts_fit_model_context(self):
+        """Test each part's prompt, text and output allowance fit the routed model's context window."""
+        acv = "\n".join(f"--- Page {i} ---\n" + "value " * 2000 for i in range(1, 4))
+        
+        with patch('src.app.ai_analyzer.settings.ANALYSIS_CHUNK_TOKENS', 0):
+            requests = self.analyzer._build_requests('acv', acv)
+            with patch.dict('src.app.ai_analyzer.settings.OPENAI_MODEL_ROUTES', {'acv': "gpt-4o"}):
+                assert len(self.analyzer._build_requests('acv', acv)) == 1
+        
+        assert len(requests) > 1
+        for request in requests:
+            assert request_tokens(request['messages'], "gpt-4") + request['max_tokens'] <= context_window("gpt-4")
+    
+    def test_known_contract_form_sends_only_declarations(self):
+        """Test a second claim on the same policy form reuses the form analysis."""
+        create = self.analyzer.client.chat.completions.create
+        create.side_effect = lambda **kwargs: make_completion(
+            '{"red_flags": [], "deductibles": "$500"}' if "(declarations page)" in kwargs['messages'][1]['content']
+            else '{"red_flags": [], "exclusions": ["Racing"]}'
+        )
+        
+        first = self.analyzer.analyze_contract(make_contract("Jane Doe", "PA-1001", "500"))
+        second = self.analyzer.analyze_contract(make_contract("John Roe", "PA-2002", "1,000"))
+        
+        assert create.call_count == 3
+        assert "PA-1001" not in create.call_args_list[1].kwargs['messages'][1]['content']
+        assert "(declarations page)" in create.call_args.kwargs['messages'][1]['content']
+        assert '_cache_content' not in create.call_args.kwargs
+        assert first['exclusions'] == second['exclusions'] == ["Racing"]
+        assert second['deductibles'] == "$500"
+    
+    def test_stream_emits_red_flags_before_completion(self):
+        """Test stream=True yields each red flag as it completes, then the full analysis."""
+        response = '{"red_flags": [{"issue": "Salvage title", "severity": "CRITICAL"}], "key_findings": ["Rebuilt"]}'
+        self.analyzer.client.chat.completions.create.return_value = iter(make_stream(response))
+        
+        events = list(self.analyzer.analyze_history("History text", stream=True))
+        
+        # Streamed items and the final analysis are both normalized by the history schema
+        assert events[0] == ('red_flags', {"issue": "Salvage title", "severity": "CRITICAL", "impact": ""})
+        assert events[1] == ('key_findings', "Rebuilt")
+        field, analysis = events[-1]
+        assert field == 'done'
+        assert analysis['red_flags'] == [events[0][1]]
+        assert analysis['key_findings'] == ["Rebuilt"]
+        assert self.analyzer.client.chat.completions.create.call_args.kwargs['stream'] is True
+        
+        # The finished response is cached and replayed on the next run
+        assert list(self.analyzer.analyze_history("History text", stream=True)) == events
+        assert self.analyzer.client.chat.completions.create.call_count == 1
+    
+    def test_stream_all_interleaves_documents(self):
+        """Test streamed events from concurrent documents arrive with their document type."""
+        client = FakeAsyncClient({
+            'Analyze this insurance contract': '{"red_flags": ["Lapse"], "key_findings": []}',
+            'Analyze this ACV document': RuntimeError("upstream timeout")
+        })
+        
+        with patch('src.app.ai_analyzer.get_async_openai_client', return_value=client):
+            events = list(self.analyzer.stream_all({'contract': "Policy text", 'acv': "ACV text"}))
+        
+        assert ('contract', 'red_flags', "Lapse") in events
+        done = {doc_type: item for doc_type, field, item in events if field == 'done'}
+        assert done['contract'] == {"red_flags": ["Lapse"], "key_findings": []}
+        assert done['acv']['error'] == "Failed to analyze acv document"
+    
+    def test_stream_all_raises_setup_failure(self):
+        """Test a failure before any document starts is raised instead of leaving the caller waiting."""
+        with patch('src.app.ai_analyzer.get_async_openai_client', side_effect=RuntimeError("no client")):
+            with pytest.raises(RuntimeError, match="no client"):
+                list(self.analyzer.stream_all({'contract': "Policy text"}))
+    
+    def test_requests_follow_settings_routes(self):
+        """Test each document type uses its routed model, token budget and timeout."""
+        self.analyzer.client.chat.completions.create.return_value = make_completion('{"red_flags": []}')
+        
+        with patch.dict('src.app.ai_analyzer.settings.OPENAI_MODEL_ROUTES', {'acv': "gpt-4o-mini"}), \
+             patch.dict('src.app.ai_analyzer.settings.OPENAI_MAX_TOKENS_ROUTES', {'acv': 800}), \
+             patch.dict('src.app.ai_analyzer.settings.OPENAI_TIMEOUT_ROUTES', {'acv': 30}):
+            self.analyzer.analyze_acv("ACV text")
+            acv_kwargs = self.analyzer.client.chat.completions.create.call_args.kwargs
+            self.analyzer.analyze_contract("Policy text")
+            contract_kwargs = self.analyzer.client.chat.completions.create.call_args.kwargs
+        
+        assert (acv_kwargs['model'], acv_kwargs['max_tokens'], acv_kwargs['timeout']) == ("gpt-4o-mini", 800, 30)
+        assert contract_kwargs['model'] == "gpt-4"
+        assert contract_kwargs['max_tokens'] == 2000
+    
+    def test_structured_output_requested_and_validated(self):
+        """Test models that support it get the contract schema, and replies are normalized by it."""
+        create = self.analyzer.client.chat.completions.create
+        create.return_value = make_completion(
+            'Here is the analysis: {"red_flags": [{"issue": "Lapse", "severity": "high"}]}'
+        )
+        
+        with patch.dict('src.app.ai_analyzer.settings.OPENAI_MODEL_ROUTES', {'contract': "gpt-4o"}):
+            result = self.analyzer.analyze_contract("Policy text")
+        
+        response_format = create.call_args.kwargs['response_format']
+        assert response_format['type'] == "json_schema"
+        assert response_format['json_schema']['name'] == "ContractAnalysis"
+        assert result['red_flags'] == [{"issue": "Lapse", "severity": "HIGH", "impact": ""}]
+        assert result['exclusions'] == []
+        
+        # gpt-4 has no response_format support, so none is sent
+        self.analyzer.analyze_acv("ACV text")
+        assert 'response_format' not in create.call_args.kwargs
+    
+    @pytest.mark.parametrize("fast_reply, escalated", [
+        ('{"red_flags": [], "key_findings": ["Fair value"], "confidence": 0.92}', False),
+        ('{"red_flags": [], "key_findings": ["Unclear comps"], "confidence": 0.4}', True),
+        ('{"red_flags": [{"issue": "Salvage", "severity": "CRITICAL"}], "confidence": 0.95}', True),
+        ("I could not produce JSON for this document.", True)
+    ])
+    def test_cascade_escalates_only_when_needed(self, fast_reply, escalated):
+        """Test the fast tier's answer stands unless it is unsure, unparseable or CRITICAL."""
+        analyzer = self.analyzer
+        analyzer.cascade = True
+        analyzer.confidence_threshold = 0.7
+        full_reply = '{"red_flags": [], "key_findings": ["Full model"]}'
+        create = analyzer.client.chat.completions.create
+        create.side_effect = lambda **kwargs: make_completion(
+            fast_reply if kwargs['model'] == "gpt-4o-mini" else full_reply
+        )
+        
+        result = analyzer.analyze_acv("ACV text")
+        
+        models = [call.kwargs['model'] for call in create.call_args_list]
+        assert models == (["gpt-4o-mini", "gpt-4"] if escalated else ["gpt-4o-mini"])
+        assert "confidence" in create.call_args_list[0].kwargs['messages'][0]['content']
+        if escalated:
+            assert result['key_findings'] == ["Full model"]
+        else:
+            assert result['confidence'] == 0.92
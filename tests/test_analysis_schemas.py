@@ -0,0 +1,60 @@
+import pytest
+from src.app.ai_analyzer import AIAnalyzer
+from src.app.analysis_schemas import analysis_model, response_format, template_example
+
+CONTRACT_PROMPT = AIAnalyzer._get_contract_prompt(None)
+
+class TestAnalysisSchemas:
+    """Test cases for the prompt-derived analysis schemas."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.model = analysis_model(CONTRACT_PROMPT, "ContractAnalysis")
+    
+    def test_model_fields_follow_prompt_example(self):
+        """Test the model has exactly the fields of the prompt's JSON example."""
+        assert set(self.model.model_fields) == set(template_example(CONTRACT_PROMPT))
+        assert analysis_model(CONTRACT_PROMPT, "ContractAnalysis") is self.model
+    
+    def test_validation_fills_defaults_and_normalizes_severity(self):
+        """Test missing fields get empty defaults and severities are uppercased."""
+        analysis = self.model.model_validate({
+            "red_flags": [{"issue": "Policy lapsed", "severity": "High", "impact": "Gap"}],
+            "unexpected": "dropped"
+        }).model_dump()
+        
+        assert analysis['red_flags'][0]['severity'] == "HIGH"
+        assert analysis['exclusions'] == []
+        assert analysis['deductibles'] == ""
+        assert 'unexpected' not in analysis
+    
+    def test_unknown_severity_is_rejected(self):
+        """Test a severity outside the prompt's choices fails validation."""
+        with pytest.raises(ValueError):
+            self.model.model_validate({"red_flags": [{"issue": "Lapse", "severity": "SEVERE"}]})
+    
+    @pytest.mark.parametrize("model_name, expected_type", [
+        ("gpt-4o", "json_schema"),
+        ("gpt-4o-mini", "json_schema"),
+        ("gpt-4-turbo", "json_object"),
+        ("gpt-4", None)
+    ])
+    def test_response_format_by_model(self, model_name, expected_type):
+        """Test auto mode sends the strongest constraint each model supports."""
+        constraint = response_format(model_name, self.model)
+        assert (constraint or {}).get('type') == expected_type
+    
+    def test_json_schema_is_strict(self):
+        """Test the json_schema form closes every object and requires every field."""
+        schema = response_format("gpt-4o", self.model)['json_schema']['schema']
+        red_flag = schema['$defs']['RedFlag']
+        
+        assert schema['additionalProperties'] is False
+        assert schema['required'] == list(schema['properties'])
+        assert red_flag['required'] == ["issue", "severity", "impact"]
+        assert red_flag['properties']['severity']['enum'] == ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+        assert 'default' not in str(schema)
+    
+    def test_off_mode_sends_no_constraint(self):
+        """Test OPENAI_STRUCTURED_OUTPUT=off disables response_format."""
+        assert response_format("gpt-4o", self.model, "off") is None
@@ -0,0 +1,76 @@
+from src.app.chunking import count_tokens, merge_analyses, split_document
+
+def make_pages(count, words_per_page):
+    """Build extract_text style output with page markers."""
+    return "\n".join(
+        f"--- Page {i} ---\n" + " ".join(f"clause{i}" for _ in range(words_per_page))
+        for i in range(1, count + 1)
+    )
+
+class TestSplitDocument:
+    """Test cases for split_document."""
+    
+    def test_short_document_is_one_chunk(self):
+        """Test text within the budget is returned unchanged."""
+        text = make_pages(2, 10)
+        
+        assert split_document(text, 5000) == [text]
+    
+    def test_splits_on_page_boundaries(self):
+        """Test chunks stay under budget and start at page markers."""
+        text = make_pages(10, 50)
+        
+        chunks = split_document(text, 200)
+        
+        assert len(chunks) > 1
+        assert all(count_tokens(chunk) <= 200 for chunk in chunks)
+        assert all(chunk.startswith("--- Page ") for chunk in chunks)
+        assert "\n".join(chunks) == text
+    
+    def test_oversized_page_splits_at_sections(self):
+        """Test a single page over budget falls back to paragraph boundaries."""
+        sections = ["Section %d. " % i + "coverage " * 60 for i in range(4)]
+        text = "--- Page 1 ---\n" + "\n\n".join(sections)
+        
+        chunks = split_document(text, 200)
+        
+        assert len(chunks) >= 2
+        assert all(count_tokens(chunk) <= 200 for chunk in chunks)
+        assert sum(chunk.count("Section ") for chunk in chunks) == 4
+
+class TestMergeAnalyses:
+    """Test cases for merge_analyses."""
+    
+    def test_merges_and_deduplicates_fields(self):
+        """Test list fields are combined without duplicates and flags keep the highest severity."""
+        merged = merge_analyses([
+            {
+                'exclusions': ["Racing", "Commercial use"],
+                'red_flags': [{'issue': "Lapse in coverage", 'severity': "MEDIUM", 'impact': "a"}],
+                'key_findings': ["Policy active"],
+                'deductibles': "$500 collision"
+            },
+            {
+                'exclusions': ["commercial use.", "Wear and tear"],
+                'red_flags': [{'issue': "Lapse in coverage!", 'severity': "HIGH", 'impact': "b"}],
+                'key_findings': ["Policy active"],
+                'deductibles': ""
+            }
+        ])
+        
+        assert merged['exclusions'] == ["Racing", "Commercial use", "Wear and tear"]
+        assert len(merged['red_flags']) == 1
+        assert merged['red_flags'][0]['severity'] == "HIGH"
+        assert merged['key_findings'] == ["Policy active"]
+        assert merged['deductibles'] == "$500 collision"
+        assert merged['chunks_analyzed'] == 2
+    
+    def test_failed_part_is_reported(self):
+        """Test a failed chunk is flagged for manual review instead of dropped silently."""
+        merged = merge_analyses([
+            {'red_flags': [], 'key_findings': ["Clean"]},
+            {'error': "Failed to analyze contract document", 'red_flags': [], 'key_findings': []}
+        ])
+        
+        assert 'error' not in merged
+        assert merged['key_findings'][-1].startswith("Part(s) 2 of 2 could not be analyzed")
@@ -0,0 +1,48 @@
+from src.app.contract_forms import fingerprint, normalize_form_text, redact_declared_values, split_declarations
+from tests.helpers import make_contract
+
+class TestContractForms:
+    """Test cases for contract form fingerprinting."""
+    
+    def test_declarations_are_split_from_form(self):
+        """Test the declarations page is separated and the form keeps the remaining pages."""
+        declarations, form = split_declarations(make_contract("Jane Doe", "PA-1001", "500"))
+        
+        assert "Named Insured: Jane Doe" in declarations
+        assert form.startswith("--- Page 2 ---")
+        assert "EXCLUSIONS" in form
+        assert "Named Insured" not in form
+    
+    def test_references_to_declarations_stay_in_form(self):
+        """Test a form page mentioning the Declarations below its heading is not taken for one."""
+        _, form = split_declarations(make_contract("Jane Doe", "PA-1001", "500"))
+        
+        assert "shown in the Declarations" in form
+    
+    def test_no_declarations_page(self):
+        """Test contracts without a declarations page are left whole."""
+        assert split_declarations("--- Page 1 ---\nPOLICY\n--- Page 2 ---\nEXCLUSIONS") is None
+        assert split_declarations("Single page without markers") is None
+    
+    def test_fingerprint_ignores_policyholder_data(self):
+        """Test the same form for two policyholders fingerprints identically once their details are redacted."""
+        first = redact_declared_values(*reversed(split_declarations(make_contract("Jane Doe", "PA-1001", "500"))))
+        second = redact_declared_values(*reversed(split_declarations(make_contract("John Roe", "PA-2002", "1,000"))))
+        
+        assert "PA-1001" not in first
+        assert "policy [policy number]" in first
+        assert fingerprint(first) == fingerprint(second)
+        assert fingerprint(first) != fingerprint(first.replace("racing", "flood"))
+    
+    def test_fingerprint_keeps_limits_and_editions(self):
+        """Test forms differing only in amounts or edition numbers are different forms."""
+        form = "--- Page 2 ---\nPP 00 01 01 05\nWe will pay up to $500 for towing."
+        
+        assert fingerprint(form) != fingerprint(form.replace("$500", "$1,000"))
+        assert fingerprint(form) != fingerprint(form.replace("PP 00 01 01 05", "PP 00 01 09 18"))
+    
+    def test_normalization_placeholders(self):
+        """Test labeled values and dates become placeholders while amounts and identifiers stay."""
+        text = "Named Insured: Jane Doe\nEffective March 3, 2024 for $1,250.00 under form PP 00 01"
+        
+        assert normalize_form_text(text) == "named insured: <value> effective <date> for $1,250.00 under form pp 00 01"
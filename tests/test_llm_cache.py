@@ -0,0 +1,71 @@
+from unittest.mock import patch
+from src.app.llm_cache import LLMResponseCache
+
+class TestLLMResponseCache:
+    """Test cases for LLMResponseCache class."""
+    
+    def test_key_covers_every_request_field(self):
+        """Test model, prompt, content and max_tokens all change the key."""
+        base = LLMResponseCache.make_key("gpt-4", "prompt", "content", 2000)
+        
+        assert base == LLMResponseCache.make_key("gpt-4", "prompt", "content", 2000)
+        assert base != LLMResponseCache.make_key("gpt-4o", "prompt", "content", 2000)
+        assert base != LLMResponseCache.make_key("gpt-4", "prompt v2", "content", 2000)
+        assert base != LLMResponseCache.make_key("gpt-4", "prompt", "other content", 2000)
+        assert base != LLMResponseCache.make_key("gpt-4", "prompt", "content", 1500)
+    
+    def test_memory_tier_evicts_least_recently_used(self):
+        """Test the memory tier keeps only the most recently used entries."""
+        cache = LLMResponseCache(memory_entries=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+        
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        assert cache.get("c") == "3"
+    
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """Test a new cache on the same file serves earlier responses from disk."""
+        path = str(tmp_path / "responses.sqlite3")
+        key = LLMResponseCache.make_key("gpt-4", "prompt", "content", 2000)
+        first = LLMResponseCache(path)
+        first.put(key, '{"red_flags": []}')
+        first.close()
+        
+        second = LLMResponseCache(path)
+        
+        assert second.get(key) == '{"red_flags": []}'
+        assert second.get(key) == '{"red_flags": []}'
+        stats = second.stats()
+        assert stats['disk_hits'] == 1
+        assert stats['memory_hits'] == 1
+        second.close()
+    
+    def test_expired_entries_are_misses(self, tmp_path):
+        """Test entries older than the TTL are not served."""
+        cache = LLMResponseCache(str(tmp_path / "responses.sqlite3"), ttl=60)
+        with patch('src.app.llm_cache.time.time', return_value=1000.0):
+            cache.put("key", "response")
+        
+        with patch('src.app.llm_cache.time.time', return_value=1030.0):
+            assert cache.get("key") == "response"
+        with patch('src.app.llm_cache.time.time', return_value=1100.0):
+            assert cache.get("key") is None
+        cache.close()
+    
+    def test_retain_prompts_drops_changed_templates(self, tmp_path):
+        """Test responses from a prompt template no longer in use are invalidated."""
+        cache = LLMResponseCache(str(tmp_path / "responses.sqlite3"))
+        old_key = LLMResponseCache.make_key("gpt-4", "old prompt", "content", 2000)
+        new_key = LLMResponseCache.make_key("gpt-4", "new prompt", "content", 2000)
+        cache.put(old_key, "old")
+        cache.put(new_key, "new")
+        
+        removed = cache.retain_prompts([LLMResponseCache.prompt_hash("new prompt")])
+        
+        assert removed == 1
+        assert cache.get(old_key) is None
+        assert cache.get(new_key) == "new"
+        cache.close()
@@ -0,0 +1,153 @@
+import pytest
+from unittest.mock import Mock, patch
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+from src.app.ai_analyzer import AIAnalyzer
+from src.app.llm_cache import LLMResponseCache
+from src.app.llm_transport import (
+    AsyncRecordingClient, AsyncReplayClient, CassetteMissError, CassetteStore, RecordingClient, ReplayClient,
+    request_key
+)
+from src.app.openai_client import run_async
+
+REQUEST = {
+    'model': "gpt-4o",
+    'messages': [{'role': "user", 'content': "Analyze this ACV document:\n\nACV text"}],
+    'max_tokens': 100,
+    'timeout': 30
+}
+
+def make_completion(text):
+    """Build a real chat completion, as the live API returns it."""
+    return ChatCompletion.model_validate({
+        'id': "chatcmpl-1", 'object': "chat.completion", 'created': 0, 'model': "gpt-4o",
+        'choices': [{'index': 0, 'finish_reason': "stop", 'message': {'role': "assistant", 'content': text}}],
+        'usage': {'prompt_tokens': 20, 'completion_tokens': 10, 'total_tokens': 30}
+    })
+
+def make_chunks(text, size=8):
+    """Build real streamed completion chunks carrying text in fixed-size deltas."""
+    return [
+        ChatCompletionChunk.model_validate({
+            'id': "chatcmpl-1", 'object': "chat.completion.chunk", 'created': 0, 'model': "gpt-4o",
+            'choices': [{'index': 0, 'delta': {'content': text[i:i + size]}}]
+        })
+        for i in range(0, len(text), size)
+    ]
+
+async def iterate_async(items):
+    """Async iterator over items, like an openai AsyncStream."""
+    for item in items:
+        yield item
+
+class TestLLMTransport:
+    """Test cases for the record/replay transport."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.live = Mock()
+    
+    def test_request_key_ignores_timeout(self):
+        """Test the same request with a different timeout replays the same recording."""
+        assert request_key(REQUEST) == request_key({**REQUEST, 'timeout': 120})
+        assert request_key(REQUEST) != request_key({**REQUEST, 'model': "gpt-4"})
+    
+    def test_recorded_completion_replays(self, tmp_path):
+        """Test a recorded response is served back without the live client."""
+        store = CassetteStore(str(tmp_path))
+        self.live.chat.completions.create.return_value = make_completion('{"red_flags": []}')
+        
+        recorded = RecordingClient(self.live, store).chat.completions.create(**REQUEST)
+        replayed = ReplayClient(store, latency=0).chat.completions.create(**REQUEST)
+        
+        assert replayed.choices[0].message.content == recorded.choices[0].message.content
+        assert replayed.usage.total_tokens == 30
+        assert len(list(tmp_path.glob("*.json"))) == 1
+    
+    def test_recorded_stream_replays(self, tmp_path):
+        """Test a stream is recorded once consumed and replayed chunk by chunk."""
+        store = CassetteStore(str(tmp_path))
+        request = {**REQUEST, 'stream': True}
+        self.live.chat.completions.create.return_value = iter(make_chunks('{"red_flags": []}'))
+        
+        recorded = list(RecordingClient(self.live, store).chat.completions.create(**request))
+        replayed = list(ReplayClient(store, latency=0).chat.completions.create(**request))
+        
+        assert [chunk.choices[0].delta.content for chunk in replayed] == \
+               [chunk.choices[0].delta.content for chunk in recorded]
+    
+    def test_async_record_and_replay(self, tmp_path):
+        """Test the async clients record and replay both completions and streams."""
+        store = CassetteStore(str(tmp_path))
+        stream_request = {**REQUEST, 'stream': True}
+        
+        async def create(**request):
+            if request.get('stream'):
+                return iterate_async(make_chunks('{"key_findings": ["ok"]}'))
+            return make_completion('{"key_findings": ["ok"]}')
+        self.live.chat.completions.create = create
+        
+        async def run():
+            recorder = AsyncRecordingClient(self.live, store)
+            await recorder.chat.completions.create(**REQUEST)
+            async for _ in await recorder.chat.completions.create(**stream_request):
+                pass
+            
+            replayer = AsyncReplayClient(store, latency=0)
+            completion = await replayer.chat.completions.create(**REQUEST)
+            chunks = [chunk async for chunk in await replayer.chat.completions.create(**stream_request)]
+            return completion, chunks
+        
+        completion, chunks = run_async(run())
+        
+        assert completion.choices[0].message.content == '{"key_findings": ["ok"]}'
+        assert "".join(chunk.choices[0].delta.content for chunk in chunks) == '{"key_findings": ["ok"]}'
+    
+    def test_unrecorded_request_raises(self, tmp_path):
+        """Test replay fails loudly instead of calling the network for a new request."""
+        with pytest.raises(CassetteMissError):
+            ReplayClient(CassetteStore(str(tmp_path))).chat.completions.create(**REQUEST)
+    
+    def test_replay_latency_is_synthetic(self, tmp_path):
+        """Test replay waits the recorded latency scaled, or a fixed latency, spread over stream chunks."""
+        store = CassetteStore(str(tmp_path))
+        store.save(REQUEST, make_completion("{}").model_dump(mode='json'), latency=2.0)
+        stream_request = {**REQUEST, 'stream': True}
+        chunks = [chunk.model_dump(mode='json') for chunk in make_chunks("x" * 40)]
+        store.save(stream_request, chunks, latency=4.0, first_chunk=1.0)
+        
+        with patch('src.app.llm_transport.time.sleep') as sleep:
+            ReplayClient(store, latency_scale=0.5).chat.completions.create(**REQUEST)
+            assert sleep.call_args.args[0] == pytest.approx(1.0)
+            
+            ReplayClient(store, latency=0.25).chat.completions.create(**REQUEST)
+            assert sleep.call_args.args[0] == pytest.approx(0.25)
+            
+            sleep.reset_mock()
+            list(ReplayClient(store).chat.completions.create(**stream_request))
+            delays = [call.args[0] for call in sleep.call_args_list]
+            assert delays == pytest.approx([1.0, 0.75, 0.75, 0.75, 0.75])
+    
+    def test_analyzer_replays_without_api_key(self, tmp_path):
+        """Test a claim recorded once can be re-analyzed offline with no OPENAI_API_KEY."""
+        reply = '{"red_flags": [], "key_findings": ["Recorded finding"], "recommendations": []}'
+        self.live.chat.completions.create.return_value = make_completion(reply)
+        
+        with patch('src.app.ai_analyzer.settings.LLM_CASSETTE_PATH', str(tmp_path)):
+            with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}), \
+                 patch('src.app.ai_analyzer.get_openai_client', return_value=self.live):
+                recorder = AIAnalyzer(cache=LLMResponseCache(), transport='record')
+            recorded = recorder.analyze_acv("ACV text")
+            
+            with patch.dict('os.environ', {'OPENAI_API_KEY': ''}), \
+                 patch('src.app.ai_analyzer.get_openai_client') as get_client:
+                replayer = AIAnalyzer(cache=LLMResponseCache(), transport='replay')
+            replayed = replayer.analyze_acv("ACV text")
+        
+        get_client.assert_not_called()
+        assert replayed == recorded
+        assert replayed['key_findings'] == ["Recorded finding"]
+    
+    def test_unknown_transport_rejected(self):
+        """Test a typo in LLM_TRANSPORT fails at startup."""
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}), pytest.raises(ValueError):
+            AIAnalyzer(cache=LLMResponseCache(), transport='replya')
@@ -0,0 +1,27 @@
+import pytest
+from src.app.openai_client import get_async_openai_client, get_openai_client, run_async
+
+class TestOpenAIClient:
+    """Test cases for the shared OpenAI client factory."""
+    
+    def test_blocking_client_is_shared(self):
+        """Test every caller with the same key gets one client and connection pool."""
+        first = get_openai_client("test-key-shared")
+        
+        assert get_openai_client("test-key-shared") is first
+        assert get_openai_client("test-key-other") is not first
+    
+    def test_async_client_survives_between_runs(self):
+        """Test the background loop keeps the async client alive across claims."""
+        async def current_client():
+            return get_async_openai_client("test-key-async")
+        
+        assert run_async(current_client()) is run_async(current_client())
+    
+    def test_run_async_propagates_errors(self):
+        """Test exceptions raised on the background loop reach the caller."""
+        async def fail():
+            raise ValueError("boom")
+        
+        with pytest.raises(ValueError, match="boom"):
+            run_async(fail())
@@ -0,0 +1,110 @@
+from unittest.mock import Mock, patch
+from src.app.pdf_cache import PDFTextCache
+from src.app.pdf_processor import PDFProcessor
+
+class TestPDFTextCache:
+    """Test cases for PDFTextCache class."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pdf_file = Mock()
+        self.mock_pdf_file.name = "test.pdf"
+        self.mock_pdf_file.size = 1024
+        self.mock_pdf_file.read.return_value = b"mock_pdf_data"
+    
+    def test_get_put_and_counters(self, tmp_path):
+        """Test cache round trip and hit/miss counters."""
+        cache = PDFTextCache(str(tmp_path / "cache.sqlite3"))
+        key = PDFTextCache.make_key("abc123", "v1")
+        
+        assert cache.get(key) is None
+        cache.put(key, "cached text")
+        assert cache.get(key) == "cached text"
+        
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['entries'] == 1
+    
+    def test_extractor_version_is_part_of_key(self, tmp_path):
+        """Test that a new extractor version does not reuse old text."""
+        cache = PDFTextCache(str(tmp_path / "cache.sqlite3"))
+        cache.put(PDFTextCache.make_key("abc123", "v1"), "old text")
+        
+        assert cache.get(PDFTextCache.make_key("abc123", "v2")) is None
+    
+    def test_lru_eviction(self, tmp_path):
+        """Test least recently used entries are evicted past the size limit."""
+        cache = PDFTextCache(str(tmp_path / "cache.sqlite3"), max_bytes=20)
+        cache.put("a", "x" * 8)
+        cache.put("b", "y" * 8)
+        cache.get("a")  # Refresh 'a' so 'b' is the oldest
+        cache.put("c", "z" * 8)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == "x" * 8
+        assert cache.get("c") == "z" * 8
+        assert cache.stats()['size_bytes'] <= 20
+    
+    def test_extract_text_hit_skips_pypdf2(self, tmp_path):
+        """Test a cache hit returns text without building a PDF reader."""
+        cache = PDFTextCache(str(tmp_path / "cache.sqlite3"))
+        processor = PDFProcessor(cache=cache)
+        
+        with patch('PyPDF2.PdfReader') as mock_reader:
+            mock_page = Mock()
+            mock_page.extract_text.return_value = "Cached content"
+            mock_reader.return_value.pages = [mock_page]
+            
+            first = processor.extract_text(self.mock_pdf_file)
+            second = processor.extract_text(self.mock_pdf_file)
+            
+            assert first == second == "--- Page 1 ---\nCached content"
+            mock_reader.assert_called_once()
+            assert cache.stats()['hits'] == 1
+    
+    def test_extract_document_caches_before_budget_and_dedup(self, tmp_path):
+        """Test the verbatim text of a full read is cached, so budgeted and deduplicated reads are hits."""
+        cache = PDFTextCache(str(tmp_path / "cache.sqlite3"))
+        processor = PDFProcessor(cache=cache)
+        
+        with patch('PyPDF2.PdfReader') as mock_reader:
+            pages = []
+            for i in range(4):
+                mock_page = Mock()
+                mock_page.extract_text.return_value = f"ACME Mutual\nSection {i + 1} terms\nPage footer"
+                pages.append(mock_page)
+            mock_reader.return_value.pages = pages
+            
+            full = processor.extract_document(self.mock_pdf_file, max_pages=0, max_chars=0, dedup=False)
+            first = processor.extract_document(self.mock_pdf_file, max_pages=3, max_chars=0, dedup=True)
+            second = processor.extract_document(self.mock_pdf_file, max_pages=3, max_chars=0, dedup=True)
+            
+            assert first == second
+            assert first['truncated'] is True
+            assert "ACME Mutual" not in first['content'].split("--- Page 3 ---")[1]
+            assert full['content'].count("ACME Mutual") == 4
+            mock_reader.assert_called_once()
+            stats = cache.stats()
+            assert (stats['hits'], stats['misses'], stats['entries']) == (2, 1, 1)
+    
+    def test_extract_document_miss_respects_page_budget(self, tmp_path):
+        """Test a budgeted miss decodes only the budgeted pages and caches nothing partial."""
+        cache = PDFTextCache(str(tmp_path / "cache.sqlite3"))
+        processor = PDFProcessor(cache=cache)
+        
+        with patch('PyPDF2.PdfReader') as mock_reader:
+            pages = []
+            for i in range(4):
+                mock_page = Mock()
+                mock_page.extract_text.return_value = f"Section {i + 1} terms"
+                pages.append(mock_page)
+            mock_reader.return_value.pages = pages
+            
+            result = processor.extract_document(self.mock_pdf_file, max_pages=2, max_chars=0, dedup=False)
+            
+            assert result['pages_covered'] == 2
+            assert result['truncated'] is True
+            pages[2].extract_text.assert_not_called()
+            pages[3].extract_text.assert_not_called()
+            assert cache.stats()['entries'] == 0
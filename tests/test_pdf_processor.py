@@ -1,7 +1,8 @@
 import pytest
 from unittest.mock import Mock, patch, mock_open
 import io
-from src.app.pdf_processor import PDFProcessor
+from src.app.pdf_cache import PDFTextCache
+from src.app.pdf_processor import PDFProcessor, ParsedPDF, get_shared_pool
 
 class TestPDFProcessor:
     """Test cases for PDFProcessor class."""
@@ -110,3 +111,283 @@ class TestPDFProcessor:
         assert result['filename'] == "test.pdf"
         assert 'error' in result
         assert "PDF read error" in result['error']
+    
+    def test_parsed_pdf_shared_across_calls(self):
+        """Test that a ParsedPDF handle reads and parses the upload only once."""
+        self.mock_pdf_file.read.return_value = b"mock_pdf_data"
+        
+        with patch('PyPDF2.PdfReader') as mock_reader:
+            mock_page = Mock()
+            mock_page.extract_text.return_value = "Shared content"
+            mock_reader.return_value.pages = [mock_page]
+            mock_reader.return_value.is_encrypted = False
+            mock_reader.return_value.metadata = None
+            
+            parsed = self.processor.open(self.mock_pdf_file)
+            
+            assert self.processor.validate_pdf(parsed) is True
+            assert self.processor.get_pdf_info(parsed)['page_count'] == 1
+            assert self.processor.extract_text(parsed) == "--- Page 1 ---\nShared content"
+            assert self.processor.open(parsed) is parsed
+            
+            self.mock_pdf_file.read.assert_called_once()
+            mock_reader.assert_called_once()
+    
+    def test_iter_pages_skips_failed_pages(self):
+        """Test that iter_pages yields pages lazily and skips pages that fail."""
+        self.mock_pdf_file.read.return_value = b"mock_pdf_data"
+        
+        with patch('PyPDF2.PdfReader') as mock_reader:
+            mock_page1 = Mock()
+            mock_page1.extract_text.return_value = "Page 1 content"
+            mock_page2 = Mock()
+            mock_page2.extract_text.side_effect = Exception("bad page")
+            mock_page3 = Mock()
+            mock_page3.extract_text.return_value = "Page 3 content"
+            mock_reader.return_value.pages = [mock_page1, mock_page2, mock_page3]
+            
+            pages = self.processor.iter_pages(self.mock_pdf_file)
+            assert next(pages) == (1, "Page 1 content")
+            mock_page3.extract_text.assert_not_called()
+            assert list(pages) == [(3, "Page 3 content")]
+    
+    def test_write_text_streams_pages(self):
+        """Test bounded-memory extraction into a text stream."""
+        self.mock_pdf_file.read.return_value = b"mock_pdf_data"
+        
+        with patch('PyPDF2.PdfReader') as mock_reader:
+            mock_page1 = Mock()
+            mock_page1.extract_text.return_value = "Page 1 content"
+            mock_page2 = Mock()
+            mock_page2.extract_text.return_value = "Page 2 content"
+            mock_reader.return_value.pages = [mock_page1, mock_page2]
+            
+            output = io.StringIO()
+            pages_written = self.processor.write_text(self.mock_pdf_file, output)
+            
+            assert pages_written == 2
+            assert output.getvalue() == "--- Page 1 ---\nPage 1 content\n--- Page 2 ---\nPage 2 content"
+    
+    def test_extract_text_parallel_keeps_page_order(self):
+        """Test parallel extraction returns pages in order and tolerates page failures."""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        processor = PDFProcessor(parallel_workers=2, parallel_min_pages=3, pool=ThreadPoolExecutor(max_workers=2))
+        self.mock_pdf_file.read.return_value = b"mock_pdf_data"
+        
+        with patch('PyPDF2.PdfReader') as mock_reader:
+            pages = []
+            for i in range(4):
+                mock_page = Mock()
+                mock_page.extract_text.return_value = f"Page {i + 1} content"
+                pages.append(mock_page)
+            pages[2].extract_text.side_effect = Exception("bad page")
+            mock_reader.return_value.pages = pages
+            
+            result = processor.extract_text(self.mock_pdf_file)
+            
+            expected = ("--- Page 1 ---\nPage 1 content\n--- Page 2 ---\nPage 2 content\n"
+                        "--- Page 4 ---\nPage 4 content")
+            assert result == expected
+    
+    def test_extract_text_small_document_stays_serial(self):
+        """Test documents below the crossover threshold skip the process pool."""
+        mock_pool = Mock()
+        processor = PDFProcessor(parallel_workers=4, parallel_min_pages=10, pool=mock_pool)
+        self.mock_pdf_file.read.return_value = b"mock_pdf_data"
+        
+        with patch('PyPDF2.PdfReader') as mock_reader:
+            mock_page = Mock()
+            mock_page.extract_text.return_value = "Short content"
+            mock_reader.return_value.pages = [mock_page]
+            
+            assert processor.extract_text(self.mock_pdf_file) == "--- Page 1 ---\nShort content"
+            mock_pool.submit.assert_not_called()
+    
+    def test_extract_text_from_path_bytes_and_memoryview(self, make_pdf, tmp_path):
+        """Test path, bytes and memoryview inputs produce the same text."""
+        pdf_bytes = make_pdf(["First page", "Second page"])
+        pdf_path = tmp_path / "policy.pdf"
+        pdf_path.write_bytes(pdf_bytes)
+        
+        from_path = self.processor.extract_text(str(pdf_path))
+        from_bytes = self.processor.extract_text(pdf_bytes)
+        from_view = self.processor.extract_text(memoryview(pdf_bytes))
+        
+        assert "--- Page 2 ---" in from_path
+        assert "Second page" in from_path
+        assert from_path == from_bytes == from_view
+    
+    def test_open_path_uses_memory_map(self, make_pdf, tmp_path):
+        """Test path inputs are memory-mapped and released on close."""
+        import mmap
+        
+        pdf_path = tmp_path / "policy.pdf"
+        pdf_path.write_bytes(make_pdf(["Only page"]))
+        
+        with self.processor.open(pdf_path) as parsed:
+            assert isinstance(parsed.data, mmap.mmap)
+            assert parsed.name == "policy.pdf"
+            assert self.processor.validate_pdf(parsed) is True
+            assert self.processor.get_pdf_info(parsed)['page_count'] == 1
+        
+        assert parsed.data.closed
+    
+    def test_validate_pdf_fast_path_skips_full_parse(self, make_pdf):
+        """Test structural validation reads the page count without building a reader."""
+        pdf = ParsedPDF(make_pdf(["One", "Two", "Three"]), name="policy.pdf")
+        
+        with patch('PyPDF2.PdfReader') as mock_reader:
+            assert pdf.quick_page_count == 3
+            assert self.processor.validate_pdf(pdf) is True
+            mock_reader.assert_not_called()
+    
+    def test_validate_pdf_fast_path_empty_page_tree(self, make_pdf):
+        """Test a PDF whose page tree is empty is rejected by the fast path."""
+        pdf = ParsedPDF(make_pdf([]), name="empty.pdf")
+        
+        with patch('PyPDF2.PdfReader') as mock_reader:
+            assert self.processor.validate_pdf(pdf) is False
+            mock_reader.assert_not_called()
+    
+    def test_quick_page_count_undecidable_falls_back(self, make_pdf):
+        """Test the fast path defers to a full parse when the trailer is missing."""
+        truncated = make_pdf(["One"]).split(b"startxref")[0]
+        
+        assert ParsedPDF(truncated).quick_page_count is None
+        assert ParsedPDF(b"not a pdf").quick_page_count is None
+    
+    def test_unknown_backend_rejected(self):
+        """Test configuring an unknown extraction backend fails fast."""
+        with pytest.raises(ValueError, match="Unknown PDF backend"):
+            PDFProcessor(backend="nonexistent")
+    
+    def test_backends_extract_same_text(self, make_pdf):
+        """Test every installed backend extracts the same page text with markers."""
+        from src.app.pdf_backends import available_backends
+        
+        pdf_bytes = make_pdf(["Policy terms", "Exclusions apply"])
+        for name, backend in available_backends().items():
+            result = PDFProcessor(backend=backend).extract_text(pdf_bytes)
+            assert result.startswith("--- Page 1 ---\nPolicy terms"), name
+            assert "--- Page 2 ---\nExclusions apply" in result, name
+    
+    def test_extract_document_page_budget_stops_early(self):
+        """Test a page budget stops decoding and flags the result as truncated."""
+        self.mock_pdf_file.read.return_value = b"mock_pdf_data"
+        
+        with patch('PyPDF2.PdfReader') as mock_reader:
+            pages = []
+            for i in range(5):
+                mock_page = Mock()
+                mock_page.extract_text.return_value = f"Page {i + 1} content"
+                pages.append(mock_page)
+            mock_reader.return_value.pages = pages
+            
+            result = self.processor.extract_document(self.mock_pdf_file, max_pages=2, max_chars=0)
+            
+            assert result['content'] == "--- Page 1 ---\nPage 1 content\n--- Page 2 ---\nPage 2 content"
+            assert result['truncated'] is True
+            assert result['pages_covered'] == 2
+            assert result['page_count'] == 5
+            pages[2].extract_text.assert_not_called()
+    
+    def test_extract_document_char_budget(self):
+        """Test a character budget is a hard ceiling on the returned text."""
+        self.mock_pdf_file.read.return_value = b"mock_pdf_data"
+        
+        with patch('PyPDF2.PdfReader') as mock_reader:
+            mock_page1 = Mock()
+            mock_page1.extract_text.return_value = "A" * 50
+            mock_page2 = Mock()
+            mock_page2.extract_text.return_value = "B" * 50
+            mock_reader.return_value.pages = [mock_page1, mock_page2]
+            
+            result = self.processor.extract_document(self.mock_pdf_file, max_pages=0, max_chars=80)
+            
+            assert len(result['content']) <= 80
+            assert result['content'].startswith("--- Page 1 ---\n" + "A" * 50)
+            assert result['truncated'] is True
+            assert result['pages_covered'] == 2
+    
+    def test_extract_document_within_budget(self):
+        """Test documents inside their budget are not flagged as truncated."""
+        self.mock_pdf_file.read.return_value = b"mock_pdf_data"
+        
+        with patch('PyPDF2.PdfReader') as mock_reader:
+            mock_page = Mock()
+            mock_page.extract_text.return_value = "Short content"
+            mock_reader.return_value.pages = [mock_page]
+            
+            result = self.processor.extract_document(self.mock_pdf_file, max_pages=10, max_chars=1000)
+            
+            assert result['truncated'] is False
+            assert result['pages_covered'] == 1
+    
+    def test_extract_document_strips_boilerplate(self):
+        """Test extract_document removes repeated headers and reports the savings."""
+        self.mock_pdf_file.read.return_value = b"mock_pdf_data"
+        
+        with patch('PyPDF2.PdfReader') as mock_reader:
+            pages = []
+            for i in range(3):
+                mock_page = Mock()
+                mock_page.extract_text.return_value = (
+                    f"ACME Mutual Insurance Co.\nClaims Department\nSection {i + 1} terms\n"
+                    "Signed by agent\nEnd of section"
+                )
+                pages.append(mock_page)
+            mock_reader.return_value.pages = pages
+            
+            result = self.processor.extract_document(self.mock_pdf_file, dedup=True)
+            
+            assert result['content'].count("ACME Mutual Insurance Co.") == 1
+            assert "Section 3 terms" in result['content']
+            assert result['dedup']['lines_removed'] == 8
+            assert self.processor.extract_text(self.mock_pdf_file).count("ACME Mutual Insurance Co.") == 3
+    
+    def test_extract_many_runs_documents_on_pool(self, make_pdf, tmp_path):
+        """Test a claim's documents are extracted concurrently and keyed by type."""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        contract_path = tmp_path / "contract.pdf"
+        contract_path.write_bytes(make_pdf(["Coverage terms"]))
+        self.mock_pdf_file.read.return_value = make_pdf(["Inspection notes"])
+        
+        pool = ThreadPoolExecutor(max_workers=2)
+        processor = PDFProcessor(pool=pool)
+        results = processor.extract_many({
+            'contract': str(contract_path),
+            'inspection': self.mock_pdf_file,
+            'acv': None
+        })
+        
+        assert set(results) == {'contract', 'inspection'}
+        assert "Coverage terms" in results['contract']['content']
+        assert "Inspection notes" in results['inspection']['content']
+        assert results['inspection']['truncated'] is False
+    
+    def test_extract_many_keeps_caller_cache(self, make_pdf, tmp_path):
+        """Test pool workers write to the caller's text cache instead of dropping it."""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        paths = {}
+        for doc_type in ('contract', 'inspection'):
+            paths[doc_type] = str(tmp_path / f"{doc_type}.pdf")
+            (tmp_path / f"{doc_type}.pdf").write_bytes(make_pdf([f"{doc_type} text"]))
+        cache = PDFTextCache(str(tmp_path / "cache.sqlite3"))
+        
+        processor = PDFProcessor(pool=ThreadPoolExecutor(max_workers=2), cache=cache)
+        processor.extract_many(paths)
+        
+        assert cache.stats()['entries'] == 2
+        assert "contract text" in processor.extract_document(paths['contract'], 'contract')['content']
+        assert cache.stats()['hits'] == 1
+    
+    def test_shared_pool_does_not_fork(self):
+        """Test the shared pool starts workers without forking the threaded server."""
+        with patch('src.app.pdf_processor.ProcessPoolExecutor') as executor, \
+             patch('src.app.pdf_processor._shared_pool', None):
+            get_shared_pool()
+        
+        assert executor.call_args.kwargs['mp_context'].get_start_method() in ('forkserver', 'spawn')
@@ -0,0 +1,102 @@
+import pytest
+from src.app.prescreen import PreScreener
+
+HISTORY = (
+    "--- Page 1 ---\nVehicle: 2018 Honda Accord\nNo salvage title reported by any state.\n"
+    "--- Page 2 ---\nTitle brand: Rebuilt title issued in TX, 2021.\n"
+    "Odometer rollback suspected between readings."
+)
+
+class TestPreScreener:
+    """Test cases for PreScreener class."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.prescreen = PreScreener(doc_types=['history', 'inspection'])
+    
+    def test_finds_phrases_with_page_and_evidence(self):
+        """Test each hit carries its severity, page and the quoted text."""
+        flags = {flag['phrase']: flag for flag in self.prescreen.scan('history', HISTORY)}
+        
+        rebuilt = flags['rebuilt title']
+        assert rebuilt['severity'] == 'CRITICAL'
+        assert rebuilt['page'] == 2
+        assert "Rebuilt title issued in TX" in rebuilt['evidence']
+        assert flags['odometer rollback']['severity'] == 'HIGH'
+    
+    @pytest.mark.parametrize("text", [
+        "No salvage title reported by any state.",
+        "Vehicle was not reported stolen.",
+        "Inspection found no evidence of fraud or forgery."
+    ])
+    def test_negated_mentions_are_ignored(self, text):
+        """Test statements that a problem is absent do not raise flags."""
+        assert self.prescreen.scan('history', text) == []
+    
+    @pytest.mark.parametrize("text", [
+        "Salvage title: No",
+        "Fraud indicators: None",
+        "Theft/stolen record: Clear",
+        "Stolen vehicle check: No record found",
+        "Rebuilt title - N/A",
+        "Fraud referral: Not required",
+        "SIU fraud review: Not indicated",
+        "Stolen: N"
+    ])
+    def test_negative_checklist_answers_are_ignored(self, text):
+        """Test checklist lines answering that a problem is absent do not raise flags."""
+        assert self.prescreen.scan('history', text) == []
+    
+    @pytest.mark.parametrize("text, decisive", [
+        ("Salvage title: Yes", True),
+        ("Title status: Salvage title", True),
+        ("Stolen in 2019 per NICB.\nRecovered after stolen vehicle report.", True),
+        ("Owner mentioned the car was stolen once.", False)
+    ])
+    def test_decisive_needs_confirmation(self, text, decisive):
+        """Test a single prose mention is flagged but only a confirmed hit can skip the LLM calls."""
+        results = self.prescreen.scan_all({'history': text})
+        
+        assert results['history'][0]['severity'] == 'CRITICAL'
+        assert PreScreener.is_decisive(results) is decisive
+    
+    def test_unscanned_document_types(self):
+        """Test contracts are not scanned, since they describe fraud and exclusions as conditions."""
+        assert self.prescreen.scan('contract', "Coverage is void in case of fraud.") == []
+    
+    def test_decisive_only_on_critical(self):
+        """Test only a CRITICAL hit makes the pre-screen decisive."""
+        high_only = self.prescreen.scan_all({'inspection': "Odometer rollback suspected."})
+        
+        assert not PreScreener.is_decisive(high_only)
+        assert PreScreener.is_decisive(self.prescreen.scan_all({'history': HISTORY}))
+    
+    def test_merge_skips_flags_the_model_raised(self):
+        """Test pre-screen flags are added to the LLM analysis only when the model missed them."""
+        flags = self.prescreen.scan('history', HISTORY)
+        analysis = {'red_flags': [{"issue": "Odometer rollback suspected", "severity": "HIGH"}]}
+        
+        merged = PreScreener.merge(analysis, flags)
+        
+        assert [flag.get('phrase') for flag in merged['red_flags']] == [None, 'rebuilt title']
+        assert merged['recommendations'] == []
+    
+    def test_merge_adds_unconfirmed_hits_as_review_notes(self):
+        """Test a single prose mention becomes a review note, not a red flag."""
+        flags = self.prescreen.scan('history', "Owner mentioned the car was stolen once.")
+        analysis = {'red_flags': [], 'recommendations': ["Pay the repair estimate"]}
+        
+        merged = PreScreener.merge(analysis, flags)
+        
+        assert merged['red_flags'] == []
+        assert merged['recommendations'][0] == "Pay the repair estimate"
+        assert merged['recommendations'][1].startswith('Check unconfirmed pre-screen mention of "stolen"')
+    
+    def test_stand_in_analysis(self):
+        """Test a skipped document still gets the analysis fields the evaluator reads."""
+        analysis = PreScreener.to_analysis(self.prescreen.scan('history', HISTORY), deferred=True)
+        
+        assert analysis['prescreen'] == "deferred"
+        assert [flag['phrase'] for flag in analysis['red_flags']] == ['rebuilt title']
+        assert "odometer rollback" in analysis['recommendations'][1]
+        assert analysis['key_findings'][0].startswith("Rebuilt title found in history document")
@@ -0,0 +1,61 @@
+import pytest
+from src.app.rate_limiter import RateLimiter
+
+class TestRateLimiter:
+    """Test cases for RateLimiter class."""
+    
+    def test_disabled_limiter_never_waits(self):
+        """Test a limiter without limits lets every request through."""
+        limiter = RateLimiter()
+        
+        assert not limiter.enabled
+        assert all(limiter.try_acquire(10_000) == 0 for _ in range(100))
+    
+    def test_requests_per_minute(self):
+        """Test the request bucket empties and reports the refill wait."""
+        limiter = RateLimiter(rpm=2)
+        
+        assert limiter.try_acquire() == 0
+        assert limiter.try_acquire() == 0
+        assert limiter.try_acquire() == pytest.approx(30, abs=0.5)
+    
+    def test_tokens_per_minute(self):
+        """Test the token bucket waits for enough allowance to cover the estimate."""
+        limiter = RateLimiter(tpm=1000)
+        
+        assert limiter.try_acquire(800) == 0
+        assert limiter.try_acquire(400) == pytest.approx(12, abs=0.5)
+        
+        # A shorter-than-estimated response refunds the difference
+        limiter.adjust(300)
+        assert limiter.try_acquire(400) == 0
+    
+    def test_oversized_request_fits_full_bucket(self):
+        """Test a request larger than the whole minute's tokens is not blocked forever."""
+        limiter = RateLimiter(tpm=1000)
+        
+        assert limiter.try_acquire(5000) == 0
+    
+    def test_acquire_blocks_until_refilled(self):
+        """Test acquire sleeps instead of failing when the bucket is empty."""
+        limiter = RateLimiter(rpm=120)
+        for _ in range(120):
+            assert limiter.try_acquire() == 0
+        
+        waited = limiter.acquire()
+        
+        assert 0.3 < waited < 2
+    
+    def test_sqlite_bucket_is_shared(self, tmp_path):
+        """Test limiters on the same file draw from one allowance, as worker processes would."""
+        path = str(tmp_path / "limits.sqlite3")
+        first = RateLimiter(rpm=2, path=path)
+        second = RateLimiter(rpm=2, path=path)
+        
+        assert first.try_acquire() == 0
+        assert second.try_acquire() == 0
+        assert first.try_acquire() > 0
+        assert second.try_acquire() > 0
+        
+        first.close()
+        second.close()
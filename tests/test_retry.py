@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+import openai
+from unittest.mock import Mock, patch
+from src.app.openai_client import httpx, run_async
+from src.app.retry import RetryPolicy, is_retryable, retry_after
+from tests.helpers import make_status_error
+
+class TestRetryPolicy:
+    """Test cases for RetryPolicy class."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.policy = RetryPolicy(max_retries=2, base_delay=1.0, max_delay=30.0)
+    
+    def test_transient_errors_are_retried(self):
+        """Test a 429 is retried with backoff and the later success is returned."""
+        attempt = Mock(side_effect=[make_status_error(429, error_class=openai.RateLimitError), "ok"])
+        
+        with patch('src.app.retry.time.sleep') as sleep:
+            assert self.policy.call(attempt, "gpt-4") == "ok"
+        
+        assert attempt.call_count == 2
+        assert 0 <= sleep.call_args.args[0] <= 1.0
+        assert self.policy.retries == 1
+    
+    def test_gives_up_after_max_retries(self):
+        """Test the last error is raised once the retries are spent."""
+        attempt = Mock(side_effect=make_status_error(503, error_class=openai.InternalServerError))
+        
+        with patch('src.app.retry.time.sleep'), pytest.raises(openai.InternalServerError):
+            self.policy.call(attempt, "gpt-4")
+        
+        assert attempt.call_count == 3
+    
+    @pytest.mark.parametrize("error, retryable", [
+        (make_status_error(429, error_class=openai.RateLimitError), True),
+        (make_status_error(500, error_class=openai.InternalServerError), True),
+        (make_status_error(400, error_class=openai.BadRequestError), False),
+        (openai.APITimeoutError(request=httpx.Request("POST", "https://api.openai.com")), True),
+        (ValueError("bad prompt"), False)
+    ])
+    def test_only_transient_errors_are_retryable(self, error, retryable):
+        """Test client errors and bugs fail fast instead of being retried."""
+        assert is_retryable(error) is retryable
+    
+    def test_backoff_honors_retry_after(self):
+        """Test the server's Retry-After wins over a shorter jittered delay."""
+        error = make_status_error(429, {'retry-after': "7"}, openai.RateLimitError)
+        
+        assert retry_after(error) == 7.0
+        assert retry_after(make_status_error(429, {'retry-after-ms': "250"})) == 0.25
+        assert self.policy.backoff(0, error) == 7.0
+        assert self.policy.backoff(0, make_status_error(429, {'retry-after': "600"})) == 30.0
+    
+    def test_hedge_waits_for_enough_samples(self):
+        """Test hedging stays off until the model has a latency history."""
+        policy = RetryPolicy(hedge_quantile=0.95, hedge_min_samples=20)
+        for seconds in range(1, 20):
+            policy.record_latency("gpt-4", seconds)
+        assert policy.hedge_delay("gpt-4") is None
+        
+        policy.record_latency("gpt-4", 20)
+        assert policy.hedge_delay("gpt-4") == 20
+        assert policy.hedge_delay("gpt-4o-mini") is None
+    
+    def test_slow_async_call_is_hedged(self):
+        """Test a call past the hedge delay is duplicated and the faster copy wins."""
+        policy = RetryPolicy(hedge_quantile=0.5, hedge_min_samples=1)
+        policy.record_latency("gpt-4", 0.05)
+        delays = iter([5.0, 0.0])
+        
+        async def attempt():
+            await asyncio.sleep(next(delays))
+            return "hedged"
+        
+        assert run_async(policy.call_async(attempt, "gpt-4")) == "hedged"
+        assert policy.hedges == 1
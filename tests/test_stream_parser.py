@@ -0,0 +1,64 @@
+import json
+import pytest
+from src.app.stream_parser import IncrementalJSONParser
+
+RESPONSE = {
+    "coverage_terms": ["Collision coverage", 'Quote "inside", with ] bracket'],
+    "deductibles": "$500 collision",
+    "red_flags": [
+        {"issue": "Policy lapsed {briefly}", "severity": "HIGH", "impact": "Gap [30 days]"},
+        {"issue": "Prior damage", "severity": "LOW", "impact": "None"}
+    ],
+    "key_findings": [],
+    "recommendations": ["Verify payment history"]
+}
+
+def feed_in_pieces(parser, text, size):
+    """Feed text in fixed-size pieces, collecting every event."""
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i:i + size]))
+    return events
+
+class TestIncrementalJSONParser:
+    """Test cases for IncrementalJSONParser class."""
+    
+    @pytest.mark.parametrize("size", [1, 5, 64, 10_000])
+    def test_emits_every_list_item_regardless_of_chunking(self, size):
+        """Test items come out identical however the stream is split."""
+        text = "Here is the analysis:\n" + json.dumps(RESPONSE, indent=2)
+        
+        events = feed_in_pieces(IncrementalJSONParser(), text, size)
+        
+        assert events == [
+            ('coverage_terms', "Collision coverage"),
+            ('coverage_terms', 'Quote "inside", with ] bracket'),
+            ('red_flags', RESPONSE['red_flags'][0]),
+            ('red_flags', RESPONSE['red_flags'][1]),
+            ('recommendations', "Verify payment history")
+        ]
+    
+    def test_item_emitted_as_soon_as_complete(self):
+        """Test a red flag is available before the rest of the response arrives."""
+        parser = IncrementalJSONParser()
+        
+        assert parser.feed('{"red_flags": [{"issue": "Salvage title", "severity": "CRITICAL"') == []
+        assert parser.feed('}, {"issue": "Odo') == [
+            ('red_flags', {"issue": "Salvage title", "severity": "CRITICAL"})
+        ]
+    
+    def test_fields_filter(self):
+        """Test only the requested arrays produce events."""
+        parser = IncrementalJSONParser(fields={'red_flags'})
+        
+        events = parser.feed(json.dumps(RESPONSE))
+        
+        assert [field for field, _ in events] == ['red_flags', 'red_flags']
+    
+    def test_ignores_text_after_object(self):
+        """Test trailing prose with braces after the JSON object is not parsed."""
+        parser = IncrementalJSONParser()
+        
+        events = parser.feed('{"key_findings": ["Clean"]} Note: {"red_flags": ["x"]}')
+        
+        assert events == [('key_findings', "Clean")]
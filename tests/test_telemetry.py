@@ -0,0 +1,79 @@
+import json
+import pytest
+from src.app.telemetry import (
+    InMemorySink, JSONLSink, PrometheusSink, estimate_cost, new_call_record, summarize
+)
+
+def make_record(model="gpt-4o", cache="miss", prompt_tokens=1000, completion_tokens=500, **fields):
+    """Build a completed call record."""
+    record = new_call_record(model, "acv", cache)
+    record.update(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                  total_tokens=(prompt_tokens or 0) + (completion_tokens or 0),
+                  cost=estimate_cost(model, prompt_tokens, completion_tokens), **fields)
+    return record
+
+class TestTelemetry:
+    """Test cases for call records, summaries and sinks."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.records = [
+            make_record(latency=2.0, queue_wait=0.5, attempts=2, retries=1),
+            make_record(model="gpt-4o-mini", latency=1.0),
+            make_record(cache="hit", prompt_tokens=None, completion_tokens=None)
+        ]
+    
+    def test_cost_uses_longest_model_prefix(self):
+        """Test gpt-4o-mini is priced as itself, not as gpt-4o or gpt-4."""
+        assert estimate_cost("gpt-4o-2024-08-06", 1000, 1000) == pytest.approx(0.0125)
+        assert estimate_cost("gpt-4o-mini", 1000, 1000) == pytest.approx(0.00075)
+        assert estimate_cost("unknown-model", 1000, 1000) is None
+        assert estimate_cost("gpt-4o", None, None) is None
+    
+    def test_summary_totals_calls(self):
+        """Test the per-claim summary adds up calls, cache hits, retries, tokens and cost."""
+        summary = summarize(self.records)
+        
+        assert summary['calls'] == 3
+        assert summary['cache_hits'] == 1
+        assert summary['retries'] == 1
+        assert summary['prompt_tokens'] == 2000
+        assert summary['completion_tokens'] == 1000
+        assert summary['cost'] == pytest.approx(0.0075 + 0.00045)
+        assert summary['max_latency'] == 2.0
+        assert summary['by_model']['gpt-4o']['calls'] == 2
+        assert summary['by_model']['gpt-4o-mini']['tokens'] == 1500
+        json.dumps(summary)
+    
+    def test_memory_sink_keeps_recent_records(self):
+        """Test the in-memory sink drops the oldest records past its limit."""
+        sink = InMemorySink(max_records=2)
+        for record in self.records:
+            sink.record(record)
+        
+        assert [record['cache'] for record in sink.records()] == ["miss", "hit"]
+    
+    def test_jsonl_sink_appends_lines(self, tmp_path):
+        """Test each record becomes one JSON line."""
+        path = tmp_path / "telemetry" / "calls.jsonl"
+        sink = JSONLSink(str(path))
+        for record in self.records:
+            sink.record(record)
+        
+        lines = path.read_text().splitlines()
+        assert len(lines) == 3
+        assert json.loads(lines[0])['retries'] == 1
+    
+    def test_prometheus_sink_renders_counters(self, tmp_path):
+        """Test records aggregate into labeled counters written to the textfile."""
+        path = tmp_path / "llm.prom"
+        sink = PrometheusSink(str(path))
+        for record in self.records:
+            sink.record(record)
+        
+        text = sink.render()
+        assert "# TYPE claim_analyzer_llm_calls_total counter" in text
+        assert 'claim_analyzer_llm_calls_total{cache="hit",doc_type="acv",model="gpt-4o",status="ok"} 1' in text
+        assert 'claim_analyzer_llm_prompt_tokens_total{model="gpt-4o"} 1000' in text
+        assert "# TYPE claim_analyzer_llm_latency_seconds summary" in text
+        assert path.read_text() == text
@@ -0,0 +1,52 @@
+from src.app.text_cleanup import strip_repeated_lines
+
+class TestTextCleanup:
+    """Test cases for cross-page boilerplate removal."""
+    
+    def test_strips_repeated_headers_and_footers(self):
+        """Test letterhead and numbered footers are kept once and stripped elsewhere."""
+        pages = [
+            (i, f"ACME Mutual Insurance Co.\nPolicy 123-45\nClause {i} covers item {i * 7}\n"
+                f"Schedule {i}\nDealer copy\nPage {i} of 4")
+            for i in range(1, 5)
+        ]
+        
+        cleaned, stats = strip_repeated_lines(pages)
+        
+        assert cleaned[0][1] == pages[0][1]
+        assert cleaned[1][1] == "Clause 2 covers item 14\nSchedule 2"
+        assert stats['lines_removed'] == 12
+        assert stats['chars_saved'] > 0
+        assert stats['tokens_saved'] == stats['chars_saved'] // 4
+    
+    def test_checklist_answers_survive(self):
+        """Test repeated short answers in the body and at the page edge are never stripped."""
+        items = [("Engine", "Brakes"), ("Suspension", "Tires"), ("Steering", "Lights"), ("Exhaust", "Glass")]
+        pages = [
+            (i, f"ACME Mutual Insurance Co.\nPage {i} of 4\n{first}\nPass\nNotes\nN/A\n{second}\nFail")
+            for i, (first, second) in enumerate(items, start=1)
+        ]
+        
+        cleaned, stats = strip_repeated_lines(pages)
+        
+        for (_, text), (first, second) in zip(cleaned[1:], items[1:]):
+            assert text == f"{first}\nPass\nNotes\nN/A\n{second}\nFail"
+        assert stats['lines_removed'] == 6
+    
+    def test_short_documents_unchanged(self):
+        """Test documents below the minimum page count are returned as-is."""
+        pages = [(1, "Header\nBody one"), (2, "Header\nBody two")]
+        
+        cleaned, stats = strip_repeated_lines(pages)
+        
+        assert cleaned == pages
+        assert stats['lines_removed'] == 0
+    
+    def test_lines_below_ratio_are_kept(self):
+        """Test lines repeated on only a minority of pages are not treated as boilerplate."""
+        pages = [(1, "Shared note\nA"), (2, "Shared note\nB"), (3, "C"), (4, "D"), (5, "E")]
+        
+        cleaned, stats = strip_repeated_lines(pages)
+        
+        assert cleaned == pages
+        assert stats['lines_removed'] == 0